@@ -14,9 +14,11 @@ Container 2 (API Backend) → Container 3 (LLM+FAISS) via HTTP
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 
-from src.clients.llm_client import obtenir_llm_client
+from src.clients.llm_client import obtenir_llm_client, fermer_llm_client
 from src.base_donnees.connexion import obtenir_pool, fermer_pool
+from src.base_donnees.connexion_async import obtenir_pool_async, fermer_pool_async
 from src.utilitaires.logger import obtenir_logger
 from src.utilitaires.config import obtenir_config
 from src.api.middlewares import configurer_middlewares
@@ -43,13 +45,14 @@ async def lifespan(app: FastAPI):
         # Initialiser le pool de connexions MySQL
         logger.info("Initialisation du pool de connexions MySQL...")
         pool = obtenir_pool()
+        await obtenir_pool_async()
         logger.info("✓ Pool de connexions MySQL initialisé")
 
         # Vérifier la connectivité avec Container 3 (LLM+FAISS)
         logger.info("Vérification de la connectivité avec Container 3 (LLM+FAISS)...")
         try:
             llm_client = obtenir_llm_client()
-            health = llm_client.healthcheck()
+            health = await llm_client.healthcheck_async()
             logger.info(f"✓ Container 3 opérationnel : {health.get('statut', 'unknown')}")
         except Exception as e:
             logger.warning(f"[ATTENTION] Container 3 non accessible au démarrage : {e}")
@@ -70,8 +73,12 @@ async def lifespan(app: FastAPI):
         # Fermer le pool de connexions
         logger.info("Fermeture du pool de connexions MySQL...")
         fermer_pool()
+        await fermer_pool_async()
         logger.info("✓ Pool de connexions fermé")
 
+        # Fermer les connexions keep-alive vers Container 3
+        await fermer_llm_client()
+
         logger.info("[OK] Mila-Assist API arrêtée proprement")
 
     except Exception as e:
@@ -101,6 +108,9 @@ app.add_middleware(
 # Configuration des middlewares (rate limiting, logging)
 configurer_middlewares(app)
 
+# Exposition des métriques Prometheus (pool MySQL, etc.)
+app.mount("/metrics", make_asgi_app())
+
 # Import et enregistrement des routes
 # Note: Les imports sont ici pour éviter les imports circulaires
 try:
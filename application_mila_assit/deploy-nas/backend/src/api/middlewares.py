@@ -6,13 +6,15 @@ et la gestion des erreurs.
 """
 
 import time
-from typing import Callable
+from typing import Callable, Dict, Tuple
 from fastapi import Request, Response, status
 from fastapi.responses import JSONResponse
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
+from starlette.routing import Match
 
+from src.base_donnees.connexion import endpoint_courant
 from src.utilitaires.logger import obtenir_logger
 
 # Logger
@@ -21,6 +23,10 @@ logger = obtenir_logger(__name__)
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+# (méthode, chemin) -> modèle de route, rempli par resoudre_route()
+_routes_resolues: Dict[Tuple[str, str], str] = {}
+TAILLE_MAX_ROUTES_RESOLUES = 1024
+
 
 def configurer_rate_limit_handler(app):
     """
@@ -60,6 +66,42 @@ async def rate_limit_exception_handler(request: Request, exc: RateLimitExceeded)
     )
 
 
+def resoudre_route(request: Request) -> str:
+    """
+    Retrouve le modèle de route (ex: /api/v1/retour-utilisateur/{id_retour}).
+
+    Le modèle est utilisé comme label de métriques à la place du chemin brut,
+    afin de ne pas créer une série Prometheus par identifiant.
+
+    Appelée avant le routage (l'endpoint doit être connu pendant la
+    requête) : le résultat est mémorisé par (méthode, chemin), le parcours
+    des routes n'a lieu qu'au premier passage d'un chemin. Au-delà de
+    TAILLE_MAX_ROUTES_RESOLUES chemins, le plus ancien est oublié.
+
+    Args:
+        request: Requête HTTP
+
+    Returns:
+        Modèle de la route correspondante, ou "inconnue"
+    """
+    cle = (request.scope["method"], request.scope["path"])
+    modele = _routes_resolues.get(cle)
+    if modele is not None:
+        return modele
+
+    modele = "inconnue"
+    for route in request.app.router.routes:
+        correspondance, _ = route.matches(request.scope)
+        if correspondance == Match.FULL:
+            modele = getattr(route, "path", "inconnue")
+            break
+
+    if len(_routes_resolues) >= TAILLE_MAX_ROUTES_RESOLUES:
+        del _routes_resolues[next(iter(_routes_resolues))]
+    _routes_resolues[cle] = modele
+    return modele
+
+
 async def logging_middleware(request: Request, call_next: Callable) -> Response:
     """
     Middleware pour logger toutes les requêtes et leurs durées.
@@ -78,6 +120,9 @@ async def logging_middleware(request: Request, call_next: Callable) -> Response:
     url_path = request.url.path
     client_ip = get_remote_address(request)
 
+    # Attribuer les durées de détention des connexions MySQL à cet endpoint
+    endpoint_courant.set(f"{method} {resoudre_route(request)}")
+
     logger.info(f"→ {method} {url_path} depuis {client_ip}")
 
     # Traiter la requête
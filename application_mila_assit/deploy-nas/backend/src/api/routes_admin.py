@@ -217,7 +217,7 @@ async def evaluer_systeme_rag(
         start_time = time.time()
 
         # 1. DB 
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
             cursor.execute("SELECT id, etiquette, question FROM base_connaissances ORDER BY id")
             questions = cursor.fetchall()
 
@@ -1,15 +1,22 @@
 """
 Routes API pour la gestion des conversations.
 
-Fournit l'endpoint principal pour poser des questions au chatbot.
+Fournit l'endpoint principal pour poser des questions au chatbot,
+ainsi que sa variante streamée (NDJSON).
 """
 
+from typing import AsyncIterator, Optional, Tuple
+
+import numpy as np
+import orjson
+
 from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from src.modeles.conversation import RequeteConversation, ReponseConversation, SourceConnaissance
 from src.clients.llm_client import obtenir_llm_client
-from src.base_donnees.requetes_conversations import inserer_conversation
-from src.base_donnees.requetes_connaissances import obtenir_reponses_par_ids
-from src.securite.validation import valider_question, detecter_spam
+from src.base_donnees.requetes_conversations import inserer_conversation_async
+from src.base_donnees.requetes_connaissances import obtenir_reponses_par_ids_async
+from src.securite.validation import valider_question, QuestionSpam
 from src.utilitaires.logger import obtenir_logger
 from src.utilitaires.exceptions import (
     ErreurEmbedding,
@@ -26,6 +33,52 @@ logger = obtenir_logger(__name__)
 router = APIRouter()
 
 
+def _valider_requete(requete: RequeteConversation) -> Tuple[str, Optional[np.ndarray]]:
+    """
+    Valide la question et l'embedding d'une requête de conversation.
+
+    Args:
+        requete: Requête contenant la question et l'ID de session
+
+    Returns:
+        Tuple (question validée, embedding ou None en mode dégradé)
+
+    Raises:
+        HTTPException 400: Si la question ou l'embedding est invalide
+    """
+    # Valider la question (longueur, HTML, spam)
+    logger.info(f"Nouvelle question reçue : '{requete.question[:50]}...'")
+
+    try:
+        question_validee = valider_question(requete.question)
+    except ValueError as e:
+        if isinstance(e, QuestionSpam):
+            logger.warning(f"Spam détecté dans la question : {requete.question}")
+        else:
+            logger.warning(f"Question invalide : {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Question invalide : {str(e)}"
+        )
+
+    # Vérifier l'embedding (Architecture 4 containers)
+    embedding_to_use = requete.embedding
+
+    if embedding_to_use is None:
+        # Mode dégradé : demander au Container 3 de calculer l'embedding
+        # Utile pour les tests et le widget démo
+        logger.warning("Embedding manquant - mode dégradé activé (Container 3 calculera l'embedding)")
+        embedding_to_use = None  # Le LLM client gèrera ce cas
+    elif len(requete.embedding) != 768:
+        logger.error(f"Dimension embedding invalide: {len(requete.embedding)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"L'embedding doit avoir 768 dimensions (reçu: {len(requete.embedding)})"
+        )
+
+    return question_validee, embedding_to_use
+
+
 @router.post("/search", response_model=ReponseConversation)
 @limiter.limit("100/minute")
 async def creer_conversation(requete: RequeteConversation, request: Request):
@@ -45,40 +98,7 @@ async def creer_conversation(requete: RequeteConversation, request: Request):
         HTTPException 500: En cas d'erreur serveur interne
     """
     try:
-        # Valider la question
-        logger.info(f"Nouvelle question reçue : '{requete.question[:50]}...'")
-
-        try:
-            question_validee = valider_question(requete.question)
-        except ValueError as e:
-            logger.warning(f"Question invalide : {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Question invalide : {str(e)}"
-            )
-
-        # Vérifier le spam
-        if detecter_spam(question_validee):
-            logger.warning(f"Spam détecté dans la question : {requete.question}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="La question contient du contenu suspect"
-            )
-
-        # Vérifier l'embedding (Architecture 4 containers)
-        embedding_to_use = requete.embedding
-        
-        if not embedding_to_use:
-            # Mode dégradé : demander au Container 3 de calculer l'embedding
-            # Utile pour les tests et le widget démo
-            logger.warning("Embedding manquant - mode dégradé activé (Container 3 calculera l'embedding)")
-            embedding_to_use = None  # Le LLM client gèrera ce cas
-        elif len(requete.embedding) != 768:
-            logger.error(f"Dimension embedding invalide: {len(requete.embedding)}")
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"L'embedding doit avoir 768 dimensions (reçu: {len(requete.embedding)})"
-            )
+        question_validee, embedding_to_use = _valider_requete(requete)
 
         # Obtenir le client LLM (Container 3)
         llm_client = obtenir_llm_client()
@@ -86,7 +106,7 @@ async def creer_conversation(requete: RequeteConversation, request: Request):
         # Appeler Container 3 pour recherche FAISS + génération LLM
         logger.info(f"Appel Container 3 pour la session {requete.id_session}")
         try:
-            resultat = llm_client.rechercher_et_generer(
+            resultat = await llm_client.rechercher_et_generer_async(
                 embedding=embedding_to_use,
                 question=question_validee,
                 k=5  # Augmenté pour avoir plus de contexte pour les multi-questions
@@ -106,14 +126,14 @@ async def creer_conversation(requete: RequeteConversation, request: Request):
 
         # Insérer la conversation dans la base de données
         try:
-            id_conversation = inserer_conversation(
+            id_conversation = await inserer_conversation_async(
                 id_session=requete.id_session,
                 question=question_validee,
                 reponse=reponse_texte,
                 ids_kb=resultat["sources"],
                 confiance=resultat["confiance"],
                 temps_ms=resultat["temps_ms"],
-                cache_hit=False  # Cache LRU supprimé (Architecture 4 containers)
+                cache_hit=resultat["cache_hit"]
             )
             logger.info(f"Conversation {id_conversation} enregistrée avec succès")
 
@@ -127,20 +147,23 @@ async def creer_conversation(requete: RequeteConversation, request: Request):
         sources_details = None
         try:
             if resultat["sources"]:
-                sources_data = obtenir_reponses_par_ids(resultat["sources"])
+                sources_data = await obtenir_reponses_par_ids_async(resultat["sources"])
+                # Données internes de confiance (MySQL) : model_construct sans validation
                 sources_details = [
-                    SourceConnaissance(
-                        id=src["id"],
-                        question=src["question"],
-                        extrait=src["reponse"][:100] + "..." if len(src["reponse"]) > 100 else src["reponse"]
+                    SourceConnaissance.model_construct(
+                        id=src.id,
+                        question=src.question,
+                        extrait=src.reponse[:100] + "..." if len(src.reponse) > 100 else src.reponse
                     )
                     for src in sources_data
                 ]
         except Exception as e:
             logger.warning(f"Impossible de recuperer les details des sources: {e}")
 
-        # Construire la réponse
-        reponse = ReponseConversation(
+        # Construire la réponse. Données internes de confiance (Container 3,
+        # MySQL) : model_construct évite une validation complète, FastAPI
+        # revalide de toute façon la réponse via response_model
+        reponse = ReponseConversation.model_construct(
             id_conversation=id_conversation,
             reponse=reponse_texte,
             confiance=resultat["confiance"],
@@ -167,3 +190,108 @@ async def creer_conversation(requete: RequeteConversation, request: Request):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Une erreur interne s'est produite"
         )
+
+
+@router.post("/search/stream")
+@limiter.limit("100/minute")
+async def creer_conversation_flux(requete: RequeteConversation, request: Request):
+    """
+    Variante streamée de /search : la réponse est transmise token par token.
+
+    Le corps est du NDJSON relayé depuis Container 3 (événements "meta" puis
+    "token"), terminé par un événement "fin" portant l'ID de la conversation
+    enregistrée, ou par un événement "erreur". La conversation n'est insérée
+    qu'une fois la génération complète.
+
+    Args:
+        requete: Requête contenant la question et l'ID de session
+        request: Objet Request FastAPI (requis pour le rate limiter)
+
+    Returns:
+        StreamingResponse (application/x-ndjson)
+
+    Raises:
+        HTTPException 400: Si la question est invalide
+        HTTPException 503: Si le service est temporairement indisponible
+    """
+    question_validee, embedding_to_use = _valider_requete(requete)
+
+    llm_client = obtenir_llm_client()
+
+    # Ouverture de la requête avant de répondre : les erreurs de connexion
+    # deviennent encore un 503 avant le début de la réponse
+    logger.info(f"Appel Container 3 (flux) pour la session {requete.id_session}")
+    try:
+        lignes = await llm_client.iter_generer_async(
+            embedding=embedding_to_use,
+            question=question_validee,
+            k=5
+        )
+    except Exception as e:
+        logger.error(f"Erreur Container 3 : {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Le service LLM+FAISS est temporairement indisponible: {str(e)}"
+        )
+
+    async def relayer() -> AsyncIterator[bytes]:
+        meta = {}
+        morceaux = []
+        temps_ms = 0
+
+        try:
+            async for ligne in lignes:
+                evenement = orjson.loads(ligne)
+                type_evenement = evenement.get("type")
+
+                if type_evenement == "fin":
+                    temps_ms = evenement["temps_ms"]
+                    continue
+
+                if type_evenement == "meta":
+                    meta = evenement
+                elif type_evenement == "token":
+                    morceaux.append(evenement["texte"])
+                elif type_evenement == "erreur":
+                    yield ligne + b"\n"
+                    return
+
+                yield ligne + b"\n"
+
+        except Exception as e:
+            logger.error(f"Erreur pendant le flux Container 3 : {str(e)}")
+            yield orjson.dumps({"type": "erreur", "detail": str(e)}) + b"\n"
+            return
+
+        finally:
+            # Libère la connexion Container 3 même si le client s'est déconnecté
+            await lignes.aclose()
+
+        reponse_texte = "".join(morceaux).strip()
+        if not reponse_texte:
+            logger.warning("Réponse LLM vide - utilisation du message par défaut")
+            reponse_texte = "Désolé, je n'ai pas pu générer une réponse pour cette question. Pourriez-vous reformuler ?"
+
+        try:
+            id_conversation = await inserer_conversation_async(
+                id_session=requete.id_session,
+                question=question_validee,
+                reponse=reponse_texte,
+                ids_kb=meta.get("sources", []),
+                confiance=meta.get("confiance", 0.0),
+                temps_ms=temps_ms,
+                cache_hit=False
+            )
+            logger.info(f"Conversation {id_conversation} enregistrée avec succès")
+
+        except ErreurBaseDeDonnees as e:
+            logger.error(f"Erreur lors de l'insertion dans la BDD : {str(e)}")
+            id_conversation = -1
+
+        yield orjson.dumps({
+            "type": "fin",
+            "id_conversation": id_conversation,
+            "temps_ms": temps_ms
+        }) + b"\n"
+
+    return StreamingResponse(relayer(), media_type="application/x-ndjson")
@@ -4,8 +4,11 @@ Routes API pour la gestion des retours utilisateurs (feedback).
 Fournit les endpoints pour soumettre et gérer les feedbacks sur les réponses du chatbot.
 """
 
-from fastapi import APIRouter, HTTPException, Request, status
-from typing import List, Optional
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from typing import List, Literal, Optional
+
+import orjson
 
 from src.modeles.retour import (
     RequeteRetour,
@@ -13,7 +16,9 @@ from src.modeles.retour import (
     StatutRetour,
     CategorieProbleme,
     FeedbackAdmin,
-    ReponseFeedbacksAdmin
+    ReponseFeedbacksAdmin,
+    RetourListe,
+    RetoursColonnes
 )
 from src.base_donnees.requetes_retours import (
     inserer_retour,
@@ -23,7 +28,7 @@ from src.base_donnees.requetes_retours import (
     obtenir_retours_par_statut,
     obtenir_retours_par_categorie,
     marquer_retour_traite,
-    obtenir_statistiques_retours,
+    obtenir_statistiques_retours_async,
     compter_retours
 )
 from src.base_donnees.requetes_conversations import obtenir_conversation
@@ -42,6 +47,46 @@ logger = obtenir_logger(__name__)
 router = APIRouter()
 
 
+def _exposer_curseur(response: Response, curseur_suivant) -> None:
+    """
+    Expose le curseur de la page suivante dans les en-têtes de la réponse.
+
+    Le client repasse ces valeurs en paramètres avant_date / avant_id ;
+    sans en-têtes, il n'y a plus de page.
+    """
+    if curseur_suivant:
+        date_suivante, id_suivant = curseur_suivant
+        response.headers["X-Curseur-Avant-Date"] = date_suivante.isoformat()
+        response.headers["X-Curseur-Avant-Id"] = str(id_suivant)
+
+
+# Colonnes d'un listing de retours, dans l'ordre de COLONNES_LISTE_RETOURS (requetes_retours)
+COLONNES_RETOURS = tuple(RetoursColonnes.model_fields)
+
+
+def _reponse_colonnes(retours: List[tuple], curseur_suivant) -> Response:
+    """
+    Construit un listing en colonnes (disposition=colonnes).
+
+    Les lignes sont transposées d'un seul zip() et le JSON est produit par
+    orjson, sans modèle Pydantic par ligne ni validation de la réponse.
+
+    Args:
+        retours: Lignes du listing (tuples, colonnes de COLONNES_RETOURS)
+        curseur_suivant: Curseur de la page suivante (ou None)
+
+    Returns:
+        Réponse JSON au format RetoursColonnes
+    """
+    colonnes = list(zip(*retours)) if retours else [()] * len(COLONNES_RETOURS)
+    reponse = Response(
+        content=orjson.dumps(dict(zip(COLONNES_RETOURS, colonnes))),
+        media_type="application/json"
+    )
+    _exposer_curseur(reponse, curseur_suivant)
+    return reponse
+
+
 @router.post("/retour-utilisateur", response_model=ReponseRetour, status_code=status.HTTP_201_CREATED)
 @limiter.limit("20/minute")
 async def soumettre_retour(requete: RequeteRetour, request: Request):
@@ -103,7 +148,8 @@ async def soumettre_retour(requete: RequeteRetour, request: Request):
 
             logger.info(f"[OK] Retour {id_retour} enregistré avec succès")
 
-            return ReponseRetour(
+            # Données internes de confiance (id AUTO_INCREMENT) ; FastAPI revalide via response_model
+            return ReponseRetour.model_construct(
                 id_retour=id_retour,
                 message="Merci pour votre retour ! Il nous aidera à améliorer le service."
             )
@@ -227,7 +273,7 @@ async def obtenir_stats_retours(request: Request):
     try:
         logger.debug("Récupération des statistiques des retours")
 
-        stats = obtenir_statistiques_retours()
+        stats = await obtenir_statistiques_retours_async()
 
         logger.debug(f"Statistiques calculées : {stats['total_retours']} retours")
 
@@ -241,14 +287,17 @@ async def obtenir_stats_retours(request: Request):
         )
 
 
-@router.get("/retours/par-note", response_model=List[dict])
+@router.get("/retours/par-note", response_model=List[RetourListe])
 @limiter.limit("100/minute")
 async def obtenir_retours_filtres_note(
     note_min: int = 1,
     note_max: int = 5,
     limite: int = 100,
-    offset: int = 0,
-    request: Request = None
+    avant_date: Optional[datetime] = None,
+    avant_id: Optional[int] = None,
+    disposition: Literal["lignes", "colonnes"] = "lignes",
+    request: Request = None,
+    response: Response = None
 ):
     """
     Récupère les retours filtrés par note.
@@ -257,8 +306,11 @@ async def obtenir_retours_filtres_note(
         note_min: Note minimale (1-5)
         note_max: Note maximale (1-5)
         limite: Nombre maximum de résultats
-        offset: Décalage pour pagination
+        avant_date: Curseur de pagination (en-tête X-Curseur-Avant-Date de la page précédente)
+        avant_id: Curseur de pagination (en-tête X-Curseur-Avant-Id de la page précédente)
+        disposition: "lignes" (liste d'objets) ou "colonnes" (une liste par champ)
         request: Objet Request FastAPI
+        response: Réponse FastAPI (en-têtes du curseur suivant)
 
     Returns:
         Liste des retours filtrés
@@ -275,7 +327,13 @@ async def obtenir_retours_filtres_note(
     try:
         logger.debug(f"Récupération retours avec note entre {note_min} et {note_max}")
 
-        retours = obtenir_retours_par_note(note_min, note_max, limite, offset)
+        retours, curseur_suivant = obtenir_retours_par_note(
+            note_min, note_max, limite, avant_date, avant_id
+        )
+        if disposition == "colonnes":
+            return _reponse_colonnes(retours, curseur_suivant)
+
+        _exposer_curseur(response, curseur_suivant)
 
         logger.debug(f"{len(retours)} retour(s) trouvé(s)")
 
@@ -295,13 +353,16 @@ async def obtenir_retours_filtres_note(
         )
 
 
-@router.get("/retours/par-statut/{statut}", response_model=List[dict])
+@router.get("/retours/par-statut/{statut}", response_model=List[RetourListe])
 @limiter.limit("100/minute")
 async def obtenir_retours_filtres_statut(
     statut: str,
     limite: int = 100,
-    offset: int = 0,
-    request: Request = None
+    avant_date: Optional[datetime] = None,
+    avant_id: Optional[int] = None,
+    disposition: Literal["lignes", "colonnes"] = "lignes",
+    request: Request = None,
+    response: Response = None
 ):
     """
     Récupère les retours filtrés par statut.
@@ -309,8 +370,11 @@ async def obtenir_retours_filtres_statut(
     Args:
         statut: Statut du retour ('nouveau', 'en_cours', 'traite', 'ignore')
         limite: Nombre maximum de résultats
-        offset: Décalage pour pagination
+        avant_date: Curseur de pagination (en-tête X-Curseur-Avant-Date de la page précédente)
+        avant_id: Curseur de pagination (en-tête X-Curseur-Avant-Id de la page précédente)
+        disposition: "lignes" (liste d'objets) ou "colonnes" (une liste par champ)
         request: Objet Request FastAPI
+        response: Réponse FastAPI (en-têtes du curseur suivant)
 
     Returns:
         Liste des retours filtrés
@@ -327,7 +391,13 @@ async def obtenir_retours_filtres_statut(
     try:
         logger.debug(f"Récupération retours avec statut '{statut}'")
 
-        retours = obtenir_retours_par_statut(statut, limite, offset)
+        retours, curseur_suivant = obtenir_retours_par_statut(
+            statut, limite, avant_date, avant_id
+        )
+        if disposition == "colonnes":
+            return _reponse_colonnes(retours, curseur_suivant)
+
+        _exposer_curseur(response, curseur_suivant)
 
         logger.debug(f"{len(retours)} retour(s) trouvé(s)")
 
@@ -347,13 +417,16 @@ async def obtenir_retours_filtres_statut(
         )
 
 
-@router.get("/retours/par-categorie/{categorie}", response_model=List[dict])
+@router.get("/retours/par-categorie/{categorie}", response_model=List[RetourListe])
 @limiter.limit("100/minute")
 async def obtenir_retours_filtres_categorie(
     categorie: str,
     limite: int = 100,
-    offset: int = 0,
-    request: Request = None
+    avant_date: Optional[datetime] = None,
+    avant_id: Optional[int] = None,
+    disposition: Literal["lignes", "colonnes"] = "lignes",
+    request: Request = None,
+    response: Response = None
 ):
     """
     Récupère les retours filtrés par catégorie de problème.
@@ -361,8 +434,11 @@ async def obtenir_retours_filtres_categorie(
     Args:
         categorie: Catégorie du problème
         limite: Nombre maximum de résultats
-        offset: Décalage pour pagination
+        avant_date: Curseur de pagination (en-tête X-Curseur-Avant-Date de la page précédente)
+        avant_id: Curseur de pagination (en-tête X-Curseur-Avant-Id de la page précédente)
+        disposition: "lignes" (liste d'objets) ou "colonnes" (une liste par champ)
         request: Objet Request FastAPI
+        response: Réponse FastAPI (en-têtes du curseur suivant)
 
     Returns:
         Liste des retours filtrés
@@ -379,7 +455,13 @@ async def obtenir_retours_filtres_categorie(
     try:
         logger.debug(f"Récupération retours avec catégorie '{categorie}'")
 
-        retours = obtenir_retours_par_categorie(categorie, limite, offset)
+        retours, curseur_suivant = obtenir_retours_par_categorie(
+            categorie, limite, avant_date, avant_id
+        )
+        if disposition == "colonnes":
+            return _reponse_colonnes(retours, curseur_suivant)
+
+        _exposer_curseur(response, curseur_suivant)
 
         logger.debug(f"{len(retours)} retour(s) trouvé(s)")
 
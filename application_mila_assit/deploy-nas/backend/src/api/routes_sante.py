@@ -5,13 +5,15 @@ Fournit des endpoints pour vérifier l'état de l'application
 et obtenir des statistiques de performance.
 """
 
+import asyncio
+
 import psutil
 from fastapi import APIRouter, Request, HTTPException, status
 from src.modeles.metrique import ReponseSante, ReponseMetriques, StatutSante
 from src.base_donnees.connexion import obtenir_connexion
 from src.base_donnees.requetes_metriques import (
-    obtenir_latence_moyenne,
-    obtenir_taux_cache_hit
+    obtenir_latence_moyenne_async,
+    obtenir_taux_cache_hit_async
 )
 from src.utilitaires.logger import obtenir_logger
 from src.utilitaires.exceptions import ErreurBaseDeDonnees
@@ -57,7 +59,7 @@ async def verifier_sante(request: Request):
         from src.clients.llm_client import obtenir_llm_client
 
         llm_client = obtenir_llm_client()
-        health_c3 = llm_client.healthcheck()
+        health_c3 = await llm_client.healthcheck_async()
 
         if health_c3.get("statut") == "healthy":
             composants["container_3_llm_faiss"] = "healthy"
@@ -122,9 +124,11 @@ async def obtenir_metriques(periode: str = "24h"):
         )
 
     try:
-        # Obtenir les métriques depuis la base de données
-        latence_moy = obtenir_latence_moyenne(periode=periode)
-        taux_cache = obtenir_taux_cache_hit(periode=periode)
+        # Obtenir les métriques depuis la base de données (requêtes concurrentes)
+        latence_moy, taux_cache = await asyncio.gather(
+            obtenir_latence_moyenne_async(periode=periode),
+            obtenir_taux_cache_hit_async(periode=periode)
+        )
 
         # Calculer l'utilisation RAM
         process = psutil.Process()
@@ -136,8 +140,9 @@ async def obtenir_metriques(periode: str = "24h"):
         p95 = int(latence_moy * 1.8)  # Approximation
         p99 = int(latence_moy * 2.5)  # Approximation
 
-        # Construire la réponse
-        reponse = ReponseMetriques(
+        # Construire la réponse (données internes de confiance : MySQL, psutil ;
+        # FastAPI revalide via response_model)
+        reponse = ReponseMetriques.model_construct(
             latence_moyenne_ms=latence_moy,
             latence_p95_ms=p95,
             latence_p99_ms=p99,
@@ -5,14 +5,22 @@ Gère un pool de connexions MySQL pour optimiser les performances
 et la gestion des ressources.
 """
 
+import asyncio
 import logging
+import os
+import threading
 import time
-from typing import Optional
+from collections import OrderedDict, namedtuple
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import List, Optional, Tuple
 from contextlib import contextmanager
 
 import mysql.connector
 from mysql.connector import Error as MySQLError
+from mysql.connector.errors import PoolError
 from mysql.connector.pooling import MySQLConnectionPool
+from prometheus_client import Counter, Gauge, Histogram
 
 from src.utilitaires.config import obtenir_config
 from src.utilitaires.exceptions import ErreurConnexionBD, ErreurBaseDeDonnees
@@ -24,11 +32,153 @@ from src.utilitaires.exceptions import ErreurConnexionBD, ErreurBaseDeDonnees
 settings = obtenir_config()
 logger = logging.getLogger(__name__)
 
+# Tables pré-agrégées du dashboard (*_stats, metriques_rollup_horaire) :
+# rafraîchies toutes les 60 s par l'event evt_rafraichir_statistiques
+# (mysql/init.sql). Une ligne plus ancienne que AGE_MAX_STATS_SECONDES
+# (event scheduler arrêté, base restaurée) n'est pas servie : les requêtes
+# recalculent alors à la volée.
+INTERVALLE_RAFRAICHISSEMENT_STATS_SECONDES = 60
+AGE_MAX_STATS_SECONDES = 2 * INTERVALLE_RAFRAICHISSEMENT_STATS_SECONDES
+
 # ============================================================================
 # Pool de connexions global
 # ============================================================================
 
 _pool: Optional[MySQLConnectionPool] = None
+_pool_lock = threading.Lock()
+
+# Durée de vie maximale d'une connexion du pool (secondes). Le pool
+# mysql-connector n'a pas de pool_recycle : obtenir_connexion() reconnecte
+# les connexions plus anciennes, avant que le wait_timeout MySQL ou un
+# équipement réseau ne les coupe silencieusement.
+DUREE_VIE_CONNEXION_SECONDES = 3500
+
+# Délai maximal d'établissement d'une connexion TCP vers MySQL (secondes)
+DELAI_CONNEXION_SECONDES = 10
+
+# Pool épuisé : mysql-connector lève PoolError immédiatement. Hors boucle
+# d'événements (tâches de fond, asyncio.to_thread, scripts), on attend
+# qu'une connexion soit rendue (comme un pool bloquant) jusqu'à ce délai.
+DELAI_ATTENTE_POOL_SECONDES = 5.0
+PAUSE_ATTENTE_POOL_MAX_SECONDES = 0.1
+
+# Nombre maximal d'instructions préparées conservées par connexion
+TAILLE_CACHE_PREPARES = 32
+
+
+# ============================================================================
+# Métriques Prometheus du pool
+# ============================================================================
+
+METRIQUE_POOL_TAILLE = Gauge(
+    'mysql_pool_size',
+    "Taille configurée du pool de connexions MySQL"
+)
+METRIQUE_POOL_EMPRUNTEES = Gauge(
+    'mysql_pool_checked_out',
+    "Nombre de connexions actuellement empruntées au pool"
+)
+METRIQUE_POOL_DEMANDES = Counter(
+    'mysql_pool_requested_total',
+    "Nombre de demandes de connexion au pool"
+)
+METRIQUE_POOL_ACQUISES = Counter(
+    'mysql_pool_acquired_total',
+    "Nombre de connexions obtenues depuis le pool"
+)
+METRIQUE_POOL_ECHECS = Counter(
+    'mysql_pool_acquire_failed_total',
+    "Nombre de demandes de connexion échouées (pool épuisé, MySQL injoignable...)"
+)
+METRIQUE_POOL_DUREE_ACQUISITION = Histogram(
+    'mysql_pool_acquire_seconds',
+    "Durée d'obtention d'une connexion depuis le pool (secondes)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+
+def _compter_connexions_empruntees() -> int:
+    """
+    Calcule le nombre de connexions empruntées à partir de la file interne du pool.
+
+    Returns:
+        Nombre de connexions hors du pool (0 si le pool n'existe pas)
+    """
+    pool = _pool
+    if pool is None:
+        return 0
+    return pool.pool_size - pool._cnx_queue.qsize()
+
+
+METRIQUE_POOL_EMPRUNTEES.set_function(_compter_connexions_empruntees)
+
+METRIQUE_DUREE_DETENTION = Histogram(
+    'mysql_connection_hold_seconds',
+    "Durée de détention d'une connexion MySQL par endpoint (secondes)",
+    ['endpoint'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+
+# Endpoint en cours de traitement (renseigné par le middleware de logging)
+# pour attribuer la durée de détention des connexions à la bonne route
+endpoint_courant: ContextVar[str] = ContextVar('endpoint_courant', default='hors_requete')
+
+
+# ============================================================================
+# Dimensionnement du pool
+# ============================================================================
+
+# Taille maximale autorisée par mysql-connector (pooling.CNX_POOL_MAXSIZE)
+TAILLE_POOL_MAX = 32
+
+# Nombre de disques effectifs de la formule (1 pour un SSD / volume NAS unique)
+NOMBRE_DISQUES_EFFECTIFS = 1
+
+
+def calculer_taille_pool(max_connexions_serveur: Optional[int] = None) -> int:
+    """
+    Calcule une taille de pool adaptée à la machine.
+
+    Formule : min(max_connections / 4, 2 * nb_cpu + nb_disques_effectifs),
+    bornée entre 1 et TAILLE_POOL_MAX. Un pool surdimensionné dégrade les
+    performances de MySQL, un pool sous-dimensionné fait attendre les requêtes.
+
+    Args:
+        max_connexions_serveur: Valeur de max_connections côté MySQL (si connue)
+
+    Returns:
+        Taille de pool recommandée
+    """
+    taille = 2 * (os.cpu_count() or 1) + NOMBRE_DISQUES_EFFECTIFS
+
+    if max_connexions_serveur:
+        taille = min(taille, max_connexions_serveur // 4)
+
+    return max(1, min(taille, TAILLE_POOL_MAX))
+
+
+def _lire_max_connexions(connexion_config: dict) -> int:
+    """
+    Lit la variable max_connections du serveur MySQL.
+
+    Args:
+        connexion_config: Paramètres de connexion (host, user, password...)
+
+    Returns:
+        Valeur de max_connections
+
+    Raises:
+        MySQLError: Si le serveur est injoignable
+    """
+    connexion = mysql.connector.connect(**connexion_config)
+    try:
+        curseur = connexion.cursor()
+        curseur.execute("SHOW VARIABLES LIKE 'max_connections'")
+        ligne = curseur.fetchone()
+        curseur.close()
+        return int(ligne[1]) if ligne else 0
+    finally:
+        connexion.close()
 
 
 def creer_pool_connexions(max_retries: int = 30, retry_delay: int = 2) -> MySQLConnectionPool:
@@ -47,10 +197,7 @@ def creer_pool_connexions(max_retries: int = 30, retry_delay: int = 2) -> MySQLC
     """
     logger.info("Création du pool de connexions MySQL...")
 
-    pool_config = {
-        'pool_name': settings.MYSQL_POOL_NAME,
-        'pool_size': settings.MYSQL_POOL_SIZE,
-        'pool_reset_session': True,
+    connexion_config = {
         'host': settings.MYSQL_HOST,
         'port': settings.MYSQL_PORT,
         'database': settings.MYSQL_DATABASE,
@@ -61,16 +208,38 @@ def creer_pool_connexions(max_retries: int = 30, retry_delay: int = 2) -> MySQLC
         'autocommit': False,
         'use_unicode': True,
         'get_warnings': True,
+        'connection_timeout': DELAI_CONNEXION_SECONDES,
+        # Compression zlib du protocole : moins d'octets pour les gros
+        # résultats (texte répétitif), au prix de CPU des deux côtés
+        'compress': settings.MYSQL_COMPRESSION,
     }
 
     last_error = None
 
     for attempt in range(1, max_retries + 1):
         try:
-            pool = mysql.connector.pooling.MySQLConnectionPool(**pool_config)
+            taille_pool = settings.MYSQL_POOL_SIZE
+            if taille_pool is None:
+                max_connexions = _lire_max_connexions(connexion_config)
+                taille_pool = calculer_taille_pool(max_connexions)
+                logger.info(
+                    f"Taille du pool calculée: {taille_pool} "
+                    f"(cpu={os.cpu_count()}, max_connections={max_connexions})"
+                )
+
+            pool = mysql.connector.pooling.MySQLConnectionPool(
+                pool_name=settings.MYSQL_POOL_NAME,
+                pool_size=taille_pool,
+                # Pas de COM_RESET_CONNECTION au retour dans le pool : il
+                # détruirait les instructions préparées de executer_prepare().
+                # obtenir_connexion() annule la transaction laissée ouverte.
+                pool_reset_session=False,
+                **connexion_config
+            )
+            METRIQUE_POOL_TAILLE.set(taille_pool)
 
             logger.info(
-                f"[OK] Pool MySQL créé: {settings.MYSQL_POOL_SIZE} connexions "
+                f"[OK] Pool MySQL créé: {taille_pool} connexions "
                 f"({settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DATABASE})"
             )
 
@@ -99,6 +268,10 @@ def obtenir_pool() -> MySQLConnectionPool:
     """
     Obtient le pool de connexions global (crée-le si nécessaire).
 
+    La création est protégée par un verrou : si plusieurs threads appellent
+    cette fonction simultanément au démarrage (lifespan + healthcheck),
+    un seul pool est créé.
+
     Returns:
         Pool de connexions MySQL
 
@@ -108,7 +281,9 @@ def obtenir_pool() -> MySQLConnectionPool:
     global _pool
 
     if _pool is None:
-        _pool = creer_pool_connexions()
+        with _pool_lock:
+            if _pool is None:
+                _pool = creer_pool_connexions()
 
     return _pool
 
@@ -122,20 +297,119 @@ def fermer_pool() -> None:
     """
     global _pool
 
-    if _pool is not None:
-        logger.info("Fermeture du pool de connexions MySQL...")
+    with _pool_lock:
+        if _pool is not None:
+            logger.info("Fermeture du pool de connexions MySQL...")
+
+            # Note: mysql.connector.pooling.MySQLConnectionPool n'a pas de méthode close()
+            # Les connexions sont automatiquement fermées lors de la destruction de l'objet
+
+            _pool = None
+            METRIQUE_POOL_TAILLE.set(0)
+            logger.info("[OK] Pool MySQL fermé")
+
+
+def _recycler_si_expiree(connexion) -> None:
+    """
+    Reconnecte une connexion du pool si elle dépasse DUREE_VIE_CONNEXION_SECONDES.
+
+    L'instant d'ouverture est mémorisé sur la connexion sous-jacente
+    (``connexion._cnx``), qui survit aux allers-retours dans le pool.
+
+    Args:
+        connexion: Connexion obtenue via pool.get_connection()
+    """
+    cnx = connexion._cnx
+    maintenant = time.monotonic()
+    creation = getattr(cnx, '_mila_creation', None)
+
+    if creation is None:
+        cnx._mila_creation = maintenant
+    elif maintenant - creation > DUREE_VIE_CONNEXION_SECONDES:
+        logger.debug("Connexion MySQL expirée, reconnexion")
+        cnx.reconnect(attempts=1)
+        cnx._mila_creation = time.monotonic()
 
-        # Note: mysql.connector.pooling.MySQLConnectionPool n'a pas de méthode close()
-        # Les connexions sont automatiquement fermées lors de la destruction de l'objet
 
-        _pool = None
-        logger.info("[OK] Pool MySQL fermé")
+def _definir_autocommit(connexion, actif: bool) -> bool:
+    """
+    Place la connexion en autocommit (ou non) sans aller-retour inutile.
+
+    Avec mysql-connector, lire ``connexion.autocommit`` interroge le serveur
+    et l'écrire envoie un SET. L'état courant est donc mémorisé sur la
+    connexion sous-jacente : le SET n'est envoyé que lorsque l'état change,
+    c'est-à-dire quand une connexion passe d'un usage lecture à un usage
+    écriture (ou l'inverse). Une connexion rouverte repart de connexion_config
+    (autocommit=False).
 
+    Args:
+        connexion: Connexion obtenue via pool.get_connection()
+        actif: True pour l'autocommit (lectures pures)
 
-def obtenir_connexion() -> mysql.connector.MySQLConnection:
+    Returns:
+        L'état autocommit précédent
+    """
+    cnx = connexion._cnx
+
+    if getattr(cnx, '_mila_autocommit_id', None) != cnx.connection_id:
+        cnx._mila_autocommit = False
+        cnx._mila_autocommit_id = cnx.connection_id
+
+    precedent = cnx._mila_autocommit
+    if precedent != actif:
+        connexion.autocommit = actif
+        cnx._mila_autocommit = actif
+
+    return precedent
+
+
+def _emprunter_connexion(pool: MySQLConnectionPool, echeance: float):
+    """
+    Emprunte une connexion au pool en attendant si toutes sont occupées.
+
+    Sur le thread de la boucle d'événements (routes async appelant la couche
+    synchrone), aucune attente : un time.sleep y gèlerait tout le worker
+    uvicorn (health checks, streaming). L'épuisement échoue alors
+    immédiatement.
+
+    Args:
+        pool: Pool de connexions
+        echeance: Instant (perf_counter) au-delà duquel on abandonne
+
+    Returns:
+        Connexion du pool
+
+    Raises:
+        PoolError: Si aucune connexion n'a été rendue avant l'échéance
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass  # Pas de boucle en cours sur ce thread : attente possible
+    else:
+        return pool.get_connection()
+
+    pause = 0.005
+
+    while True:
+        try:
+            return pool.get_connection()
+        except PoolError:
+            if time.perf_counter() + pause > echeance:
+                raise
+            time.sleep(pause)
+            pause = min(pause * 2, PAUSE_ATTENTE_POOL_MAX_SECONDES)
+
+
+def obtenir_connexion(lecture_seule: bool = False) -> mysql.connector.MySQLConnection:
     """
     Obtient une connexion depuis le pool.
 
+    Args:
+        lecture_seule: Si True, la connexion est rendue en autocommit : chaque
+            SELECT est sa propre transaction et rien ne reste ouvert à annuler.
+            Si False (défaut), autocommit=False pour les écritures avec commit.
+
     Returns:
         Connexion MySQL
 
@@ -149,10 +423,19 @@ def obtenir_connexion() -> mysql.connector.MySQLConnection:
         >>> result = cursor.fetchone()
         >>> cursor.close()
         >>> conn.close()  # Retourne la connexion au pool
+
+    Note:
+        Chaque appel incrémente exactement une fois ``mysql_pool_requested_total``
+        puis exactement une fois ``mysql_pool_acquired_total`` ou
+        ``mysql_pool_acquire_failed_total``, quelle que soit l'issue.
     """
+    debut = time.perf_counter()
+    METRIQUE_POOL_DEMANDES.inc()
+    acquise = False
+
     try:
         pool = obtenir_pool()
-        connexion = pool.get_connection()
+        connexion = _emprunter_connexion(pool, debut + DELAI_ATTENTE_POOL_SECONDES)
 
         if not connexion.is_connected():
             raise ErreurConnexionBD(
@@ -161,6 +444,17 @@ def obtenir_connexion() -> mysql.connector.MySQLConnection:
                 raison="Connexion non active après récupération depuis le pool"
             )
 
+        _recycler_si_expiree(connexion)
+
+        # Transaction laissée ouverte par l'emprunteur précédent (SELECT sans
+        # commit...) : l'annuler pour ne pas hériter de son snapshot InnoDB.
+        # in_transaction vient du dernier statut serveur, sans aller-retour.
+        if connexion.in_transaction:
+            connexion.rollback()
+
+        _definir_autocommit(connexion, lecture_seule)
+
+        acquise = True
         return connexion
 
     except MySQLError as e:
@@ -171,12 +465,23 @@ def obtenir_connexion() -> mysql.connector.MySQLConnection:
             raison=str(e)
         )
 
+    finally:
+        METRIQUE_POOL_DUREE_ACQUISITION.observe(time.perf_counter() - debut)
+        if acquise:
+            METRIQUE_POOL_ACQUISES.inc()
+        else:
+            METRIQUE_POOL_ECHECS.inc()
+
 
 @contextmanager
-def obtenir_connexion_context():
+def obtenir_connexion_context(lecture_seule: bool = False):
     """
     Context manager pour obtenir et libérer automatiquement une connexion.
 
+    Args:
+        lecture_seule: Si True, connexion en autocommit (voir obtenir_connexion).
+            Réservé aux requêtes sans écriture.
+
     Yields:
         Connexion MySQL
 
@@ -191,20 +496,58 @@ def obtenir_connexion_context():
         ...     cursor.close()
         ... # La connexion est automatiquement retournée au pool
     """
-    connexion = obtenir_connexion()
+    connexion = obtenir_connexion(lecture_seule)
+    debut = time.perf_counter()
 
     try:
         yield connexion
     finally:
         if connexion.is_connected():
             connexion.close()  # Retourne la connexion au pool
+        _controler_duree_detention(debut)
 
 
 @contextmanager
-def obtenir_curseur():
+def mode_lecture_seule(connexion):
+    """
+    Passe temporairement une connexion en autocommit pour des lectures pures.
+
+    Le pool ouvre les connexions avec autocommit=False : chaque SELECT ouvre
+    alors une transaction implicite dont la vue InnoDB (snapshot MVCC) reste
+    ouverte jusqu'au retour de la connexion au pool, retardant la purge.
+    En autocommit, chaque SELECT est sa propre transaction en lecture seule.
+
+    Préférer ``obtenir_connexion(lecture_seule=True)`` au moment de l'emprunt :
+    ce context manager restaure l'état initial en sortie, soit un SET de plus.
+
+    Args:
+        connexion: Connexion MySQL obtenue depuis le pool
+
+    Yields:
+        La même connexion, en autocommit
+    """
+    autocommit_initial = _definir_autocommit(connexion, True)
+
+    try:
+        yield connexion
+    finally:
+        if connexion.is_connected():
+            _definir_autocommit(connexion, autocommit_initial)
+
+
+@contextmanager
+def obtenir_curseur(dictionnaire: bool = True, lecture_seule: bool = False):
     """
     Context manager pour obtenir connexion + curseur et les libérer automatiquement.
 
+    Args:
+        dictionnaire: Si True, chaque ligne est un dict (une allocation par ligne).
+            Si False, les lignes sont des tuples : à combiner avec
+            lignes_nommees() pour un accès par attribut à moindre coût.
+        lecture_seule: Si True, connexion en autocommit (voir obtenir_connexion) :
+            ni transaction implicite ni rollback à l'emprunt suivant.
+            Réservé aux requêtes sans écriture.
+
     Yields:
         Tuple (connexion, curseur)
 
@@ -218,17 +561,118 @@ def obtenir_curseur():
         ...     print(f"Nombre d'entrées: {count}")
         ... # Curseur et connexion automatiquement fermés
     """
-    connexion = obtenir_connexion()
+    connexion = obtenir_connexion(lecture_seule)
+    debut = time.perf_counter()
     curseur = None
 
     try:
-        curseur = connexion.cursor(dictionary=True)
+        curseur = connexion.cursor(dictionary=dictionnaire)
         yield connexion, curseur
     finally:
         if curseur is not None:
             curseur.close()
         if connexion.is_connected():
             connexion.close()
+        _controler_duree_detention(debut)
+
+
+def executer_prepare(connexion, requete: str, params: tuple = ()):
+    """
+    Exécute une requête via une instruction préparée mise en cache sur la connexion.
+
+    Le premier appel pour un texte SQL donné envoie COM_STMT_PREPARE ; les
+    suivants, sur la même connexion physique (y compris après un aller-retour
+    dans le pool), n'envoient plus que COM_STMT_EXECUTE : MySQL ne ré-analyse
+    pas la requête. Le cache (LRU, TAILLE_CACHE_PREPARES entrées) est
+    invalidé si la connexion a été rouverte.
+
+    Args:
+        connexion: Connexion obtenue depuis le pool
+        requete: Requête SQL paramétrée (%s)
+        params: Paramètres de la requête
+
+    Returns:
+        Curseur préparé après execute() (lignes en tuples). Ne pas le fermer :
+        il reste en cache ; lire tous ses résultats avant la requête suivante.
+
+    Example:
+        >>> with obtenir_connexion_context() as conn:
+        ...     curseur = executer_prepare(conn, "SELECT note FROM retours_utilisateurs WHERE id = %s", (1,))
+        ...     lignes = curseur.fetchall()
+    """
+    cnx = connexion._cnx
+
+    cache = getattr(cnx, '_mila_prepares', None)
+    if cache is None or cnx._mila_prepares_id != cnx.connection_id:
+        cache = OrderedDict()
+        cnx._mila_prepares = cache
+        cnx._mila_prepares_id = cnx.connection_id
+
+    curseur = cache.get(requete)
+    if curseur is None:
+        curseur = connexion.cursor(prepared=True)
+        cache[requete] = curseur
+        if len(cache) > TAILLE_CACHE_PREPARES:
+            _, plus_ancien = cache.popitem(last=False)
+            plus_ancien.close()
+    else:
+        cache.move_to_end(requete)
+
+    curseur.execute(requete, params)
+    return curseur
+
+
+@lru_cache(maxsize=64)
+def _classe_ligne(colonnes: Tuple[str, ...]) -> type:
+    """Construit (une seule fois par liste de colonnes) la classe de ligne nommée."""
+    return namedtuple('Ligne', colonnes)
+
+
+def lignes_nommees(curseur) -> List[tuple]:
+    """
+    Récupère toutes les lignes d'un curseur tuple sous forme de namedtuples.
+
+    La classe de ligne est construite une fois par liste de colonnes, puis
+    chaque ligne n'est qu'un tuple (pas de dict ni de clés recopiées).
+    Utiliser ``ligne._asdict()`` si un dictionnaire est réellement nécessaire.
+
+    Args:
+        curseur: Curseur ouvert avec obtenir_curseur(dictionnaire=False),
+            après execute()
+
+    Returns:
+        Liste de namedtuples (attributs = noms des colonnes)
+
+    Example:
+        >>> with obtenir_curseur(dictionnaire=False) as (conn, cursor):
+        ...     cursor.execute("SELECT id, question FROM base_connaissances")
+        ...     for ligne in lignes_nommees(cursor):
+        ...         print(ligne.id, ligne.question)
+    """
+    Ligne = _classe_ligne(tuple(colonne[0] for colonne in curseur.description))
+    return list(map(Ligne._make, curseur.fetchall()))
+
+
+def _controler_duree_detention(debut: float) -> None:
+    """
+    Enregistre la durée de détention d'une connexion et alerte si elle dépasse le budget.
+
+    Une détention longue indique en général un curseur non fermé ou une
+    connexion gardée pendant un appel lent (ex: appel au Container 3).
+
+    Args:
+        debut: Instant (perf_counter) où la connexion a été obtenue
+    """
+    duree = time.perf_counter() - debut
+    endpoint = endpoint_courant.get()
+
+    METRIQUE_DUREE_DETENTION.labels(endpoint=endpoint).observe(duree)
+
+    if duree * 1000 > settings.MYSQL_CONNEXION_BUDGET_MS:
+        logger.warning(
+            f"[ATTENTION] Connexion MySQL détenue {duree * 1000:.0f}ms "
+            f"(budget: {settings.MYSQL_CONNEXION_BUDGET_MS}ms, endpoint: {endpoint})"
+        )
 
 
 def verifier_connexion() -> bool:
@@ -245,7 +689,7 @@ def verifier_connexion() -> bool:
         ...     print("MySQL KO")
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
             cursor.execute("SELECT 1")
             result = cursor.fetchone()
 
@@ -273,7 +717,7 @@ def obtenir_info_bd() -> dict:
         '8.0.33'
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
             # Version MySQL
             cursor.execute("SELECT VERSION() as version")
             version_result = cursor.fetchone()
@@ -303,7 +747,7 @@ def obtenir_info_bd() -> dict:
                 'host': settings.MYSQL_HOST,
                 'port': settings.MYSQL_PORT,
                 'charset': settings.MYSQL_CHARSET,
-                'pool_size': settings.MYSQL_POOL_SIZE
+                'pool_size': obtenir_pool().pool_size
             }
 
     except Exception as e:
@@ -369,11 +813,17 @@ __all__ = [
     'obtenir_connexion',
     'obtenir_connexion_context',
     'obtenir_curseur',
+    'mode_lecture_seule',
+    'executer_prepare',
+    'lignes_nommees',
     'verifier_connexion',
     'obtenir_info_bd',
     'initialiser_connexions',
     'fermer_connexions',
     'creer_pool_connexions',
     'obtenir_pool',
-    'fermer_pool'
+    'fermer_pool',
+    'calculer_taille_pool',
+    'endpoint_courant',
+    'AGE_MAX_STATS_SECONDES'
 ]
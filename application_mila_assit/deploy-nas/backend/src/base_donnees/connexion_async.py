@@ -0,0 +1,200 @@
+"""
+Module de gestion des connexions MySQL asynchrones pour Mila-Assist.
+
+Pool aiomysql destiné aux endpoints FastAPI : une requête SQL en attente
+de réponse du serveur libère la boucle d'événements au lieu de bloquer
+le worker. L'API synchrone de connexion.py reste utilisée par les tâches
+de fond et les scripts.
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import aiomysql
+from pymysql import MySQLError
+
+from src.base_donnees.connexion import (
+    DELAI_CONNEXION_SECONDES,
+    _classe_ligne,
+    calculer_taille_pool
+)
+from src.utilitaires.config import obtenir_config
+from src.utilitaires.exceptions import ErreurConnexionBD
+
+# ============================================================================
+# Configuration
+# ============================================================================
+
+settings = obtenir_config()
+logger = logging.getLogger(__name__)
+
+# Durée de vie maximale d'une connexion du pool (secondes), inférieure
+# au wait_timeout MySQL par défaut (8h) pour éviter les connexions mortes
+POOL_RECYCLE_SECONDES = 3600
+
+# ============================================================================
+# Pool de connexions asynchrone global
+# ============================================================================
+
+_pool_async: Optional[aiomysql.Pool] = None
+_pool_async_lock = asyncio.Lock()
+
+
+async def creer_pool_async() -> aiomysql.Pool:
+    """
+    Crée le pool de connexions aiomysql.
+
+    Returns:
+        Pool de connexions asynchrone
+
+    Raises:
+        ErreurConnexionBD: Si le pool ne peut pas être créé
+    """
+    taille_pool = settings.MYSQL_POOL_SIZE or calculer_taille_pool()
+
+    logger.info("Création du pool de connexions MySQL asynchrone...")
+
+    try:
+        pool = await aiomysql.create_pool(
+            host=settings.MYSQL_HOST,
+            port=settings.MYSQL_PORT,
+            db=settings.MYSQL_DATABASE,
+            user=settings.MYSQL_USER,
+            password=settings.MYSQL_PASSWORD,
+            charset=settings.MYSQL_CHARSET,
+            autocommit=False,
+            connect_timeout=DELAI_CONNEXION_SECONDES,
+            minsize=1,
+            maxsize=taille_pool,
+            pool_recycle=POOL_RECYCLE_SECONDES
+        )
+
+        logger.info(
+            f"[OK] Pool MySQL asynchrone créé: {taille_pool} connexions max "
+            f"({settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DATABASE})"
+        )
+
+        return pool
+
+    except MySQLError as e:
+        logger.error(f"[ERREUR] Échec de création du pool asynchrone: {e}")
+        raise ErreurConnexionBD(
+            host=settings.MYSQL_HOST,
+            database=settings.MYSQL_DATABASE,
+            raison=str(e)
+        )
+
+
+async def obtenir_pool_async() -> aiomysql.Pool:
+    """
+    Obtient le pool asynchrone global (le crée si nécessaire).
+
+    Returns:
+        Pool de connexions asynchrone
+
+    Raises:
+        ErreurConnexionBD: Si le pool ne peut pas être créé
+    """
+    global _pool_async
+
+    if _pool_async is None:
+        async with _pool_async_lock:
+            if _pool_async is None:
+                _pool_async = await creer_pool_async()
+
+    return _pool_async
+
+
+async def fermer_pool_async() -> None:
+    """
+    Ferme le pool asynchrone et attend la fermeture de toutes ses connexions.
+
+    À appeler à l'arrêt de l'application (shutdown du lifespan FastAPI).
+    """
+    global _pool_async
+
+    async with _pool_async_lock:
+        if _pool_async is not None:
+            logger.info("Fermeture du pool de connexions MySQL asynchrone...")
+            _pool_async.close()
+            await _pool_async.wait_closed()
+            _pool_async = None
+            logger.info("[OK] Pool MySQL asynchrone fermé")
+
+
+@asynccontextmanager
+async def obtenir_curseur_async(dictionnaire: bool = True, lecture_seule: bool = False):
+    """
+    Context manager asynchrone pour obtenir connexion + curseur.
+
+    Args:
+        dictionnaire: Si True, chaque ligne est un dict, sinon un tuple
+        lecture_seule: Si True, connexion en autocommit. Sans cela, un SELECT
+            laisse une transaction ouverte et aiomysql ferme la connexion au
+            lieu de la rendre au pool. Réservé aux requêtes sans écriture.
+
+    Yields:
+        Tuple (connexion, curseur)
+
+    Raises:
+        ErreurConnexionBD: Si aucune connexion n'est disponible
+
+    Example:
+        >>> async with obtenir_curseur_async(lecture_seule=True) as (conn, cursor):
+        ...     await cursor.execute("SELECT COUNT(*) AS total FROM base_connaissances")
+        ...     resultat = await cursor.fetchone()
+        ... # Curseur fermé et connexion rendue au pool
+    """
+    pool = await obtenir_pool_async()
+
+    try:
+        connexion = await pool.acquire()
+    except MySQLError as e:
+        logger.error(f"[ERREUR] Échec d'obtention de connexion asynchrone: {e}")
+        raise ErreurConnexionBD(
+            host=settings.MYSQL_HOST,
+            database=settings.MYSQL_DATABASE,
+            raison=str(e)
+        )
+
+    try:
+        # get_autocommit() lit l'état local du driver : le SET n'est envoyé
+        # que si la connexion change d'usage (lecture / écriture)
+        if connexion.get_autocommit() != lecture_seule:
+            await connexion.autocommit(lecture_seule)
+
+        classe_curseur = aiomysql.DictCursor if dictionnaire else aiomysql.Cursor
+        async with connexion.cursor(classe_curseur) as curseur:
+            yield connexion, curseur
+    finally:
+        pool.release(connexion)
+
+
+async def lignes_nommees_async(curseur) -> List[tuple]:
+    """
+    Équivalent asynchrone de lignes_nommees() pour un curseur aiomysql tuple.
+
+    Args:
+        curseur: Curseur ouvert avec obtenir_curseur_async(dictionnaire=False),
+            après execute()
+
+    Returns:
+        Liste de namedtuples (partage les classes de ligne du module synchrone)
+    """
+    Ligne = _classe_ligne(tuple(colonne[0] for colonne in curseur.description))
+    return list(map(Ligne._make, await curseur.fetchall()))
+
+
+# ============================================================================
+# Export
+# ============================================================================
+
+__all__ = [
+    'creer_pool_async',
+    'obtenir_pool_async',
+    'fermer_pool_async',
+    'obtenir_curseur_async',
+    'lignes_nommees_async'
+]
@@ -4,16 +4,60 @@ Requêtes MySQL pour la table base_connaissances.
 Gère toutes les interactions avec la base de connaissances.
 """
 
+import json
 import logging
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
 
-from src.base_donnees.connexion import obtenir_curseur
+from src.base_donnees.connexion import obtenir_curseur, lignes_nommees, AGE_MAX_STATS_SECONDES
+from src.base_donnees.connexion_async import obtenir_curseur_async, lignes_nommees_async
 from src.utilitaires.exceptions import ErreurRequeteBD, ErreurEnregistrementIntrouvable
 
 logger = logging.getLogger(__name__)
 
+# Identifiant de remplissage (ne correspond à aucune entrée : id AUTO_INCREMENT >= 1)
+ID_REMPLISSAGE = -1
 
-def obtenir_reponses_par_ids(ids: List[int]) -> List[Dict]:
+
+def _taille_bucket(n: int) -> int:
+    """Arrondit n à la puissance de 2 supérieure (1, 2, 4, 8, 16...)."""
+    return 1 << (n - 1).bit_length()
+
+
+@lru_cache(maxsize=16)
+def _requete_reponses_par_ids(taille: int) -> str:
+    """
+    Construit (une fois par taille de bucket) la requête SELECT ... WHERE id IN (...).
+
+    Le nombre de placeholders ne dépend que du bucket : MySQL et le driver
+    voient un petit ensemble de textes SQL stables au lieu d'un texte par
+    longueur de liste.
+
+    Args:
+        taille: Nombre de placeholders (puissance de 2)
+
+    Returns:
+        Requête SQL paramétrée
+    """
+    placeholders = ', '.join(['%s'] * taille)
+
+    return f"""
+        SELECT
+            id,
+            etiquette,
+            question,
+            reponse,
+            contexte,
+            id_embedding,
+            date_creation,
+            date_modification
+        FROM base_connaissances
+        WHERE id IN ({placeholders})
+        ORDER BY FIELD(id, {placeholders})
+    """
+
+
+def obtenir_reponses_par_ids(ids: List[int]) -> List[tuple]:
     """
     Récupère les réponses de la base de connaissances par leurs IDs.
 
@@ -21,7 +65,7 @@ def obtenir_reponses_par_ids(ids: List[int]) -> List[Dict]:
         ids: Liste des IDs à récupérer
 
     Returns:
-        Liste de dictionnaires contenant les informations complètes
+        Liste de lignes nommées (namedtuple) contenant les informations complètes
 
     Raises:
         ErreurRequeteBD: Si la requête échoue
@@ -29,33 +73,58 @@ def obtenir_reponses_par_ids(ids: List[int]) -> List[Dict]:
     Example:
         >>> reponses = obtenir_reponses_par_ids([1, 2, 3])
         >>> for r in reponses:
-        ...     print(r['question'], r['reponse'])
+        ...     print(r.question, r.reponse)
     """
     if not ids:
         return []
 
     try:
-        with obtenir_curseur() as (conn, cursor):
-            # Créer les placeholders
-            placeholders = ', '.join(['%s'] * len(ids))
+        with obtenir_curseur(dictionnaire=False, lecture_seule=True) as (conn, cursor):
+            # Compléter la liste jusqu'à la taille du bucket
+            taille = _taille_bucket(len(ids))
+            ids_complets = list(ids) + [ID_REMPLISSAGE] * (taille - len(ids))
 
-            query = f"""
-                SELECT
-                    id,
-                    etiquette,
-                    question,
-                    reponse,
-                    contexte,
-                    id_embedding,
-                    date_creation,
-                    date_modification
-                FROM base_connaissances
-                WHERE id IN ({placeholders})
-                ORDER BY FIELD(id, {placeholders})
-            """
+            query = _requete_reponses_par_ids(taille)
 
-            cursor.execute(query, ids + ids)
-            results = cursor.fetchall()
+            cursor.execute(query, ids_complets + ids_complets)
+            results = lignes_nommees(cursor)
+
+            logger.info(f"[OK] {len(results)} réponses récupérées")
+            return results
+
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur récupération réponses: {e}")
+        raise ErreurRequeteBD(
+            requete=f"SELECT base_connaissances WHERE id IN ({ids[:3]}...)",
+            raison=str(e)
+        )
+
+
+async def obtenir_reponses_par_ids_async(ids: List[int]) -> List[tuple]:
+    """
+    Variante asynchrone de obtenir_reponses_par_ids() pour les endpoints FastAPI.
+
+    Args:
+        ids: Liste des IDs à récupérer
+
+    Returns:
+        Liste de lignes nommées (namedtuple), dans l'ordre des IDs
+
+    Raises:
+        ErreurRequeteBD: Si la requête échoue
+    """
+    if not ids:
+        return []
+
+    try:
+        async with obtenir_curseur_async(dictionnaire=False, lecture_seule=True) as (conn, cursor):
+            taille = _taille_bucket(len(ids))
+            ids_complets = list(ids) + [ID_REMPLISSAGE] * (taille - len(ids))
+
+            query = _requete_reponses_par_ids(taille)
+
+            await cursor.execute(query, ids_complets + ids_complets)
+            results = await lignes_nommees_async(cursor)
 
             logger.info(f"[OK] {len(results)} réponses récupérées")
             return results
@@ -68,20 +137,21 @@ def obtenir_reponses_par_ids(ids: List[int]) -> List[Dict]:
         )
 
 
-def obtenir_toutes_connaissances() -> List[Dict]:
+def obtenir_toutes_connaissances() -> List[Tuple]:
     """
     Récupère toutes les entrées de la base de connaissances.
 
-    Utilisé principalement pour la génération de l'index FAISS.
+    Utilisé principalement pour la génération de l'index FAISS. Chemin le plus
+    volumineux : les lignes sont retournées en tuples bruts, sans dict par ligne.
 
     Returns:
-        Liste de tous les enregistrements
+        Liste de tuples (id, etiquette, question, reponse, contexte, id_embedding)
 
     Raises:
         ErreurRequeteBD: Si la requête échoue
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(dictionnaire=False, lecture_seule=True) as (conn, cursor):
             query = """
                 SELECT
                     id,
@@ -108,7 +178,7 @@ def obtenir_toutes_connaissances() -> List[Dict]:
         )
 
 
-def obtenir_par_etiquette(etiquette: str) -> List[Dict]:
+def obtenir_par_etiquette(etiquette: str) -> List[tuple]:
     """
     Récupère toutes les entrées d'une étiquette donnée.
 
@@ -116,19 +186,27 @@ def obtenir_par_etiquette(etiquette: str) -> List[Dict]:
         etiquette: Tag à rechercher (ex: "salutations", "aide_tts")
 
     Returns:
-        Liste des entrées correspondantes
+        Liste des entrées correspondantes (namedtuples)
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(dictionnaire=False, lecture_seule=True) as (conn, cursor):
             query = """
-                SELECT *
+                SELECT
+                    id,
+                    etiquette,
+                    question,
+                    reponse,
+                    contexte,
+                    id_embedding,
+                    date_creation,
+                    date_modification
                 FROM base_connaissances
                 WHERE etiquette = %s
                 ORDER BY id
             """
 
             cursor.execute(query, (etiquette,))
-            results = cursor.fetchall()
+            results = lignes_nommees(cursor)
 
             logger.info(f"[OK] {len(results)} entrées trouvées pour '{etiquette}'")
             return results
@@ -145,11 +223,34 @@ def obtenir_statistiques() -> Dict:
     """
     Obtient des statistiques sur la base de connaissances.
 
+    Lit la ligne pré-agrégée de base_connaissances_stats si elle est récente,
+    sinon recalcule (dont le GROUP BY du top 5 des tags) à la volée.
+
     Returns:
         Dictionnaire avec les stats
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            cursor.execute("""
+                SELECT total, nb_tags, avec_embeddings, top_tags
+                FROM base_connaissances_stats
+                WHERE id = 1
+                AND date_calcul >= DATE_SUB(NOW(), INTERVAL %s SECOND)
+            """, (AGE_MAX_STATS_SECONDES,))
+            agregat = cursor.fetchone()
+
+            if agregat:
+                # JSON_ARRAYAGG ne garantit pas l'ordre : retrier par effectif
+                top_tags = json.loads(agregat['top_tags']) if agregat['top_tags'] else []
+                top_tags.sort(key=lambda tag: tag['count'], reverse=True)
+
+                return {
+                    'total': agregat['total'],
+                    'nb_tags': agregat['nb_tags'],
+                    'avec_embeddings': agregat['avec_embeddings'],
+                    'top_tags': top_tags
+                }
+
             stats = {}
 
             # Nombre total
@@ -183,6 +284,7 @@ def obtenir_statistiques() -> Dict:
 
 __all__ = [
     'obtenir_reponses_par_ids',
+    'obtenir_reponses_par_ids_async',
     'obtenir_toutes_connaissances',
     'obtenir_par_etiquette',
     'obtenir_statistiques'
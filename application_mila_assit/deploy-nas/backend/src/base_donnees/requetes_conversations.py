@@ -5,15 +5,53 @@ Gère l'historique des conversations utilisateur-chatbot.
 """
 
 import logging
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
-import json
 
-from src.base_donnees.connexion import obtenir_curseur
+import orjson
+
+from src.base_donnees.connexion import obtenir_curseur, AGE_MAX_STATS_SECONDES
+from src.base_donnees.connexion_async import obtenir_curseur_async
 from src.utilitaires.exceptions import ErreurRequeteBD, ErreurEnregistrementIntrouvable
 
 logger = logging.getLogger(__name__)
 
+def _normaliser_id_session(id_session) -> str:
+    """
+    Forme stockée d'un identifiant de session : UUID avec tirets.
+
+    Les sessions générées côté serveur arrivent en hexadécimal compact
+    (uuid4().hex), les clients envoient souvent la forme à tirets : les deux
+    sont ramenés à str(UUID) pour que la colonne n'ait qu'un format.
+    Un identifiant qui n'est pas un UUID (ex: "eval-...") est gardé tel quel.
+    """
+    if isinstance(id_session, UUID):
+        return str(id_session)
+    try:
+        return str(UUID(id_session))
+    except (ValueError, TypeError, AttributeError):
+        return str(id_session)
+
+
+# Requête d'insertion partagée par les variantes synchrone et asynchrone
+REQUETE_INSERTION_CONVERSATION = """
+    INSERT INTO conversations (
+        id_session,
+        question_utilisateur,
+        reponse_bot,
+        ids_connaissances_recuperees,
+        score_confiance,
+        temps_reponse_ms,
+        temps_embedding_ms,
+        temps_retrieval_ms,
+        temps_generation_ms,
+        cache_hit
+    ) VALUES (
+        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
+    )
+"""
+
 
 def inserer_conversation(
     id_session: UUID,
@@ -62,30 +100,13 @@ def inserer_conversation(
     """
     try:
         with obtenir_curseur() as (conn, cursor):
-            # Convertir UUID en string
-            id_session_str = str(id_session)
+            # Convertir UUID en string (forme à tirets)
+            id_session_str = _normaliser_id_session(id_session)
 
-            # Convertir la liste d'IDs en JSON
-            ids_kb_json = json.dumps(ids_kb) if ids_kb else None
+            # Convertir la liste d'IDs en JSON (str : MySQL refuse un JSON binaire)
+            ids_kb_json = orjson.dumps(ids_kb).decode() if ids_kb else None
 
-            query = """
-                INSERT INTO conversations (
-                    id_session,
-                    question_utilisateur,
-                    reponse_bot,
-                    ids_connaissances_recuperees,
-                    score_confiance,
-                    temps_reponse_ms,
-                    temps_embedding_ms,
-                    temps_retrieval_ms,
-                    temps_generation_ms,
-                    cache_hit
-                ) VALUES (
-                    %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                )
-            """
-
-            cursor.execute(query, (
+            cursor.execute(REQUETE_INSERTION_CONVERSATION, (
                 id_session_str,
                 question,
                 reponse,
@@ -115,6 +136,60 @@ def inserer_conversation(
         )
 
 
+async def inserer_conversation_async(
+    id_session: UUID,
+    question: str,
+    reponse: str,
+    ids_kb: Optional[List[int]] = None,
+    confiance: Optional[float] = None,
+    temps_ms: Optional[int] = None,
+    temps_embedding_ms: Optional[int] = None,
+    temps_retrieval_ms: Optional[int] = None,
+    temps_generation_ms: Optional[int] = None,
+    cache_hit: bool = False
+) -> int:
+    """
+    Variante asynchrone de inserer_conversation() pour les endpoints FastAPI.
+
+    Mêmes arguments et même valeur de retour que inserer_conversation().
+
+    Raises:
+        ErreurRequeteBD: Si l'insertion échoue
+    """
+    try:
+        async with obtenir_curseur_async() as (conn, cursor):
+            id_session_str = _normaliser_id_session(id_session)
+            ids_kb_json = orjson.dumps(ids_kb).decode() if ids_kb else None
+
+            await cursor.execute(REQUETE_INSERTION_CONVERSATION, (
+                id_session_str,
+                question,
+                reponse,
+                ids_kb_json,
+                confiance,
+                temps_ms,
+                temps_embedding_ms,
+                temps_retrieval_ms,
+                temps_generation_ms,
+                cache_hit
+            ))
+
+            await conn.commit()
+
+            id_conversation = cursor.lastrowid
+
+            logger.info(f"[OK] Conversation {id_conversation} insérée (session={id_session_str[:8]}...)")
+
+            return id_conversation
+
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur insertion conversation: {e}")
+        raise ErreurRequeteBD(
+            requete="INSERT INTO conversations",
+            raison=str(e)
+        )
+
+
 def obtenir_conversation(id_conversation: int) -> Dict:
     """
     Récupère une conversation par son ID.
@@ -130,9 +205,21 @@ def obtenir_conversation(id_conversation: int) -> Dict:
         ErreurRequeteBD: Si la requête échoue
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
             query = """
-                SELECT *
+                SELECT
+                    id,
+                    id_session,
+                    question_utilisateur,
+                    reponse_bot,
+                    ids_connaissances_recuperees,
+                    score_confiance,
+                    temps_reponse_ms,
+                    temps_embedding_ms,
+                    temps_retrieval_ms,
+                    temps_generation_ms,
+                    cache_hit,
+                    date_creation
                 FROM conversations
                 WHERE id = %s
             """
@@ -148,7 +235,7 @@ def obtenir_conversation(id_conversation: int) -> Dict:
 
             # Parser le JSON des IDs KB
             if result.get('ids_connaissances_recuperees'):
-                result['ids_connaissances_recuperees'] = json.loads(
+                result['ids_connaissances_recuperees'] = orjson.loads(
                     result['ids_connaissances_recuperees']
                 )
 
@@ -167,41 +254,82 @@ def obtenir_conversation(id_conversation: int) -> Dict:
 
 def obtenir_conversations_session(
     id_session: UUID,
-    limite: int = 10
-) -> List[Dict]:
+    limite: int = 10,
+    avant_date: Optional[datetime] = None,
+    avant_id: Optional[int] = None
+) -> Tuple[List[Dict], Optional[Tuple[datetime, int]]]:
     """
-    Récupère les conversations d'une session.
+    Récupère les conversations d'une session (pagination par curseur).
+
+    La pagination s'appuie sur le couple (date_creation, id) plutôt que sur
+    un OFFSET : chaque page est un simple parcours de l'index
+    idx_session_date, quel que soit le rang de la page demandée.
 
     Args:
         id_session: UUID de la session
         limite: Nombre maximum de conversations à retourner
+        avant_date: date_creation de la dernière conversation de la page précédente
+        avant_id: id de la dernière conversation de la page précédente
 
     Returns:
-        Liste des conversations (plus récentes en premier)
+        Tuple (conversations, curseur_suivant) :
+            - conversations: liste des conversations (plus récentes en premier)
+            - curseur_suivant: (date_creation, id) à repasser en avant_date/avant_id
+              pour obtenir la page suivante, ou None s'il n'y a plus de page
+
+    Example:
+        >>> page, curseur = obtenir_conversations_session(id_session, limite=20)
+        >>> while curseur:
+        ...     suite, curseur = obtenir_conversations_session(
+        ...         id_session, limite=20, avant_date=curseur[0], avant_id=curseur[1]
+        ...     )
     """
-    try:
-        with obtenir_curseur() as (conn, cursor):
-            query = """
-                SELECT *
-                FROM conversations
-                WHERE id_session = %s
-                ORDER BY date_creation DESC
-                LIMIT %s
-            """
+    if (avant_date is None) != (avant_id is None):
+        raise ValueError("avant_date et avant_id doivent être fournis ensemble")
 
-            cursor.execute(query, (str(id_session), limite))
+    try:
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            if avant_date is None:
+                query = """
+                    SELECT *
+                    FROM conversations
+                    WHERE id_session = %s
+                    ORDER BY date_creation DESC, id DESC
+                    LIMIT %s
+                """
+                params = (_normaliser_id_session(id_session), limite)
+            else:
+                # Forme développée de (date_creation, id) < (%s, %s) :
+                # l'optimiseur MySQL la transforme en range scan sur l'index
+                query = """
+                    SELECT *
+                    FROM conversations
+                    WHERE id_session = %s
+                    AND (date_creation < %s OR (date_creation = %s AND id < %s))
+                    ORDER BY date_creation DESC, id DESC
+                    LIMIT %s
+                """
+                params = (_normaliser_id_session(id_session), avant_date, avant_date, avant_id, limite)
+
+            cursor.execute(query, params)
             results = cursor.fetchall()
 
             # Parser les JSONs
             for result in results:
                 if result.get('ids_connaissances_recuperees'):
-                    result['ids_connaissances_recuperees'] = json.loads(
+                    result['ids_connaissances_recuperees'] = orjson.loads(
                         result['ids_connaissances_recuperees']
                     )
 
+            # Page pleine : il peut rester des conversations plus anciennes
+            curseur_suivant = None
+            if results and len(results) == limite:
+                dernier = results[-1]
+                curseur_suivant = (dernier['date_creation'], dernier['id'])
+
             logger.info(f"[OK] {len(results)} conversations récupérées pour session {str(id_session)[:8]}...")
 
-            return results
+            return results, curseur_suivant
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur récupération conversations session: {e}")
@@ -218,11 +346,42 @@ def obtenir_statistiques_conversations(periode_heures: int = 24) -> Dict:
     Args:
         periode_heures: Période en heures pour les stats
 
+    Lit d'abord la table conversations_stats (rafraîchie chaque minute par
+    l'event evt_rafraichir_statistiques) : une lecture par clé primaire au
+    lieu d'un parcours de la période. Recalcule à la volée si la période
+    n'est pas pré-agrégée ou si la ligne est trop ancienne.
+
     Returns:
         Dictionnaire avec les statistiques
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            cursor.execute("""
+                SELECT
+                    total,
+                    temps_moyen_ms,
+                    temps_min_ms,
+                    temps_max_ms,
+                    taux_cache_hit,
+                    confiance_moyenne
+                FROM conversations_stats
+                WHERE bucket_heures = %s
+                AND date_calcul >= DATE_SUB(NOW(), INTERVAL %s SECOND)
+            """, (periode_heures, AGE_MAX_STATS_SECONDES))
+            agregat = cursor.fetchone()
+
+            if agregat:
+                return {
+                    'total': agregat['total'],
+                    'temps_reponse_ms': {
+                        'moyenne': agregat['temps_moyen_ms'],
+                        'min': agregat['temps_min_ms'],
+                        'max': agregat['temps_max_ms']
+                    },
+                    'taux_cache_hit': agregat['taux_cache_hit'] or 0.0,
+                    'confiance_moyenne': agregat['confiance_moyenne'] or 0.0
+                }
+
             stats = {}
 
             # Nombre total dans la période
@@ -249,7 +408,7 @@ def obtenir_statistiques_conversations(periode_heures: int = 24) -> Dict:
             # Taux de cache hit
             cursor.execute("""
                 SELECT
-                    SUM(CASE WHEN cache_hit = TRUE THEN 1 ELSE 0 END) * 100.0 / COUNT(*) as taux
+                    AVG(cache_hit) * 100.0 as taux
                 FROM conversations
                 WHERE date_creation >= DATE_SUB(NOW(), INTERVAL %s HOUR)
             """, (periode_heures,))
@@ -273,6 +432,7 @@ def obtenir_statistiques_conversations(periode_heures: int = 24) -> Dict:
 
 __all__ = [
     'inserer_conversation',
+    'inserer_conversation_async',
     'obtenir_conversation',
     'obtenir_conversations_session',
     'obtenir_statistiques_conversations'
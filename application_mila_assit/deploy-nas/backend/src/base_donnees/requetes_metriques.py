@@ -2,17 +2,174 @@
 Requêtes MySQL pour la table metriques.
 
 Gère l'enregistrement et la récupération des métriques système.
+
+Les moyennes par période sont lues dans metriques_rollup_horaire (une ligne
+par heure, rafraîchie chaque minute par l'event evt_rafraichir_statistiques) :
+une fenêtre de 30 jours représente ~720 lignes, quel que soit le volume de
+conversations. La fenêtre est arrondie à l'heure entamée.
+
+Le roll-up est rafraîchi par la même procédure que retours_stats : si
+cette ligne a plus de AGE_MAX_STATS_SECONDES, les moyennes sont calculées
+sur les tables sources.
 """
 
 import logging
-from typing import Dict, Optional, Any
-import json
-
-from src.base_donnees.connexion import obtenir_curseur
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+
+import orjson
+
+from src.base_donnees.connexion import (
+    obtenir_curseur,
+    obtenir_connexion_context,
+    executer_prepare,
+    AGE_MAX_STATS_SECONDES
+)
+from src.base_donnees.connexion_async import obtenir_curseur_async
+from src.utilitaires.cache import cache_ttl, exclure_du_cache
 from src.utilitaires.exceptions import ErreurRequeteBD
 
 logger = logging.getLogger(__name__)
 
+# Durée (secondes) pendant laquelle un agrégat du dashboard est resservi
+# sans requête MySQL
+DUREE_CACHE_SECONDES = 30
+
+# Requête d'insertion partagée par inserer_metrique et inserer_metriques_batch
+REQUETE_INSERTION_METRIQUE = """
+    INSERT INTO metriques (
+        type_metrique,
+        valeur_metrique,
+        details
+    ) VALUES (%s, %s, %s)
+"""
+
+# Période -> nombre d'heures, passé en paramètre (INTERVAL %s HOUR) : un
+# seul texte SQL quelle que soit la période, aucune valeur interpolée
+HEURES_PAR_PERIODE = {
+    '1h': 1,
+    '24h': 24,
+    '7d': 168,
+    '30d': 720
+}
+PERIODES_VALIDES = frozenset(HEURES_PAR_PERIODE)
+
+# Requêtes partagées par les variantes synchrones et asynchrones
+
+# retours_stats et metriques_rollup_horaire sont rafraîchies ensemble par
+# rafraichir_statistiques() : lecture par clé primaire
+REQUETE_ROLLUP_A_JOUR = """
+    SELECT 1
+    FROM retours_stats
+    WHERE id = 1
+    AND date_calcul >= DATE_SUB(NOW(), INTERVAL %s SECOND)
+"""
+
+REQUETE_LATENCE_MOYENNE = """
+    SELECT SUM(somme_latence_ms) / SUM(nb_latence) as latence_moyenne
+    FROM metriques_rollup_horaire
+    WHERE bucket_debut > DATE_SUB(NOW(), INTERVAL %s HOUR) - INTERVAL 1 HOUR
+"""
+
+REQUETE_TAUX_CACHE_HIT = """
+    SELECT SUM(nb_cache_hits) * 1.0 / SUM(nb_conversations) as taux
+    FROM metriques_rollup_horaire
+    WHERE bucket_debut > DATE_SUB(NOW(), INTERVAL %s HOUR) - INTERVAL 1 HOUR
+"""
+
+REQUETE_SATISFACTION_MOYENNE = """
+    SELECT SUM(somme_notes) / SUM(nb_notes) as moyenne
+    FROM metriques_rollup_horaire
+    WHERE bucket_debut > DATE_SUB(NOW(), INTERVAL %s HOUR) - INTERVAL 1 HOUR
+"""
+
+REQUETE_METRIQUES_COMPLETES = """
+    SELECT 'latence' AS cle, SUM(somme_latence_ms) / SUM(nb_latence) AS valeur, NULL AS note
+    FROM metriques_rollup_horaire
+    WHERE bucket_debut > DATE_SUB(NOW(), INTERVAL %s HOUR) - INTERVAL 1 HOUR
+
+    UNION ALL
+
+    SELECT 'cache', SUM(nb_cache_hits) * 1.0 / SUM(nb_conversations), NULL
+    FROM metriques_rollup_horaire
+    WHERE bucket_debut > DATE_SUB(NOW(), INTERVAL %s HOUR) - INTERVAL 1 HOUR
+
+    UNION ALL
+
+    SELECT 'satisfaction', SUM(somme_notes) / SUM(nb_notes), NULL
+    FROM metriques_rollup_horaire
+    WHERE bucket_debut > DATE_SUB(NOW(), INTERVAL %s HOUR) - INTERVAL 1 HOUR
+
+    UNION ALL
+
+    SELECT 'distribution', COUNT(ru.id), n.note
+    FROM (
+        SELECT 1 AS note UNION ALL SELECT 2 UNION ALL SELECT 3
+        UNION ALL SELECT 4 UNION ALL SELECT 5
+    ) n
+    LEFT JOIN retours_utilisateurs ru ON ru.note = n.note
+    GROUP BY n.note
+"""
+
+# Variantes calculées à la volée, utilisées si le roll-up n'est pas à jour
+REQUETE_LATENCE_MOYENNE_DIRECTE = """
+    SELECT AVG(temps_reponse_ms) as latence_moyenne
+    FROM conversations
+    WHERE date_creation >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+    AND temps_reponse_ms IS NOT NULL
+"""
+
+REQUETE_TAUX_CACHE_HIT_DIRECTE = """
+    SELECT AVG(cache_hit) as taux
+    FROM conversations
+    WHERE date_creation >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+"""
+
+REQUETE_SATISFACTION_MOYENNE_DIRECTE = """
+    SELECT AVG(note) as moyenne
+    FROM retours_utilisateurs
+    WHERE date_creation >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+"""
+
+REQUETE_METRIQUES_COMPLETES_DIRECTE = """
+    SELECT 'latence' AS cle, AVG(temps_reponse_ms) AS valeur, NULL AS note
+    FROM conversations
+    WHERE date_creation >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+    AND temps_reponse_ms IS NOT NULL
+
+    UNION ALL
+
+    SELECT 'cache', AVG(cache_hit), NULL
+    FROM conversations
+    WHERE date_creation >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+
+    UNION ALL
+
+    SELECT 'satisfaction', AVG(note), NULL
+    FROM retours_utilisateurs
+    WHERE date_creation >= DATE_SUB(NOW(), INTERVAL %s HOUR)
+
+    UNION ALL
+
+    SELECT 'distribution', COUNT(ru.id), n.note
+    FROM (
+        SELECT 1 AS note UNION ALL SELECT 2 UNION ALL SELECT 3
+        UNION ALL SELECT 4 UNION ALL SELECT 5
+    ) n
+    LEFT JOIN retours_utilisateurs ru ON ru.note = n.note
+    GROUP BY n.note
+"""
+
+
+def _details_json(details: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Sérialise les détails d'une métrique (orjson, ~5x plus rapide que json).
+
+    Le résultat est décodé en str : MySQL refuse de convertir en JSON une
+    chaîne de jeu de caractères 'binary', ce que serait un paramètre bytes.
+    """
+    return orjson.dumps(details).decode() if details else None
+
 
 def inserer_metrique(
     type_metrique: str,
@@ -41,19 +198,12 @@ def inserer_metrique(
         ... )
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
-            # Convertir details en JSON
-            details_json = json.dumps(details) if details else None
+        with obtenir_connexion_context() as conn:
+            details_json = _details_json(details)
 
-            query = """
-                INSERT INTO metriques (
-                    type_metrique,
-                    valeur_metrique,
-                    details
-                ) VALUES (%s, %s, %s)
-            """
-
-            cursor.execute(query, (type_metrique, valeur, details_json))
+            cursor = executer_prepare(
+                conn, REQUETE_INSERTION_METRIQUE, (type_metrique, valeur, details_json)
+            )
             conn.commit()
 
             id_metrique = cursor.lastrowid
@@ -70,6 +220,81 @@ def inserer_metrique(
         )
 
 
+def inserer_metriques_batch(
+    metriques: List[Tuple[str, float, Optional[Dict[str, Any]]]]
+) -> int:
+    """
+    Insère plusieurs métriques en un seul executemany et un seul commit.
+
+    Args:
+        metriques: Liste de tuples (type_metrique, valeur, details)
+
+    Returns:
+        Nombre de métriques insérées
+
+    Raises:
+        ErreurRequeteBD: Si l'insertion échoue
+
+    Example:
+        >>> inserer_metriques_batch([
+        ...     ('temps_reponse', 850.5, {'composant': 'pipeline_rag'}),
+        ...     ('temps_reponse', 920.0, None)
+        ... ])
+        2
+    """
+    if not metriques:
+        return 0
+
+    lignes = [
+        (type_metrique, valeur, _details_json(details))
+        for type_metrique, valeur, details in metriques
+    ]
+
+    try:
+        with obtenir_curseur() as (conn, cursor):
+            cursor.executemany(REQUETE_INSERTION_METRIQUE, lignes)
+            conn.commit()
+
+            logger.debug(f"[OK] {len(lignes)} métriques insérées")
+
+            return len(lignes)
+
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur insertion batch métriques: {e}")
+        raise ErreurRequeteBD(
+            requete="INSERT INTO metriques (batch)",
+            raison=str(e)
+        )
+
+
+def _rollup_a_jour(cursor) -> bool:
+    """Indique si metriques_rollup_horaire a été rafraîchie récemment."""
+    cursor.execute(REQUETE_ROLLUP_A_JOUR, (AGE_MAX_STATS_SECONDES,))
+    return cursor.fetchone() is not None
+
+
+async def _rollup_a_jour_async(cursor) -> bool:
+    """Variante asynchrone de _rollup_a_jour()."""
+    await cursor.execute(REQUETE_ROLLUP_A_JOUR, (AGE_MAX_STATS_SECONDES,))
+    return await cursor.fetchone() is not None
+
+
+def _heures_periode(periode: str) -> int:
+    """
+    Convertit une période en nombre d'heures.
+
+    Appelée hors du try des fonctions de lecture : une période inconnue est
+    une erreur de l'appelant, pas une métrique à 0.
+
+    Raises:
+        ValueError: Si la période n'est pas dans PERIODES_VALIDES
+    """
+    if periode not in PERIODES_VALIDES:
+        raise ValueError(f"Période invalide: {periode}")
+    return HEURES_PAR_PERIODE[periode]
+
+
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
 def obtenir_latence_moyenne(periode: str = '24h') -> float:
     """
     Calcule la latence moyenne sur une période.
@@ -80,30 +305,22 @@ def obtenir_latence_moyenne(periode: str = '24h') -> float:
     Returns:
         Latence moyenne en millisecondes
 
+    Raises:
+        ValueError: Si la période est inconnue
+
     Example:
         >>> latence = obtenir_latence_moyenne('24h')
         >>> print(f"Latence moyenne: {latence}ms")
     """
-    # Convertir période en intervalle MySQL
-    interval_map = {
-        '1h': '1 HOUR',
-        '24h': '24 HOUR',
-        '7d': '7 DAY',
-        '30d': '30 DAY'
-    }
-
-    interval = interval_map.get(periode, '24 HOUR')
+    heures = _heures_periode(periode)
 
     try:
-        with obtenir_curseur() as (conn, cursor):
-            query = f"""
-                SELECT AVG(temps_reponse_ms) as latence_moyenne
-                FROM conversations
-                WHERE date_creation >= DATE_SUB(NOW(), INTERVAL {interval})
-                AND temps_reponse_ms IS NOT NULL
-            """
-
-            cursor.execute(query)
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            if _rollup_a_jour(cursor):
+                requete = REQUETE_LATENCE_MOYENNE
+            else:
+                requete = REQUETE_LATENCE_MOYENNE_DIRECTE
+            cursor.execute(requete, (heures,))
             result = cursor.fetchone()
 
             latence = result['latence_moyenne'] if result and result['latence_moyenne'] else 0.0
@@ -112,9 +329,11 @@ def obtenir_latence_moyenne(periode: str = '24h') -> float:
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur calcul latence moyenne: {e}")
+        exclure_du_cache()
         return 0.0
 
 
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
 def obtenir_taux_cache_hit(periode: str = '24h') -> float:
     """
     Calcule le taux de succès du cache sur une période.
@@ -125,30 +344,93 @@ def obtenir_taux_cache_hit(periode: str = '24h') -> float:
     Returns:
         Taux de cache hit entre 0.0 et 1.0
 
+    Raises:
+        ValueError: Si la période est inconnue
+
     Example:
         >>> taux = obtenir_taux_cache_hit('24h')
         >>> print(f"Cache hit rate: {taux:.1%}")
     """
-    interval_map = {
-        '1h': '1 HOUR',
-        '24h': '24 HOUR',
-        '7d': '7 DAY',
-        '30d': '30 DAY'
-    }
+    heures = _heures_periode(periode)
+
+    try:
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            if _rollup_a_jour(cursor):
+                requete = REQUETE_TAUX_CACHE_HIT
+            else:
+                requete = REQUETE_TAUX_CACHE_HIT_DIRECTE
+            cursor.execute(requete, (heures,))
+            result = cursor.fetchone()
+
+            taux = result['taux'] if result and result['taux'] else 0.0
+
+            return float(taux)
 
-    interval = interval_map.get(periode, '24 HOUR')
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur calcul taux cache: {e}")
+        exclure_du_cache()
+        return 0.0
+
+
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
+async def obtenir_latence_moyenne_async(periode: str = '24h') -> float:
+    """
+    Variante asynchrone de obtenir_latence_moyenne().
+
+    Args:
+        periode: Période ('1h', '24h', '7d', '30d')
+
+    Returns:
+        Latence moyenne en millisecondes
+
+    Raises:
+        ValueError: Si la période est inconnue
+    """
+    heures = _heures_periode(periode)
 
     try:
-        with obtenir_curseur() as (conn, cursor):
-            query = f"""
-                SELECT
-                    SUM(CASE WHEN cache_hit = TRUE THEN 1 ELSE 0 END) * 1.0 / COUNT(*) as taux
-                FROM conversations
-                WHERE date_creation >= DATE_SUB(NOW(), INTERVAL {interval})
-            """
+        async with obtenir_curseur_async(lecture_seule=True) as (conn, cursor):
+            if await _rollup_a_jour_async(cursor):
+                requete = REQUETE_LATENCE_MOYENNE
+            else:
+                requete = REQUETE_LATENCE_MOYENNE_DIRECTE
+            await cursor.execute(requete, (heures,))
+            result = await cursor.fetchone()
 
-            cursor.execute(query)
-            result = cursor.fetchone()
+            latence = result['latence_moyenne'] if result and result['latence_moyenne'] else 0.0
+
+            return float(latence)
+
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur calcul latence moyenne: {e}")
+        exclure_du_cache()
+        return 0.0
+
+
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
+async def obtenir_taux_cache_hit_async(periode: str = '24h') -> float:
+    """
+    Variante asynchrone de obtenir_taux_cache_hit().
+
+    Args:
+        periode: Période ('1h', '24h', '7d', '30d')
+
+    Returns:
+        Taux de cache hit entre 0.0 et 1.0
+
+    Raises:
+        ValueError: Si la période est inconnue
+    """
+    heures = _heures_periode(periode)
+
+    try:
+        async with obtenir_curseur_async(lecture_seule=True) as (conn, cursor):
+            if await _rollup_a_jour_async(cursor):
+                requete = REQUETE_TAUX_CACHE_HIT
+            else:
+                requete = REQUETE_TAUX_CACHE_HIT_DIRECTE
+            await cursor.execute(requete, (heures,))
+            result = await cursor.fetchone()
 
             taux = result['taux'] if result and result['taux'] else 0.0
 
@@ -156,9 +438,11 @@ def obtenir_taux_cache_hit(periode: str = '24h') -> float:
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur calcul taux cache: {e}")
+        exclure_du_cache()
         return 0.0
 
 
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
 def obtenir_satisfaction_moyenne(periode: str = '24h') -> float:
     """
     Calcule la satisfaction moyenne (note feedback) sur une période.
@@ -169,28 +453,22 @@ def obtenir_satisfaction_moyenne(periode: str = '24h') -> float:
     Returns:
         Note moyenne entre 1.0 et 5.0
 
+    Raises:
+        ValueError: Si la période est inconnue
+
     Example:
         >>> satisfaction = obtenir_satisfaction_moyenne('7d')
         >>> print(f"Satisfaction: {satisfaction:.2f}/5")
     """
-    interval_map = {
-        '1h': '1 HOUR',
-        '24h': '24 HOUR',
-        '7d': '7 DAY',
-        '30d': '30 DAY'
-    }
-
-    interval = interval_map.get(periode, '24 HOUR')
+    heures = _heures_periode(periode)
 
     try:
-        with obtenir_curseur() as (conn, cursor):
-            query = f"""
-                SELECT AVG(note) as moyenne
-                FROM retours_utilisateurs
-                WHERE date_creation >= DATE_SUB(NOW(), INTERVAL {interval})
-            """
-
-            cursor.execute(query)
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            if _rollup_a_jour(cursor):
+                requete = REQUETE_SATISFACTION_MOYENNE
+            else:
+                requete = REQUETE_SATISFACTION_MOYENNE_DIRECTE
+            cursor.execute(requete, (heures,))
             result = cursor.fetchone()
 
             moyenne = result['moyenne'] if result and result['moyenne'] else 0.0
@@ -199,9 +477,11 @@ def obtenir_satisfaction_moyenne(periode: str = '24h') -> float:
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur calcul satisfaction moyenne: {e}")
+        exclure_du_cache()
         return 0.0
 
 
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
 def obtenir_distribution_notes() -> Dict[int, int]:
     """
     Obtient la distribution des notes de feedback.
@@ -215,59 +495,99 @@ def obtenir_distribution_notes() -> Dict[int, int]:
         ...     print(f"{note} étoiles: {count} feedbacks")
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            # Table dérivée des notes 1-5 : MySQL renvoie toujours 5 lignes,
+            # y compris pour les notes sans aucun retour
             query = """
-                SELECT note, COUNT(*) as count
-                FROM retours_utilisateurs
-                GROUP BY note
-                ORDER BY note
+                SELECT n.note, COUNT(ru.id) as count
+                FROM (
+                    SELECT 1 AS note UNION ALL SELECT 2 UNION ALL SELECT 3
+                    UNION ALL SELECT 4 UNION ALL SELECT 5
+                ) n
+                LEFT JOIN retours_utilisateurs ru ON ru.note = n.note
+                GROUP BY n.note
+                ORDER BY n.note
             """
 
             cursor.execute(query)
-            results = cursor.fetchall()
-
-            distribution = {row['note']: row['count'] for row in results}
 
-            # Assurer que toutes les notes (1-5) sont présentes
-            for note in range(1, 6):
-                if note not in distribution:
-                    distribution[note] = 0
-
-            return distribution
+            return {row['note']: row['count'] for row in cursor.fetchall()}
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur distribution notes: {e}")
+        exclure_du_cache()
         return {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
 
 
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
 def obtenir_metriques_completes(periode: str = '24h') -> Dict[str, Any]:
     """
     Obtient toutes les métriques principales en une seule requête.
 
+    Les quatre agrégats (latence, cache, satisfaction, distribution des notes)
+    sont combinés par UNION ALL : une seule connexion empruntée au pool et
+    deux allers-retours (fraîcheur du roll-up, puis agrégats) au lieu d'un
+    par métrique.
+
     Args:
         periode: Période pour les stats
 
     Returns:
-        Dictionnaire complet avec toutes les métriques
+        Dictionnaire complet avec toutes les métriques ; `date_calcul`
+        indique quand elles ont été calculées (résultat mis en cache 30 s)
+
+    Raises:
+        ValueError: Si la période est inconnue
 
     Example:
         >>> metriques = obtenir_metriques_completes('24h')
         >>> print(f"Latence: {metriques['latence_moyenne_ms']}ms")
         >>> print(f"Cache: {metriques['taux_cache_hit']:.1%}")
     """
-    return {
-        'latence_moyenne_ms': obtenir_latence_moyenne(periode),
-        'taux_cache_hit': obtenir_taux_cache_hit(periode),
-        'satisfaction_moyenne': obtenir_satisfaction_moyenne(periode),
-        'distribution_notes': obtenir_distribution_notes(),
-        'periode': periode
+    heures = _heures_periode(periode)
+
+    metriques = {
+        'latence_moyenne_ms': 0.0,
+        'taux_cache_hit': 0.0,
+        'satisfaction_moyenne': 0.0,
+        'distribution_notes': {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
+        'periode': periode,
+        'date_calcul': datetime.now()
     }
 
+    try:
+        with obtenir_curseur(dictionnaire=False, lecture_seule=True) as (conn, cursor):
+            if _rollup_a_jour(cursor):
+                requete = REQUETE_METRIQUES_COMPLETES
+            else:
+                requete = REQUETE_METRIQUES_COMPLETES_DIRECTE
+            cursor.execute(requete, (heures, heures, heures))
+
+            for cle, valeur, note in cursor.fetchall():
+                if cle == 'distribution':
+                    metriques['distribution_notes'][int(note)] = int(valeur)
+                elif valeur is not None:
+                    if cle == 'latence':
+                        metriques['latence_moyenne_ms'] = float(valeur)
+                    elif cle == 'cache':
+                        metriques['taux_cache_hit'] = float(valeur)
+                    else:
+                        metriques['satisfaction_moyenne'] = float(valeur)
+
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur calcul métriques complètes: {e}")
+        exclure_du_cache()
+
+    return metriques
+
 
 __all__ = [
     'inserer_metrique',
+    'inserer_metriques_batch',
     'obtenir_latence_moyenne',
+    'obtenir_latence_moyenne_async',
     'obtenir_taux_cache_hit',
+    'obtenir_taux_cache_hit_async',
     'obtenir_satisfaction_moyenne',
     'obtenir_distribution_notes',
     'obtenir_metriques_completes'
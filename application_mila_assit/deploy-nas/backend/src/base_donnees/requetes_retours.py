@@ -5,15 +5,117 @@ Gère les feedbacks utilisateurs sur les réponses du chatbot.
 """
 
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from src.base_donnees.connexion import obtenir_curseur
+import orjson
+
+from src.base_donnees.connexion import (
+    obtenir_curseur,
+    obtenir_connexion_context,
+    executer_prepare,
+    lignes_nommees,
+    AGE_MAX_STATS_SECONDES
+)
+from src.base_donnees.connexion_async import obtenir_curseur_async
+from src.base_donnees.requetes_metriques import (
+    DUREE_CACHE_SECONDES,
+    obtenir_distribution_notes,
+    obtenir_metriques_completes,
+    obtenir_satisfaction_moyenne
+)
+from src.utilitaires.cache import cache_ttl
 from src.utilitaires.exceptions import ErreurRequeteBD, ErreurEnregistrementIntrouvable
 
 logger = logging.getLogger(__name__)
 
 
+# Valeurs autorisées (ENUM de retours_utilisateurs). Tuples pour l'ordre des
+# messages d'erreur, frozensets pour le test d'appartenance.
+_CATEGORIES = (
+    'reponse_incorrecte',
+    'reponse_incomplete',
+    'ton_inapproprie',
+    'reponse_obsolete',
+    'hors_sujet',
+    'autre'
+)
+_STATUTS = ('nouveau', 'en_cours', 'traite', 'ignore')
+_STATUTS_TRAITEMENT = ('traite', 'ignore')
+
+CATEGORIES_VALIDES = frozenset(_CATEGORIES)
+STATUTS_VALIDES = frozenset(_STATUTS)
+STATUTS_TRAITEMENT_VALIDES = frozenset(_STATUTS_TRAITEMENT)
+
+VALEURS_CATEGORIES = ', '.join(_CATEGORIES)
+VALEURS_STATUTS = ', '.join(_STATUTS)
+VALEURS_STATUTS_TRAITEMENT = ', '.join(_STATUTS_TRAITEMENT)
+
+# Colonnes des listings : pas de reponse_bot (souvent plusieurs Ko) ni des
+# textes de traitement, seulement ce qu'affiche une liste de retours
+COLONNES_LISTE_RETOURS = """
+    ru.id,
+    ru.id_conversation,
+    ru.note,
+    ru.commentaire,
+    ru.categorie_probleme,
+    ru.statut,
+    ru.date_creation,
+    c.question_utilisateur,
+    c.score_confiance
+"""
+
+# Colonnes propres à retours_utilisateurs (détail d'un retour)
+COLONNES_RETOUR = """
+    ru.id,
+    ru.id_conversation,
+    ru.note,
+    ru.commentaire,
+    ru.suggestion_reponse,
+    ru.categorie_probleme,
+    ru.statut,
+    ru.id_admin_traitement,
+    ru.justification,
+    ru.date_traitement,
+    ru.date_creation
+"""
+
+# Requêtes exécutées en instructions préparées (texte SQL constant)
+REQUETE_INSERTION_RETOUR = """
+    INSERT INTO retours_utilisateurs (
+        id_conversation,
+        note,
+        commentaire,
+        suggestion_reponse,
+        categorie_probleme,
+        statut
+    ) VALUES (
+        %s, %s, %s, %s, %s, 'nouveau'
+    )
+"""
+
+REQUETE_OBTENIR_RETOUR = f"""
+    SELECT
+        {COLONNES_RETOUR},
+        c.question_utilisateur,
+        c.reponse_bot,
+        c.score_confiance
+    FROM retours_utilisateurs ru
+    LEFT JOIN conversations c ON ru.id_conversation = c.id
+    WHERE ru.id = %s
+"""
+
+
+def _invalider_caches_retours() -> None:
+    """Vide les agrégats en cache qui dépendent de retours_utilisateurs."""
+    obtenir_statistiques_retours.vider()
+    obtenir_statistiques_retours_async.vider()
+    compter_retours.vider()
+    obtenir_distribution_notes.vider()
+    obtenir_satisfaction_moyenne.vider()
+    obtenir_metriques_completes.vider()
+
+
 def inserer_retour(
     id_conversation: int,
     note: int,
@@ -51,39 +153,16 @@ def inserer_retour(
     if not 1 <= note <= 5:
         raise ValueError(f"La note doit être entre 1 et 5, reçu: {note}")
 
-    # Validation de la catégorie
-    categories_valides = [
-        'reponse_incorrecte',
-        'reponse_incomplete',
-        'ton_inapproprie',
-        'reponse_obsolete',
-        'hors_sujet',
-        'autre',
-        None
-    ]
-
-    if categorie_probleme and categorie_probleme not in categories_valides:
+    # Validation de la catégorie (None ou vide : pas de catégorie)
+    if categorie_probleme and categorie_probleme not in CATEGORIES_VALIDES:
         raise ValueError(
             f"Catégorie invalide: {categorie_probleme}. "
-            f"Valeurs autorisées: {', '.join([c for c in categories_valides if c])}"
+            f"Valeurs autorisées: {VALEURS_CATEGORIES}"
         )
 
     try:
-        with obtenir_curseur() as (conn, cursor):
-            query = """
-                INSERT INTO retours_utilisateurs (
-                    id_conversation,
-                    note,
-                    commentaire,
-                    suggestion_reponse,
-                    categorie_probleme,
-                    statut
-                ) VALUES (
-                    %s, %s, %s, %s, %s, 'nouveau'
-                )
-            """
-
-            cursor.execute(query, (
+        with obtenir_connexion_context() as conn:
+            cursor = executer_prepare(conn, REQUETE_INSERTION_RETOUR, (
                 id_conversation,
                 note,
                 commentaire,
@@ -92,6 +171,7 @@ def inserer_retour(
             ))
 
             conn.commit()
+            _invalider_caches_retours()
 
             # Récupérer l'ID auto-incrémenté
             id_retour = cursor.lastrowid
@@ -126,27 +206,18 @@ def obtenir_retour(id_retour: int) -> Dict:
         ErreurRequeteBD: Si la requête échoue
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
-            query = """
-                SELECT
-                    ru.*,
-                    c.question_utilisateur,
-                    c.reponse_bot,
-                    c.score_confiance
-                FROM retours_utilisateurs ru
-                LEFT JOIN conversations c ON ru.id_conversation = c.id
-                WHERE ru.id = %s
-            """
-
-            cursor.execute(query, (id_retour,))
-            result = cursor.fetchone()
+        with obtenir_connexion_context(lecture_seule=True) as conn:
+            cursor = executer_prepare(conn, REQUETE_OBTENIR_RETOUR, (id_retour,))
+            lignes = cursor.fetchall()
 
-            if not result:
+            if not lignes:
                 raise ErreurEnregistrementIntrouvable(
                     table="retours_utilisateurs",
                     identifiant=id_retour
                 )
 
+            result = dict(zip(cursor.column_names, lignes[0]))
+
             logger.debug(f"Retour {id_retour} récupéré")
 
             return result
@@ -175,12 +246,12 @@ def obtenir_retours_par_conversation(id_conversation: int) -> List[Dict]:
         ErreurRequeteBD: Si la requête échoue
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
-            query = """
-                SELECT *
-                FROM retours_utilisateurs
-                WHERE id_conversation = %s
-                ORDER BY date_creation DESC
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            query = f"""
+                SELECT {COLONNES_RETOUR}
+                FROM retours_utilisateurs ru
+                WHERE ru.id_conversation = %s
+                ORDER BY ru.date_creation DESC
             """
 
             cursor.execute(query, (id_conversation,))
@@ -203,12 +274,88 @@ def obtenir_retours_par_conversation(id_conversation: int) -> List[Dict]:
         )
 
 
+def _verifier_curseur(avant_date: Optional[datetime], avant_id: Optional[int]) -> None:
+    """
+    Refuse un curseur de pagination incomplet.
+
+    Raises:
+        ValueError: Si un seul de avant_date et avant_id est fourni
+    """
+    if (avant_date is None) != (avant_id is None):
+        raise ValueError("avant_date et avant_id doivent être fournis ensemble")
+
+
+def _lister_retours(
+    cursor,
+    filtre: str,
+    params_filtre: Tuple,
+    limite: int,
+    avant_date: Optional[datetime],
+    avant_id: Optional[int]
+) -> Tuple[List[tuple], Optional[Tuple[datetime, int]]]:
+    """
+    Exécute un listing de retours paginé par curseur (date_creation, id).
+
+    Chaque page est un parcours de l'index (filtre, date_creation) à partir
+    du curseur, au lieu de relire et jeter OFFSET lignes. Les lignes sont
+    des namedtuples (une classe par liste de colonnes, pas de dict par
+    ligne), validés tels quels par le modèle RetourListe côté API.
+
+    Args:
+        cursor: Curseur tuple ouvert (obtenir_curseur(dictionnaire=False))
+        filtre: Condition SQL sur ru (ex: "ru.statut = %s")
+        params_filtre: Paramètres de la condition
+        limite: Nombre maximum de résultats
+        avant_date: date_creation du dernier retour de la page précédente
+        avant_id: id du dernier retour de la page précédente
+
+    Returns:
+        Tuple (retours, curseur_suivant), curseur_suivant valant None
+        s'il n'y a plus de page
+
+    Raises:
+        ValueError: Si le curseur est incomplet (à vérifier par l'appelant
+            avant son try, voir _verifier_curseur)
+    """
+    # Curseur incomplet : ru.id < NULL écarterait toutes les lignes de la
+    # même seconde, et un avant_id seul serait ignoré
+    _verifier_curseur(avant_date, avant_id)
+
+    params = list(params_filtre)
+
+    if avant_date is not None:
+        # Forme développée de (date_creation, id) < (%s, %s), utilisable en range scan
+        filtre += " AND (ru.date_creation < %s OR (ru.date_creation = %s AND ru.id < %s))"
+        params += [avant_date, avant_date, avant_id]
+
+    query = f"""
+        SELECT {COLONNES_LISTE_RETOURS}
+        FROM retours_utilisateurs ru
+        LEFT JOIN conversations c ON ru.id_conversation = c.id
+        WHERE {filtre}
+        ORDER BY ru.date_creation DESC, ru.id DESC
+        LIMIT %s
+    """
+    params.append(limite)
+
+    cursor.execute(query, params)
+    results = lignes_nommees(cursor)
+
+    curseur_suivant = None
+    if results and len(results) == limite:
+        dernier = results[-1]
+        curseur_suivant = (dernier.date_creation, dernier.id)
+
+    return results, curseur_suivant
+
+
 def obtenir_retours_par_note(
     note_min: int = 1,
     note_max: int = 5,
     limite: int = 100,
-    offset: int = 0
-) -> List[Dict]:
+    avant_date: Optional[datetime] = None,
+    avant_id: Optional[int] = None
+) -> Tuple[List[tuple], Optional[Tuple[datetime, int]]]:
     """
     Récupère les retours filtrés par note.
 
@@ -216,14 +363,16 @@ def obtenir_retours_par_note(
         note_min: Note minimale (1-5)
         note_max: Note maximale (1-5)
         limite: Nombre maximum de résultats
-        offset: Décalage pour pagination
+        avant_date: date_creation du dernier retour de la page précédente
+        avant_id: id du dernier retour de la page précédente
 
     Returns:
-        Liste de dictionnaires avec les retours
+        Tuple (retours en namedtuples, curseur_suivant) : curseur_suivant = (date_creation, id)
+        à repasser en avant_date/avant_id, ou None s'il n'y a plus de page
 
     Raises:
         ErreurRequeteBD: Si la requête échoue
-        ValueError: Si les notes sont invalides
+        ValueError: Si les notes ou le curseur sont invalides
     """
     if not 1 <= note_min <= 5 or not 1 <= note_max <= 5:
         raise ValueError("Les notes doivent être entre 1 et 5")
@@ -231,29 +380,21 @@ def obtenir_retours_par_note(
     if note_min > note_max:
         raise ValueError("note_min doit être <= note_max")
 
-    try:
-        with obtenir_curseur() as (conn, cursor):
-            query = """
-                SELECT
-                    ru.*,
-                    c.question_utilisateur,
-                    c.reponse_bot
-                FROM retours_utilisateurs ru
-                LEFT JOIN conversations c ON ru.id_conversation = c.id
-                WHERE ru.note BETWEEN %s AND %s
-                ORDER BY ru.date_creation DESC
-                LIMIT %s OFFSET %s
-            """
+    _verifier_curseur(avant_date, avant_id)
 
-            cursor.execute(query, (note_min, note_max, limite, offset))
-            results = cursor.fetchall()
+    try:
+        with obtenir_curseur(dictionnaire=False, lecture_seule=True) as (conn, cursor):
+            results, curseur_suivant = _lister_retours(
+                cursor, "ru.note BETWEEN %s AND %s", (note_min, note_max),
+                limite, avant_date, avant_id
+            )
 
             logger.debug(
                 f"{len(results)} retour(s) trouvé(s) "
                 f"avec note entre {note_min} et {note_max}"
             )
 
-            return results
+            return results, curseur_suivant
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur récupération retours par note: {e}")
@@ -266,54 +407,45 @@ def obtenir_retours_par_note(
 def obtenir_retours_par_statut(
     statut: str,
     limite: int = 100,
-    offset: int = 0
-) -> List[Dict]:
+    avant_date: Optional[datetime] = None,
+    avant_id: Optional[int] = None
+) -> Tuple[List[tuple], Optional[Tuple[datetime, int]]]:
     """
     Récupère les retours filtrés par statut.
 
     Args:
         statut: Statut du retour ('nouveau', 'en_cours', 'traite', 'ignore')
         limite: Nombre maximum de résultats
-        offset: Décalage pour pagination
+        avant_date: date_creation du dernier retour de la page précédente
+        avant_id: id du dernier retour de la page précédente
 
     Returns:
-        Liste de dictionnaires avec les retours
+        Tuple (retours en namedtuples, curseur_suivant) : curseur_suivant = (date_creation, id)
+        à repasser en avant_date/avant_id, ou None s'il n'y a plus de page
 
     Raises:
         ErreurRequeteBD: Si la requête échoue
-        ValueError: Si le statut est invalide
+        ValueError: Si le statut ou le curseur est invalide
     """
-    statuts_valides = ['nouveau', 'en_cours', 'traite', 'ignore']
-
-    if statut not in statuts_valides:
+    if statut not in STATUTS_VALIDES:
         raise ValueError(
             f"Statut invalide: {statut}. "
-            f"Valeurs autorisées: {', '.join(statuts_valides)}"
+            f"Valeurs autorisées: {VALEURS_STATUTS}"
         )
 
-    try:
-        with obtenir_curseur() as (conn, cursor):
-            query = """
-                SELECT
-                    ru.*,
-                    c.question_utilisateur,
-                    c.reponse_bot,
-                    c.score_confiance
-                FROM retours_utilisateurs ru
-                LEFT JOIN conversations c ON ru.id_conversation = c.id
-                WHERE ru.statut = %s
-                ORDER BY ru.date_creation DESC
-                LIMIT %s OFFSET %s
-            """
+    _verifier_curseur(avant_date, avant_id)
 
-            cursor.execute(query, (statut, limite, offset))
-            results = cursor.fetchall()
+    try:
+        with obtenir_curseur(dictionnaire=False, lecture_seule=True) as (conn, cursor):
+            results, curseur_suivant = _lister_retours(
+                cursor, "ru.statut = %s", (statut,), limite, avant_date, avant_id
+            )
 
             logger.debug(
                 f"{len(results)} retour(s) trouvé(s) avec statut '{statut}'"
             )
 
-            return results
+            return results, curseur_suivant
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur récupération retours par statut: {e}")
@@ -326,61 +458,46 @@ def obtenir_retours_par_statut(
 def obtenir_retours_par_categorie(
     categorie: str,
     limite: int = 100,
-    offset: int = 0
-) -> List[Dict]:
+    avant_date: Optional[datetime] = None,
+    avant_id: Optional[int] = None
+) -> Tuple[List[tuple], Optional[Tuple[datetime, int]]]:
     """
     Récupère les retours filtrés par catégorie de problème.
 
     Args:
         categorie: Catégorie du problème
         limite: Nombre maximum de résultats
-        offset: Décalage pour pagination
+        avant_date: date_creation du dernier retour de la page précédente
+        avant_id: id du dernier retour de la page précédente
 
     Returns:
-        Liste de dictionnaires avec les retours
+        Tuple (retours en namedtuples, curseur_suivant) : curseur_suivant = (date_creation, id)
+        à repasser en avant_date/avant_id, ou None s'il n'y a plus de page
 
     Raises:
         ErreurRequeteBD: Si la requête échoue
-        ValueError: Si la catégorie est invalide
+        ValueError: Si la catégorie ou le curseur est invalide
     """
-    categories_valides = [
-        'reponse_incorrecte',
-        'reponse_incomplete',
-        'ton_inapproprie',
-        'reponse_obsolete',
-        'hors_sujet',
-        'autre'
-    ]
-
-    if categorie not in categories_valides:
+    if categorie not in CATEGORIES_VALIDES:
         raise ValueError(
             f"Catégorie invalide: {categorie}. "
-            f"Valeurs autorisées: {', '.join(categories_valides)}"
+            f"Valeurs autorisées: {VALEURS_CATEGORIES}"
         )
 
-    try:
-        with obtenir_curseur() as (conn, cursor):
-            query = """
-                SELECT
-                    ru.*,
-                    c.question_utilisateur,
-                    c.reponse_bot
-                FROM retours_utilisateurs ru
-                LEFT JOIN conversations c ON ru.id_conversation = c.id
-                WHERE ru.categorie_probleme = %s
-                ORDER BY ru.date_creation DESC
-                LIMIT %s OFFSET %s
-            """
+    _verifier_curseur(avant_date, avant_id)
 
-            cursor.execute(query, (categorie, limite, offset))
-            results = cursor.fetchall()
+    try:
+        with obtenir_curseur(dictionnaire=False, lecture_seule=True) as (conn, cursor):
+            results, curseur_suivant = _lister_retours(
+                cursor, "ru.categorie_probleme = %s", (categorie,), limite, avant_date, avant_id
+            )
 
             logger.debug(
                 f"{len(results)} retour(s) trouvé(s) "
                 f"avec catégorie '{categorie}'"
             )
 
-            return results
+            return results, curseur_suivant
 
     except Exception as e:
         logger.error(f"[ERREUR] Erreur récupération retours par catégorie: {e}")
@@ -412,12 +529,10 @@ def marquer_retour_traite(
         ErreurRequeteBD: Si la mise à jour échoue
         ValueError: Si le statut est invalide
     """
-    statuts_valides = ['traite', 'ignore']
-
-    if nouveau_statut not in statuts_valides:
+    if nouveau_statut not in STATUTS_TRAITEMENT_VALIDES:
         raise ValueError(
             f"Statut invalide: {nouveau_statut}. "
-            f"Valeurs autorisées: {', '.join(statuts_valides)}"
+            f"Valeurs autorisées: {VALEURS_STATUTS_TRAITEMENT}"
         )
 
     try:
@@ -440,6 +555,7 @@ def marquer_retour_traite(
             ))
 
             conn.commit()
+            _invalider_caches_retours()
 
             if cursor.rowcount == 0:
                 raise ErreurEnregistrementIntrouvable(
@@ -464,67 +580,162 @@ def marquer_retour_traite(
         )
 
 
+# Statistiques en une requête : ligne 'global' puis une ligne par statut et
+# par catégorie (équivalent MySQL de GROUPING SETS), partagée par les
+# variantes synchrone et asynchrone
+REQUETE_STATS_RETOURS = """
+    SELECT
+        'global' AS dimension,
+        NULL AS valeur,
+        COUNT(*) AS total,
+        AVG(note) AS note_moyenne,
+        MIN(note) AS note_min,
+        MAX(note) AS note_max,
+        SUM(note >= 4) AS retours_positifs,
+        SUM(note <= 2) AS retours_negatifs,
+        SUM(note = 3) AS retours_neutres
+    FROM retours_utilisateurs
+
+    UNION ALL
+
+    SELECT 'statut', statut, COUNT(*), NULL, NULL, NULL, NULL, NULL, NULL
+    FROM retours_utilisateurs
+    GROUP BY statut
+
+    UNION ALL
+
+    SELECT 'categorie', categorie_probleme, COUNT(*), NULL, NULL, NULL, NULL, NULL, NULL
+    FROM retours_utilisateurs
+    WHERE categorie_probleme IS NOT NULL
+    GROUP BY categorie_probleme
+"""
+
+
+# Ligne pré-agrégée par rafraichir_statistiques() (event toutes les 60 s)
+REQUETE_STATS_RETOURS_AGREGAT = """
+    SELECT
+        total,
+        note_moyenne,
+        note_min,
+        note_max,
+        retours_positifs,
+        retours_negatifs,
+        retours_neutres,
+        par_statut,
+        par_categorie,
+        date_calcul
+    FROM retours_stats
+    WHERE id = 1
+    AND date_calcul >= DATE_SUB(NOW(), INTERVAL %s SECOND)
+"""
+
+
+def _statistiques_depuis_agregat(agregat: Dict) -> Dict:
+    """Convertit la ligne de retours_stats au format de _construire_statistiques()."""
+    return {
+        'total_retours': agregat['total'],
+        'note_moyenne': round(float(agregat['note_moyenne']), 2) if agregat['note_moyenne'] else 0,
+        'note_min': agregat['note_min'],
+        'note_max': agregat['note_max'],
+        'retours_positifs': agregat['retours_positifs'],
+        'retours_negatifs': agregat['retours_negatifs'],
+        'retours_neutres': agregat['retours_neutres'],
+        # JSON_OBJECTAGG vaut NULL sur une table vide
+        'par_statut': orjson.loads(agregat['par_statut']) if agregat['par_statut'] else {},
+        'par_categorie': orjson.loads(agregat['par_categorie']) if agregat['par_categorie'] else {},
+        'date_calcul': agregat['date_calcul']
+    }
+
+
+def _construire_statistiques(lignes: List[Dict]) -> Dict:
+    """Répartit les lignes de REQUETE_STATS_RETOURS dans le dictionnaire de statistiques."""
+    stats = None
+    par_statut = {}
+    par_categorie = {}
+
+    for ligne in lignes:
+        dimension = ligne['dimension']
+        if dimension == 'global':
+            stats = ligne
+        elif dimension == 'statut':
+            par_statut[ligne['valeur']] = ligne['total']
+        else:
+            par_categorie[ligne['valeur']] = ligne['total']
+
+    return {
+        'total_retours': stats['total'] if stats else 0,
+        'note_moyenne': round(float(stats['note_moyenne']), 2) if stats and stats['note_moyenne'] else 0,
+        'note_min': stats['note_min'] if stats else 0,
+        'note_max': stats['note_max'] if stats else 0,
+        'retours_positifs': stats['retours_positifs'] if stats else 0,
+        'retours_negatifs': stats['retours_negatifs'] if stats else 0,
+        'retours_neutres': stats['retours_neutres'] if stats else 0,
+        'par_statut': par_statut,
+        'par_categorie': par_categorie,
+        'date_calcul': datetime.now()
+    }
+
+
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
 def obtenir_statistiques_retours() -> Dict:
     """
     Calcule les statistiques globales des retours utilisateurs.
 
+    Lit la ligne pré-agrégée de retours_stats si elle a moins de
+    AGE_MAX_STATS_SECONDES (lecture par clé primaire), sinon recalcule
+    à la volée. Résultat mis en cache 30 s (invalidé à chaque insertion
+    ou traitement d'un retour).
+
     Returns:
-        Dictionnaire avec les statistiques
+        Dictionnaire avec les statistiques (`date_calcul` : instant du calcul)
 
     Raises:
         ErreurRequeteBD: Si la requête échoue
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
-            # Statistiques générales
-            query_stats = """
-                SELECT
-                    COUNT(*) as total_retours,
-                    AVG(note) as note_moyenne,
-                    MIN(note) as note_min,
-                    MAX(note) as note_max,
-                    SUM(CASE WHEN note >= 4 THEN 1 ELSE 0 END) as retours_positifs,
-                    SUM(CASE WHEN note <= 2 THEN 1 ELSE 0 END) as retours_negatifs,
-                    SUM(CASE WHEN note = 3 THEN 1 ELSE 0 END) as retours_neutres
-                FROM retours_utilisateurs
-            """
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            cursor.execute(REQUETE_STATS_RETOURS_AGREGAT, (AGE_MAX_STATS_SECONDES,))
+            agregat = cursor.fetchone()
 
-            cursor.execute(query_stats)
-            stats = cursor.fetchone()
+            if agregat:
+                return _statistiques_depuis_agregat(agregat)
 
-            # Répartition par statut
-            query_statuts = """
-                SELECT statut, COUNT(*) as count
-                FROM retours_utilisateurs
-                GROUP BY statut
-            """
+            cursor.execute(REQUETE_STATS_RETOURS)
+            result = _construire_statistiques(cursor.fetchall())
 
-            cursor.execute(query_statuts)
-            statuts = cursor.fetchall()
+            logger.debug(f"Statistiques calculées: {result['total_retours']} retours")
+
+            return result
+
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur calcul statistiques retours: {e}")
+        raise ErreurRequeteBD(
+            requete="SELECT statistiques retours_utilisateurs",
+            raison=str(e)
+        )
 
-            # Répartition par catégorie
-            query_categories = """
-                SELECT categorie_probleme, COUNT(*) as count
-                FROM retours_utilisateurs
-                WHERE categorie_probleme IS NOT NULL
-                GROUP BY categorie_probleme
-            """
 
-            cursor.execute(query_categories)
-            categories = cursor.fetchall()
-
-            # Construire le résultat
-            result = {
-                'total_retours': stats['total_retours'] if stats else 0,
-                'note_moyenne': round(float(stats['note_moyenne']), 2) if stats and stats['note_moyenne'] else 0,
-                'note_min': stats['note_min'] if stats else 0,
-                'note_max': stats['note_max'] if stats else 0,
-                'retours_positifs': stats['retours_positifs'] if stats else 0,
-                'retours_negatifs': stats['retours_negatifs'] if stats else 0,
-                'retours_neutres': stats['retours_neutres'] if stats else 0,
-                'par_statut': {row['statut']: row['count'] for row in statuts},
-                'par_categorie': {row['categorie_probleme']: row['count'] for row in categories}
-            }
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
+async def obtenir_statistiques_retours_async() -> Dict:
+    """
+    Variante asynchrone de obtenir_statistiques_retours() pour les endpoints FastAPI.
+
+    Returns:
+        Dictionnaire avec les statistiques (`date_calcul` : instant du calcul)
+
+    Raises:
+        ErreurRequeteBD: Si la requête échoue
+    """
+    try:
+        async with obtenir_curseur_async(lecture_seule=True) as (conn, cursor):
+            await cursor.execute(REQUETE_STATS_RETOURS_AGREGAT, (AGE_MAX_STATS_SECONDES,))
+            agregat = await cursor.fetchone()
+
+            if agregat:
+                return _statistiques_depuis_agregat(agregat)
+
+            await cursor.execute(REQUETE_STATS_RETOURS)
+            result = _construire_statistiques(await cursor.fetchall())
 
             logger.debug(f"Statistiques calculées: {result['total_retours']} retours")
 
@@ -538,10 +749,15 @@ def obtenir_statistiques_retours() -> Dict:
         )
 
 
+@cache_ttl(secondes=DUREE_CACHE_SECONDES)
 def compter_retours() -> int:
     """
     Compte le nombre total de retours utilisateurs.
 
+    Lit le compteur maintenu par triggers dans la table compteurs (lecture
+    par clé primaire) ; COUNT(*) exact, qui parcourt tout un index InnoDB,
+    seulement si le compteur est absent.
+
     Returns:
         Nombre total de retours
 
@@ -549,12 +765,16 @@ def compter_retours() -> int:
         ErreurRequeteBD: Si la requête échoue
     """
     try:
-        with obtenir_curseur() as (conn, cursor):
-            query = "SELECT COUNT(*) as count FROM retours_utilisateurs"
-
-            cursor.execute(query)
+        with obtenir_curseur(lecture_seule=True) as (conn, cursor):
+            cursor.execute(
+                "SELECT valeur AS count FROM compteurs WHERE nom = 'retours_utilisateurs'"
+            )
             result = cursor.fetchone()
 
+            if result is None:
+                cursor.execute("SELECT COUNT(*) as count FROM retours_utilisateurs")
+                result = cursor.fetchone()
+
             count = result['count'] if result else 0
 
             logger.debug(f"{count} retour(s) total dans la base")
@@ -582,5 +802,6 @@ __all__ = [
     'obtenir_retours_par_categorie',
     'marquer_retour_traite',
     'obtenir_statistiques_retours',
+    'obtenir_statistiques_retours_async',
     'compter_retours'
 ]
@@ -5,10 +5,24 @@ Le Container 2 (API Backend) délègue la recherche FAISS et génération LLM
 au Container 3 via HTTP.
 """
 
+import asyncio
+import base64
 import logging
 import os
-from typing import Dict, List, Any, Optional
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple
+import httpx
+import numpy as np
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.utilitaires.cache_persistant import CachePersistant, hacher_cle
 
 # ============================================================================
 # Configuration
@@ -21,6 +35,207 @@ LLM_SERVICE_HOST = os.getenv("LLM_SERVICE_HOST", "llm")
 LLM_SERVICE_PORT = int(os.getenv("LLM_SERVICE_PORT", "8001"))
 LLM_SERVICE_TIMEOUT = int(os.getenv("LLM_SERVICE_TIMEOUT", "300"))  # 5 minutes pour génération LLM
 
+# Pool de connexions HTTP keep-alive vers Container 3
+HTTP_POOL_CONNEXIONS = 10
+HTTP_POOL_TAILLE_MAX = 50
+HTTP_KEEPALIVE_MAX = 20
+
+# Reprises sur erreur transitoire (connexion refusée, Container 3 en redémarrage) :
+# nombre de reprises, backoff exponentiel avec gigue (secondes) et statuts concernés.
+# Pas de reprise sur 500 (crash) ni sur délai de lecture (génération déjà en cours).
+LLM_REPRISES_MAX = 3
+LLM_REPRISE_DELAI_BASE = 0.3
+LLM_REPRISE_DELAI_MAX = 2.0
+STATUTS_REPRISE = frozenset({502, 503, 504})
+
+# Cache des réponses par question exacte (normalisée) : taille LRU et durée de vie
+LLM_CACHE_TAILLE = int(os.getenv("LLM_CACHE_TAILLE", "1024"))
+LLM_CACHE_TTL_SECONDES = int(os.getenv("LLM_CACHE_TTL_SECONDES", "600"))
+
+# Version de l'index FAISS de Container 3, relue au plus une fois par
+# intervalle : un rebuild (admin ou auto-sync, quel que soit le worker
+# qui l'a servi) invalide les caches de réponses de chaque worker
+LLM_VERSION_INDEX_INTERVALLE_SECONDES = float(os.getenv("LLM_VERSION_INDEX_INTERVALLE_SECONDES", "5"))
+
+# Cache sémantique : similarité cosinus minimale entre embeddings pour
+# réutiliser une réponse (0 désactive le cache) et nombre d'entrées (FIFO)
+LLM_CACHE_SEMANTIQUE_SEUIL = float(os.getenv("LLM_CACHE_SEMANTIQUE_SEUIL", "0.97"))
+LLM_CACHE_SEMANTIQUE_TAILLE = int(os.getenv("LLM_CACHE_SEMANTIQUE_TAILLE", "4096"))
+
+# Cache persistant (SQLite) : survit aux redémarrages du conteneur
+# (chemin vide = désactivé)
+LLM_CACHE_PERSISTANT_CHEMIN = os.getenv("LLM_CACHE_PERSISTANT_CHEMIN", "/app/cache/reponses.sqlite3")
+LLM_CACHE_PERSISTANT_TTL_SECONDES = int(os.getenv("LLM_CACHE_PERSISTANT_TTL_SECONDES", "3600"))
+
+# Dimension des embeddings CamemBERT transmis par le frontend
+DIMENSION_EMBEDDING = 768
+
+# Format binaire de l'embedding transmis à Container 3 (float32 little-endian, base64)
+FORMAT_EMBEDDING = "<f4"
+
+# Corps des requêtes sérialisés par orjson (envoyés en bytes)
+ENTETES_JSON = {"Content-Type": "application/json"}
+
+# Streaming : délai d'établissement de la connexion
+LLM_SERVICE_DELAI_CONNEXION = 5
+
+
+# ============================================================================
+# Reprises avec backoff
+# ============================================================================
+
+def _delai_reprise(tentative: int) -> float:
+    """
+    Délai avant la reprise n° `tentative` (0, 1, 2...) : backoff exponentiel
+    plafonné, tiré uniformément dans [0, plafond] pour que les clients ne
+    relancent pas tous au même instant un service qui redémarre.
+    """
+    plafond = min(LLM_REPRISE_DELAI_MAX, LLM_REPRISE_DELAI_BASE * (2 ** tentative))
+    return random.uniform(0, plafond)
+
+
+class _RetryAvecGigue(Retry):
+    """Retry urllib3 dont le backoff est tiré au hasard (gigue complète) et plafonné."""
+
+    def get_backoff_time(self) -> float:
+        delai = min(super().get_backoff_time(), LLM_REPRISE_DELAI_MAX)
+        return random.uniform(0, delai) if delai > 0 else 0
+
+
+class _TransportAvecReprises(httpx.AsyncBaseTransport):
+    """
+    Transport httpx asynchrone rejouant une requête après une erreur de
+    connexion ou un statut de STATUTS_REPRISE.
+
+    Il ne sert que /search, /search/stream et /health, sans effet de bord
+    côté Container 3. Les appels d'administration (rebuild) passent par la
+    session synchrone, qui ne rejoue pas les POST.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for tentative in range(LLM_REPRISES_MAX + 1):
+            derniere = tentative == LLM_REPRISES_MAX
+
+            try:
+                response = await self._transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+                if derniere:
+                    raise
+                logger.warning(f"[REPRISE] Connexion Container 3 impossible ({e}), nouvel essai...")
+            else:
+                if response.status_code not in STATUTS_REPRISE or derniere:
+                    return response
+                await response.aclose()
+                logger.warning(f"[REPRISE] Container 3 a répondu {response.status_code}, nouvel essai...")
+
+            await asyncio.sleep(_delai_reprise(tentative))
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# ============================================================================
+# Cache sémantique
+# ============================================================================
+
+class _CacheSemantique:
+    """
+    Cache des réponses par similarité cosinus sur l'embedding de la question.
+
+    Deux reformulations d'une même question ont des embeddings quasi
+    identiques : la réponse de la première est réutilisée pour la seconde.
+    Les embeddings normalisés sont rangés dans une matrice float32
+    pré-allouée, utilisée en tampon circulaire (éviction FIFO) ; une
+    recherche est un unique produit matrice-vecteur.
+    """
+
+    def __init__(self, capacite: int, seuil: float, ttl: float):
+        """
+        Args:
+            capacite: Nombre maximal d'entrées
+            seuil: Similarité cosinus minimale pour un hit
+            ttl: Durée de validité d'une entrée (secondes)
+        """
+        self.seuil = seuil
+        self.ttl = ttl
+        self._embeddings = np.zeros((capacite, DIMENSION_EMBEDDING), dtype=np.float32)
+        self._k = np.zeros(capacite, dtype=np.int32)
+        self._expirations = np.zeros(capacite, dtype=np.float64)
+        self._resultats: List[Optional[Dict[str, Any]]] = [None] * capacite
+        self._taille = 0
+        self._position = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normaliser(embedding: np.ndarray) -> Optional[np.ndarray]:
+        """
+        Retourne l'embedding normalisé L2 en float32, ou None s'il est inutilisable.
+
+        Calculé une fois par requête et passé à chercher() puis ajouter().
+        """
+        vecteur = np.asarray(embedding, dtype=np.float32)
+        if vecteur.shape != (DIMENSION_EMBEDDING,):
+            return None
+
+        norme = float(np.linalg.norm(vecteur))
+        if norme == 0.0:
+            return None
+
+        return vecteur / norme
+
+    def chercher(self, vecteur: np.ndarray, k: int) -> Optional[Dict[str, Any]]:
+        """
+        Retourne le résultat de l'entrée la plus proche si sa similarité atteint le seuil.
+
+        Args:
+            vecteur: Embedding de la question, normalisé par normaliser()
+            k: Nombre de résultats FAISS demandés (doit être identique)
+        """
+        with self._lock:
+            if self._taille == 0:
+                return None
+
+            similarites = self._embeddings[:self._taille] @ vecteur
+            valides = (self._k[:self._taille] == k) & (
+                self._expirations[:self._taille] > time.monotonic()
+            )
+            similarites = np.where(valides, similarites, -1.0)
+
+            indice = int(np.argmax(similarites))
+            if similarites[indice] < self.seuil:
+                return None
+
+            return self._resultats[indice]
+
+    def ajouter(self, vecteur: np.ndarray, k: int, resultat: Dict[str, Any]) -> None:
+        """
+        Ajoute une entrée, en remplaçant la plus ancienne si le cache est plein.
+
+        Args:
+            vecteur: Embedding de la question, normalisé par normaliser()
+            k: Nombre de résultats FAISS demandés
+            resultat: Résultat à réutiliser (non modifié ensuite)
+        """
+        with self._lock:
+            indice = self._position
+            self._embeddings[indice] = vecteur
+            self._k[indice] = k
+            self._expirations[indice] = time.monotonic() + self.ttl
+            self._resultats[indice] = resultat
+
+            self._position = (indice + 1) % len(self._resultats)
+            self._taille = max(self._taille, indice + 1)
+
+    def vider(self) -> None:
+        """Supprime toutes les entrées."""
+        with self._lock:
+            self._resultats = [None] * len(self._resultats)
+            self._taille = 0
+            self._position = 0
+
 
 # ============================================================================
 # Classe LLMClient
@@ -52,18 +267,325 @@ class LLMClient:
         self.port = port or LLM_SERVICE_PORT
         self.timeout = timeout or LLM_SERVICE_TIMEOUT
         self.base_url = f"http://{self.host}:{self.port}"
+        self.session = self._creer_session()
+        self._client_async: Optional[httpx.AsyncClient] = None
+
+        # Version de l'index FAISS à laquelle se rapportent les caches (None
+        # tant qu'elle n'a pas pu être lue) et instant de sa dernière lecture
+        self._version_index: Optional[str] = None
+        self._version_index_lue = float("-inf")
+
+        # Cache LRU {cle: (expiration, resultat)}
+        self._cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Cache persistant sur disque (None si désactivé ou indisponible)
+        self._cache_persistant: Optional[CachePersistant] = None
+        if LLM_CACHE_PERSISTANT_CHEMIN:
+            try:
+                self._cache_persistant = CachePersistant(
+                    LLM_CACHE_PERSISTANT_CHEMIN,
+                    ttl_secondes=LLM_CACHE_PERSISTANT_TTL_SECONDES
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"[CACHE] Cache persistant désactivé ({LLM_CACHE_PERSISTANT_CHEMIN}): {e}")
+
+        # Recherches asynchrones en vol, par clé du cache (regroupement des doublons)
+        self._recherches_en_cours: Dict[Tuple, "asyncio.Future[Dict[str, Any]]"] = {}
+
+        # Cache sémantique sur l'embedding (None si désactivé)
+        self._cache_semantique: Optional[_CacheSemantique] = None
+        if LLM_CACHE_SEMANTIQUE_SEUIL > 0:
+            self._cache_semantique = _CacheSemantique(
+                capacite=LLM_CACHE_SEMANTIQUE_TAILLE,
+                seuil=LLM_CACHE_SEMANTIQUE_SEUIL,
+                ttl=LLM_CACHE_TTL_SECONDES
+            )
 
         logger.info(f"LLMClient initialisé: {self.base_url}")
 
-    def rechercher_et_generer(
+    @staticmethod
+    def _creer_session() -> requests.Session:
+        """
+        Crée la session HTTP des appels d'administration au Container 3.
+
+        Les connexions TCP sont conservées (keep-alive). Seuls les GET sont
+        retentés (erreurs de connexion, 502/503/504) avec un backoff
+        exponentiel à gigue : POST /faiss/rebuild a un effet de bord et dure
+        longtemps, un 504 de passerelle ne doit pas lancer un second rebuild.
+
+        Returns:
+            Session configurée
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_POOL_CONNEXIONS,
+            pool_maxsize=HTTP_POOL_TAILLE_MAX,
+            max_retries=_RetryAvecGigue(
+                total=LLM_REPRISES_MAX,
+                read=0,
+                backoff_factor=LLM_REPRISE_DELAI_BASE,
+                status_forcelist=STATUTS_REPRISE,
+                allowed_methods=frozenset({"GET"}),
+                raise_on_status=False
+            )
+        )
+        session.mount("http://", adapter)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    @staticmethod
+    def _corps_recherche(embedding: Optional[np.ndarray], question: str, k: int) -> bytes:
+        """
+        Sérialise le corps JSON d'une requête /search ou /search/stream.
+
+        L'embedding (s'il est fourni) est transmis en base64 de ses octets
+        float32 : ~4 Ko au lieu de ~15 Ko de flottants en texte, sans
+        conversion flottant par flottant de part et d'autre.
+        """
+        payload = {
+            "question": question,
+            "k": k
+        }
+
+        if embedding is not None:
+            vecteur = np.ascontiguousarray(embedding, dtype=FORMAT_EMBEDDING)
+            payload["embedding"] = base64.b64encode(vecteur.tobytes()).decode("ascii")
+
+        return orjson.dumps(payload)
+
+    def _cle_cache(self, embedding: Optional[np.ndarray], question: str, k: int) -> Tuple:
+        """
+        Clé du cache : version de l'index FAISS, question normalisée, k, et
+        mode (embedding fourni ou calculé).
+        """
+        return (self._version_index, question.strip().lower(), k, embedding is None)
+
+    def _vecteur_semantique(self, embedding: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        """Embedding normalisé pour le cache sémantique (None si inutilisé)."""
+        if embedding is None or self._cache_semantique is None:
+            return None
+        return _CacheSemantique.normaliser(embedding)
+
+    @staticmethod
+    def _cle_persistante(cle: Tuple) -> bytes:
+        """Empreinte SHA-256 d'une clé _cle_cache() pour le cache persistant."""
+        version, question, k, sans_embedding = cle
+        return hacher_cle(f"{version}|{k}|{int(sans_embedding)}|{question}")
+
+    def _lire_cache(
+        self,
+        cle: Tuple,
+        vecteur: Optional[np.ndarray],
+        k: int
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Retourne une copie du résultat en cache mémoire (cache_hit=True), ou None.
+
+        Cherche d'abord la question exacte, puis (si un embedding est fourni)
+        une question sémantiquement équivalente. Le cache persistant est lu
+        séparément (_lire_cache_persistant(), hors boucle d'événements).
+
+        Args:
+            cle: Clé construite par _cle_cache()
+            vecteur: Embedding normalisé (_vecteur_semantique()) ou None
+            k: Nombre de résultats FAISS demandés
+        """
+        resultat = None
+
+        with self._cache_lock:
+            entree = self._cache.get(cle)
+            if entree is not None:
+                expiration, resultat = entree
+                if expiration <= time.monotonic():
+                    del self._cache[cle]
+                    resultat = None
+                else:
+                    self._cache.move_to_end(cle)
+
+        if resultat is None and vecteur is not None:
+            resultat = self._cache_semantique.chercher(vecteur, k)
+            if resultat is not None:
+                logger.debug("[CACHE] Question équivalente trouvée dans le cache sémantique")
+
+        if resultat is None:
+            return None
+
+        logger.debug("[CACHE] Réponse Container 3 servie depuis le cache")
+        return {**resultat, "sources": list(resultat["sources"]), "cache_hit": True}
+
+    def _utilise_cache_persistant(self, cle: Tuple) -> bool:
+        """
+        Vrai si le cache persistant est actif pour cette clé.
+
+        Sans version connue de l'index, le disque pourrait servir une réponse
+        antérieure à un rebuild : seul le cache mémoire est alors utilisé.
+        """
+        return self._cache_persistant is not None and cle[0] is not None
+
+    def _lire_cache_persistant(self, cle: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        Cherche la question exacte dans le cache persistant (E/S SQLite :
+        appelée via asyncio.to_thread). Un hit est remonté en mémoire.
+
+        Returns:
+            Copie du résultat (cache_hit=True), ou None
+        """
+        try:
+            resultat = self._cache_persistant.obtenir(self._cle_persistante(cle))
+        except sqlite3.Error as e:
+            logger.warning(f"[CACHE] Lecture du cache persistant impossible: {e}")
+            return None
+
+        if resultat is None:
+            return None
+
+        # Remonte l'entrée en mémoire pour les appels suivants
+        with self._cache_lock:
+            self._cache[cle] = (time.monotonic() + LLM_CACHE_TTL_SECONDES, resultat)
+            if len(self._cache) > LLM_CACHE_TAILLE:
+                self._cache.popitem(last=False)
+
+        logger.debug("[CACHE] Réponse Container 3 servie depuis le cache persistant")
+        return {**resultat, "sources": list(resultat["sources"]), "cache_hit": True}
+
+    def _ecrire_cache_persistant(self, cle: Tuple, resultat: Dict[str, Any]) -> None:
+        """Enregistre un résultat sur disque (E/S SQLite : via asyncio.to_thread)."""
+        try:
+            self._cache_persistant.enregistrer(self._cle_persistante(cle), resultat)
+        except sqlite3.Error as e:
+            logger.warning(f"[CACHE] Écriture du cache persistant impossible: {e}")
+
+    def _ecrire_cache(
         self,
-        embedding: Optional[List[float]],
+        cle: Tuple,
+        vecteur: Optional[np.ndarray],
+        k: int,
+        resultat: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Met en cache mémoire une copie du résultat (éviction LRU au-delà de
+        LLM_CACHE_TAILLE).
+
+        Args:
+            cle: Clé construite par _cle_cache()
+            vecteur: Embedding normalisé (_vecteur_semantique()) ou None
+            k: Nombre de résultats FAISS demandés
+            resultat: Résultat retourné par Container 3
+
+        Returns:
+            La copie mise en cache (à enregistrer aussi sur disque), ou None
+            si l'index a été reconstruit pendant la requête
+        """
+        if cle[0] != self._version_index:
+            # Index reconstruit pendant la requête : résultat déjà périmé
+            return None
+
+        copie = {**resultat, "sources": list(resultat["sources"])}
+
+        if vecteur is not None:
+            self._cache_semantique.ajouter(vecteur, k, copie)
+
+        with self._cache_lock:
+            self._cache[cle] = (time.monotonic() + LLM_CACHE_TTL_SECONDES, copie)
+            self._cache.move_to_end(cle)
+            if len(self._cache) > LLM_CACHE_TAILLE:
+                self._cache.popitem(last=False)
+
+        return copie
+
+    def _vider_caches_memoire(self) -> None:
+        """Vide les caches en mémoire (question exacte et sémantique)."""
+        with self._cache_lock:
+            self._cache.clear()
+        if self._cache_semantique is not None:
+            self._cache_semantique.vider()
+
+    async def _verifier_version_index_async(self) -> None:
+        """
+        Relit la version de l'index FAISS (au plus une fois par
+        LLM_VERSION_INDEX_INTERVALLE_SECONDES) et vide les caches en mémoire
+        si elle a changé. Les entrées du cache persistant, dont la clé
+        contient la version, deviennent simplement inaccessibles.
+
+        En cas d'échec, la version connue est conservée.
+        """
+        maintenant = time.monotonic()
+        if maintenant - self._version_index_lue < LLM_VERSION_INDEX_INTERVALLE_SECONDES:
+            return
+        self._version_index_lue = maintenant
+
+        try:
+            response = await self.client_async.get("/faiss/version", timeout=LLM_SERVICE_DELAI_CONNEXION)
+            response.raise_for_status()
+            version = str(orjson.loads(response.content)["version"])
+        except (httpx.HTTPError, ValueError, KeyError) as e:
+            logger.debug(f"[CACHE] Version de l'index FAISS illisible: {e}")
+            return
+
+        if version != self._version_index:
+            if self._version_index is not None:
+                logger.info(f"[CACHE] Index FAISS reconstruit (version {version}), caches vidés")
+            self._version_index = version
+            self._vider_caches_memoire()
+
+    def invalider_cache(self) -> None:
+        """
+        Vide le cache des réponses (après un rebuild de l'index FAISS) et
+        force la relecture de la version de l'index à la requête suivante.
+        """
+        self._vider_caches_memoire()
+        self._version_index_lue = float("-inf")
+        if self._cache_persistant is not None:
+            try:
+                self._cache_persistant.vider()
+            except sqlite3.Error as e:
+                logger.warning(f"[CACHE] Vidage du cache persistant impossible: {e}")
+        logger.info("[CACHE] Cache des réponses Container 3 vidé")
+
+    @property
+    def client_async(self) -> httpx.AsyncClient:
+        """
+        Client httpx asynchrone (créé au premier usage, dans la boucle d'événements).
+
+        Pendant la génération LLM, la coroutine appelante rend la main à la
+        boucle au lieu d'occuper un thread du worker. Les erreurs transitoires
+        sont rejouées par _TransportAvecReprises.
+        """
+        if self._client_async is None:
+            transport = httpx.AsyncHTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_TAILLE_MAX,
+                    max_keepalive_connections=HTTP_KEEPALIVE_MAX
+                )
+            )
+            self._client_async = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=httpx.Timeout(self.timeout, connect=LLM_SERVICE_DELAI_CONNEXION),
+                transport=_TransportAvecReprises(transport),
+                headers={"Connection": "keep-alive"}
+            )
+        return self._client_async
+
+    async def rechercher_et_generer_async(
+        self,
+        embedding: Optional[np.ndarray],
         question: str,
         k: int = 3
     ) -> Dict[str, Any]:
         """
         Envoie une requête au Container 3 pour recherche FAISS + génération LLM.
 
+        Les réponses sont mises en cache par question normalisée (LRU,
+        LLM_CACHE_TTL_SECONDES) et par embedding (similarité cosinus >=
+        LLM_CACHE_SEMANTIQUE_SEUIL) : une question répétée ou reformulée
+        ne refait pas l'aller-retour vers Container 3. Les caches se rapportent
+        à une version de l'index FAISS : un rebuild (admin ou auto-sync) les
+        invalide dans chaque worker. Les appels concurrents
+        pour une même question (clé du cache) sont regroupés : un seul
+        aller-retour, dont le résultat est partagé (cache_hit=True pour les
+        appels regroupés).
+
         Args:
             embedding: Vecteur embedding (768 dimensions CamemBERT) ou None (Container 3 le calcule)
             question: Question originale de l'utilisateur
@@ -75,63 +597,103 @@ class LLMClient:
                 - confiance: float (score top-1)
                 - sources: List[int] (IDs base_connaissances)
                 - temps_ms: int (temps traitement Container 3)
+                - cache_hit: bool (réponse servie par le cache)
 
         Raises:
             Exception: Si la requête échoue
         """
-        endpoint = f"{self.base_url}/search"
+        await self._verifier_version_index_async()
+
+        cle = self._cle_cache(embedding, question, k)
+        vecteur = self._vecteur_semantique(embedding)
+        resultat = self._lire_cache(cle, vecteur, k)
+        if resultat is None and self._utilise_cache_persistant(cle):
+            resultat = await asyncio.to_thread(self._lire_cache_persistant, cle)
+        if resultat is not None:
+            return resultat
+
+        en_cours = self._recherches_en_cours.get(cle)
+        if en_cours is not None:
+            logger.debug("[CACHE] Question identique en cours de génération, résultat partagé")
+            resultat = await asyncio.shield(en_cours)
+            return {**resultat, "sources": list(resultat["sources"]), "cache_hit": True}
+
+        en_cours = asyncio.get_running_loop().create_future()
+        # Marque l'éventuelle exception comme lue si aucun appel n'a été regroupé
+        en_cours.add_done_callback(lambda futur: futur.exception())
+        self._recherches_en_cours[cle] = en_cours
 
-        payload = {
-            "question": question,
-            "k": k
-        }
-        
-        # N'inclure l'embedding que s'il est fourni
-        if embedding is not None:
-            payload["embedding"] = embedding
+        try:
+            resultat = await self._appeler_recherche_async(cle, vecteur, embedding, question, k)
+            en_cours.set_result(resultat)
+            return resultat
+        except Exception as e:
+            en_cours.set_exception(e)
+            raise
+        except asyncio.CancelledError:
+            en_cours.set_exception(Exception("Erreur Container 3: requête annulée"))
+            raise
+        finally:
+            del self._recherches_en_cours[cle]
+
+    async def _appeler_recherche_async(
+        self,
+        cle: Tuple,
+        vecteur: Optional[np.ndarray],
+        embedding: Optional[np.ndarray],
+        question: str,
+        k: int
+    ) -> Dict[str, Any]:
+        """
+        Appelle /search sur Container 3 et met le résultat en cache.
+
+        Raises:
+            Exception: Si la requête échoue
+        """
+        corps = self._corps_recherche(embedding, question, k)
 
         try:
-            logger.debug(f"Envoi requête à Container 3: {endpoint}")
-            embedding_info = f"{len(embedding)}d" if embedding else "auto"
-            logger.debug(f"  Payload: question={question[:50]}..., k={k}, embedding={embedding_info}")
-
-            response = requests.post(
-                endpoint,
-                json=payload,
-                timeout=self.timeout
-            )
+            logger.debug(f"Envoi requête à Container 3: {self.base_url}/search")
 
+            response = await self.client_async.post("/search", content=corps, headers=ENTETES_JSON)
             response.raise_for_status()
 
-            data = response.json()
+            data = orjson.loads(response.content)
 
             logger.info(
                 f"[OK] Reponse Container 3: confiance={data['confiance']:.3f}, "
                 f"temps={data['temps_ms']}ms, sources={data['sources']}"
             )
 
-            return {
+            resultat = {
                 "reponse": data["reponse"],
                 "confiance": data["confiance"],
                 "sources": data["sources"],
-                "temps_ms": data["temps_ms"]
+                "temps_ms": data["temps_ms"],
+                "cache_hit": False
             }
+            copie = self._ecrire_cache(cle, vecteur, k, resultat)
+            if copie is not None and self._utilise_cache_persistant(cle):
+                await asyncio.to_thread(self._ecrire_cache_persistant, cle, copie)
+
+            return resultat
 
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             logger.error(f"[ERREUR] Timeout connexion Container 3 ({self.timeout}s)")
-            logger.error(f"   Vérifier: Container 3 est-il démarré ? docker ps | grep llm")
             raise Exception(f"Timeout Container 3 après {self.timeout}s")
 
-        except requests.exceptions.ConnectionError as e:
+        except httpx.TransportError as e:
             logger.error(f"[ERREUR] Erreur connexion Container 3: {e}")
             logger.error(f"   Debug: host={self.host}, port={self.port}")
-            logger.error(f"   Vérifier: 1) Container 3 running ? 2) Réseau Docker 3) Healthcheck")
             raise Exception(f"Container 3 inaccessible: {e}")
 
-        except requests.exceptions.HTTPError as e:
-            status_code = response.status_code if response else "N/A"
+        except httpx.HTTPStatusError as e:
+            status_code = e.response.status_code
             logger.error(f"[ERREUR] Erreur HTTP Container 3: {e} (status={status_code})")
-            error_detail = response.json().get("detail", str(e)) if response else str(e)
+            try:
+                error_detail = e.response.json().get("detail", str(e))
+            except ValueError:
+                error_detail = str(e)
             if status_code == 500:
                 logger.error(f"   Container 3 crash interne - Vérifier logs: docker logs mila_llm_faiss")
             raise Exception(f"Erreur Container 3: {error_detail}")
@@ -140,7 +702,7 @@ class LLMClient:
             logger.error(f"[ERREUR] Erreur inattendue Container 3: {e}")
             raise Exception(f"Erreur Container 3: {e}")
 
-    def healthcheck(self) -> Dict[str, Any]:
+    async def healthcheck_async(self) -> Dict[str, Any]:
         """
         Vérifie la santé du Container 3.
 
@@ -150,11 +712,8 @@ class LLMClient:
         Raises:
             Exception: Si le healthcheck échoue
         """
-        endpoint = f"{self.base_url}/health"
-
         try:
-            #response = requests.get(endpoint, timeout=5) test de timeout plus long pour les tests
-            response = requests.get(endpoint, timeout=15)
+            response = await self.client_async.get("/health", timeout=15)
             response.raise_for_status()
             return response.json()
 
@@ -162,6 +721,97 @@ class LLMClient:
             logger.error(f"[ERREUR] Healthcheck Container 3 echoue: {e}")
             raise Exception(f"Container 3 unhealthy: {e}")
 
+    async def fermer(self) -> None:
+        """
+        Ferme les clients HTTP (session synchrone des appels d'administration
+        et client asynchrone) et leurs connexions keep-alive, ainsi que le
+        cache persistant.
+
+        À appeler à l'arrêt de l'application (voir fermer_llm_client()).
+        """
+        self.session.close()
+        if self._client_async is not None:
+            await self._client_async.aclose()
+            self._client_async = None
+        if self._cache_persistant is not None:
+            self._cache_persistant.fermer()
+            self._cache_persistant = None
+        logger.info("[OK] Clients HTTP vers Container 3 fermés")
+
+    async def iter_generer_async(
+        self,
+        embedding: Optional[np.ndarray],
+        question: str,
+        k: int = 3
+    ) -> AsyncIterator[bytes]:
+        """
+        Variante streamée de rechercher_et_generer_async() (endpoint /search/stream).
+
+        La requête est envoyée et son statut HTTP vérifié dès l'appel : les
+        erreurs de connexion ou HTTP sont levées ici, avant que l'appelant
+        n'ait commencé à répondre. Le flux est ensuite lu par le client httpx
+        dans la boucle d'événements, sans thread occupé ni corps chargé
+        entièrement en mémoire.
+
+        Args:
+            embedding: Vecteur embedding (768 dimensions CamemBERT) ou None (Container 3 le calcule)
+            question: Question originale de l'utilisateur
+            k: Nombre de résultats FAISS (défaut: 3)
+
+        Returns:
+            Itérateur asynchrone de lignes NDJSON (bytes, sans retour à la
+            ligne) : un événement "meta", des événements "token", puis "fin"
+            ou "erreur"
+
+        Raises:
+            Exception: Si la requête échoue
+        """
+        corps = self._corps_recherche(embedding, question, k)
+
+        try:
+            logger.debug(f"Envoi requête streamée à Container 3: {self.base_url}/search/stream")
+
+            requete = self.client_async.build_request(
+                "POST", "/search/stream", content=corps, headers=ENTETES_JSON
+            )
+            response = await self.client_async.send(requete, stream=True)
+
+            if response.is_error:
+                await response.aread()
+                try:
+                    detail = response.json().get("detail", response.reason_phrase)
+                except ValueError:
+                    detail = response.reason_phrase
+                await response.aclose()
+                logger.error(f"[ERREUR] Erreur HTTP Container 3 (status={response.status_code})")
+                raise Exception(f"Erreur Container 3: {detail}")
+
+        except httpx.TimeoutException:
+            logger.error(f"[ERREUR] Timeout connexion Container 3 ({LLM_SERVICE_DELAI_CONNEXION}s)")
+            raise Exception(f"Timeout Container 3 après {LLM_SERVICE_DELAI_CONNEXION}s")
+
+        except httpx.TransportError as e:
+            logger.error(f"[ERREUR] Erreur connexion Container 3: {e}")
+            logger.error(f"   Debug: host={self.host}, port={self.port}")
+            raise Exception(f"Container 3 inaccessible: {e}")
+
+        return self._lire_flux_async(response)
+
+    @staticmethod
+    async def _lire_flux_async(response: httpx.Response) -> AsyncIterator[bytes]:
+        """Rend les lignes non vides du flux dès leur arrivée, puis libère la connexion."""
+        try:
+            reste = b""
+            async for bloc in response.aiter_bytes():
+                *lignes, reste = (reste + bloc).split(b"\n")
+                for ligne in lignes:
+                    if ligne:
+                        yield ligne
+            if reste:
+                yield reste
+        finally:
+            await response.aclose()
+
     def forcer_rebuild_faiss(self) -> Dict[str, Any]:
         """
         Force un rebuild de l'index FAISS (endpoint admin).
@@ -177,12 +827,15 @@ class LLMClient:
         try:
             logger.info("[REBUILD] Demande rebuild FAISS au Container 3...")
 
-            response = requests.post(endpoint, timeout=300)  # 5 min timeout
+            response = self.session.post(endpoint, timeout=300)  # 5 min timeout
             response.raise_for_status()
 
             data = response.json()
             logger.info(f"[OK] Rebuild termine: {data}")
 
+            # Les réponses en cache proviennent de l'ancien index
+            self.invalider_cache()
+
             return data
 
         except Exception as e:
@@ -202,7 +855,7 @@ class LLMClient:
         endpoint = f"{self.base_url}/faiss/status"
 
         try:
-            response = requests.get(endpoint, timeout=5)
+            response = self.session.get(endpoint, timeout=5)
             response.raise_for_status()
             return response.json()
 
@@ -233,11 +886,25 @@ def obtenir_llm_client() -> LLMClient:
     return _client_global
 
 
+async def fermer_llm_client() -> None:
+    """
+    Ferme le client LLM global s'il a été créé.
+
+    À appeler à l'arrêt de l'application (shutdown du lifespan FastAPI).
+    """
+    global _client_global
+
+    if _client_global is not None:
+        await _client_global.fermer()
+        _client_global = None
+
+
 # ============================================================================
 # Export
 # ============================================================================
 
 __all__ = [
     'LLMClient',
-    'obtenir_llm_client'
+    'obtenir_llm_client',
+    'fermer_llm_client'
 ]
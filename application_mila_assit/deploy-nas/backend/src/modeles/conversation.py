@@ -6,10 +6,17 @@ Architecture 4 containers (Déc 2025):
 - Si absent, le Container 3 le calcule automatiquement
 """
 
-from typing import List, Optional
+import base64
+import binascii
+from typing import List, Optional, Union
 from uuid import uuid4
+
+import numpy as np
 from pydantic import BaseModel, Field, field_validator
 
+# Format binaire accepté pour un embedding encodé en base64 (float32 little-endian)
+FORMAT_EMBEDDING = "<f4"
+
 
 class RequeteConversation(BaseModel):
     """
@@ -18,10 +25,12 @@ class RequeteConversation(BaseModel):
     Attributes:
         id_session: UUID de session utilisateur (généré automatiquement si non fourni)
         question: Question posée par l'utilisateur
-        embedding: Vecteur embedding calculé côté client (optionnel pour rétrocompatibilité)
+        embedding: Vecteur embedding calculé côté client (optionnel pour rétrocompatibilité),
+            converti en np.ndarray float32 à la validation
     """
     id_session: Optional[str] = Field(
-        default_factory=lambda: str(uuid4()),
+        # Forme compacte (32 car.), remise en forme à tirets au stockage
+        default_factory=lambda: uuid4().hex,
         description="UUID de session utilisateur (v4)"
     )
     question: str = Field(
@@ -30,11 +39,39 @@ class RequeteConversation(BaseModel):
         max_length=500,
         description="Question posée par l'utilisateur"
     )
-    embedding: Optional[List[float]] = Field(
+    embedding: Optional[Union[List[float], str]] = Field(
         default=None,
-        description="Vecteur embedding (768 dimensions CamemBERT) - Architecture 4 containers (Déc 2025)"
+        description=(
+            "Vecteur embedding (768 dimensions CamemBERT) - Architecture 4 containers (Déc 2025). "
+            "Liste de flottants, ou chaîne base64 des octets float32 little-endian"
+        )
     )
 
+    @field_validator("embedding")
+    @classmethod
+    def convertir_embedding(cls, valeur):
+        """
+        Convertit l'embedding en vecteur numpy float32 (3 Ko contigus).
+
+        Une liste vide équivaut à l'absence d'embedding. La dimension est
+        vérifiée par l'endpoint (erreur 400).
+        """
+        if valeur is None:
+            return None
+
+        if isinstance(valeur, str):
+            try:
+                octets = base64.b64decode(valeur, validate=True)
+            except binascii.Error:
+                raise ValueError("Embedding base64 invalide")
+            if len(octets) % 4:
+                raise ValueError("Embedding base64 invalide (taille non multiple de 4 octets)")
+            vecteur = np.frombuffer(octets, dtype=FORMAT_EMBEDDING)
+        else:
+            vecteur = np.asarray(valeur, dtype=np.float32)
+
+        return vecteur if vecteur.size else None
+
     class Config:
         json_schema_extra = {
             "example": {
@@ -65,6 +65,39 @@ class ReponseRetour(BaseModel):
         }
 
 
+class RetourListe(BaseModel):
+    """Ligne d'un listing de retours (par note, statut ou catégorie)."""
+    id: int = Field(..., description="ID du retour")
+    id_conversation: int = Field(..., description="ID de la conversation")
+    note: int = Field(..., description="Note (1-5)")
+    commentaire: Optional[str] = Field(None, description="Commentaire utilisateur")
+    categorie_probleme: Optional[str] = Field(None, description="Catégorie du problème")
+    statut: str = Field(..., description="Statut de traitement")
+    date_creation: datetime = Field(..., description="Date de création du retour")
+    question_utilisateur: Optional[str] = Field(None, description="Question de la conversation")
+    score_confiance: Optional[float] = Field(None, description="Score de confiance de la réponse")
+
+    class Config:
+        # Construit directement depuis les lignes nommées de la couche base_donnees
+        from_attributes = True
+
+
+class RetoursColonnes(BaseModel):
+    """
+    Listing de retours en colonnes : une liste par champ de RetourListe,
+    alignées par position (la ligne i est formée des éléments i).
+    """
+    id: List[int] = Field(..., description="IDs des retours")
+    id_conversation: List[int] = Field(..., description="IDs des conversations")
+    note: List[int] = Field(..., description="Notes (1-5)")
+    commentaire: List[Optional[str]] = Field(..., description="Commentaires utilisateur")
+    categorie_probleme: List[Optional[str]] = Field(..., description="Catégories du problème")
+    statut: List[str] = Field(..., description="Statuts de traitement")
+    date_creation: List[datetime] = Field(..., description="Dates de création")
+    question_utilisateur: List[Optional[str]] = Field(..., description="Questions des conversations")
+    score_confiance: List[Optional[float]] = Field(..., description="Scores de confiance")
+
+
 class FeedbackAdmin(BaseModel):
     """Détails d'un feedback pour l'interface admin."""
     id_retour: int = Field(..., description="ID du retour")
@@ -5,10 +5,13 @@ Fournit les fonctions pour créer et vérifier les tokens JWT,
 ainsi que les dépendances FastAPI pour l'authentification.
 """
 
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+import bcrypt
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
@@ -20,8 +23,15 @@ SECRET_KEY = config.JWT_SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 heures
 
-# Context de hachage des mots de passe
-contexte_mdp = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Coût bcrypt des nouveaux hashs (valeur par défaut de passlib, hashs existants compatibles)
+BCRYPT_ROUNDS = 12
+
+# Cache des tokens déjà vérifiés : {token: (expiration_cache, payload)}
+# Une entrée vit au plus TOKEN_CACHE_TTL_SECONDES, et jamais au-delà de l'exp du token
+TOKEN_CACHE_TAILLE = 4096
+TOKEN_CACHE_TTL_SECONDES = 60
+_tokens_verifies: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+_tokens_verifies_lock = threading.Lock()
 
 # Schéma OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -55,6 +65,10 @@ def verifier_token(token: str) -> Dict[str, Any]:
     """
     Vérifie et décode un token JWT.
 
+    Un token déjà vérifié est servi depuis un cache mémoire (LRU,
+    TOKEN_CACHE_TTL_SECONDES) sans recalculer la signature HMAC-SHA256 ;
+    son expiration est tout de même revérifiée.
+
     Args:
         token: Token JWT à vérifier
 
@@ -70,12 +84,32 @@ def verifier_token(token: str) -> Dict[str, Any]:
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    maintenant = time.time()
+
+    with _tokens_verifies_lock:
+        entree = _tokens_verifies.get(token)
+        if entree is not None:
+            if entree[0] > maintenant:
+                _tokens_verifies.move_to_end(token)
+                return dict(entree[1])
+            del _tokens_verifies[token]
+
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         raise credentials_exception
 
+    expiration = maintenant + TOKEN_CACHE_TTL_SECONDES
+    if isinstance(payload.get("exp"), (int, float)):
+        expiration = min(expiration, payload["exp"])
+
+    with _tokens_verifies_lock:
+        _tokens_verifies[token] = (expiration, dict(payload))
+        if len(_tokens_verifies) > TOKEN_CACHE_TAILLE:
+            _tokens_verifies.popitem(last=False)
+
+    return payload
+
 
 def verifier_token_admin(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
     """
@@ -112,7 +146,8 @@ def hacher_mot_de_passe(mot_de_passe: str) -> str:
     Returns:
         Mot de passe haché
     """
-    return contexte_mdp.hash(mot_de_passe)
+    sel = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
+    return bcrypt.hashpw(mot_de_passe.encode("utf-8"), sel).decode("ascii")
 
 
 def verifier_mot_de_passe(mot_de_passe: str, hash_mdp: str) -> bool:
@@ -126,4 +161,4 @@ def verifier_mot_de_passe(mot_de_passe: str, hash_mdp: str) -> bool:
     Returns:
         True si le mot de passe correspond, False sinon
     """
-    return contexte_mdp.verify(mot_de_passe, hash_mdp)
+    return bcrypt.checkpw(mot_de_passe.encode("utf-8"), hash_mdp.encode("ascii"))
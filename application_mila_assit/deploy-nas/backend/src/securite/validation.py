@@ -6,9 +6,29 @@ afin de prévenir les attaques par injection et le spam.
 """
 
 import re
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
 from uuid import UUID
 
+# Expressions compilées une fois à l'import (appelées à chaque question)
+_BALISE_HTML_RE = re.compile(r'<[^>]+>')
+
+# Motifs de spam réunis pour un seul parcours du texte :
+# groupe 1 = caractère répété plus de 10 fois, sinon début d'URL.
+# Le début d'URL ne consomme que le préfixe, pour qu'une répétition
+# à l'intérieur d'une URL reste détectée.
+_SPAM_RE = re.compile(r'(.)\1{10,}|https?://(?=\S)')
+
+# Fin d'une URL (premier espace) : une URL couvre tout le bloc sans espace,
+# comme l'ancien motif https?://[^\s]+
+_FIN_URL_RE = re.compile(r'\S*')
+
+MESSAGE_SPAM = "La question contient du contenu suspect (spam détecté)"
+
+
+class QuestionSpam(ValueError):
+    """Question refusée par detecter_spam() (distincte des autres refus)."""
+
 
 def sanitize_input(texte: str) -> str:
     """
@@ -32,7 +52,7 @@ def sanitize_input(texte: str) -> str:
         raise ValueError("Le texte dépasse la longueur maximale autorisée de 5000 caractères")
 
     # Retirer les balises HTML
-    texte_nettoye = re.sub(r'<[^>]+>', '', texte)
+    texte_nettoye = _BALISE_HTML_RE.sub('', texte)
 
     return texte_nettoye
 
@@ -67,17 +87,27 @@ def detecter_spam(texte: str) -> bool:
     Returns:
         True si du spam est détecté, False sinon
     """
-    # Détecter plusieurs URLs (plus de 3)
-    urls = re.findall(r'https?://[^\s]+', texte)
-    if len(urls) > 3:
-        return True
-
-    # Détecter caractères répétés plus de 10 fois
-    if re.search(r'(.)\1{10,}', texte):
-        return True
+    # Un seul parcours : caractères répétés plus de 10 fois, ou plus de 3 URLs
+    # (arrêt au premier motif concluant)
+    nb_urls = 0
+    fin_url = 0
+    for correspondance in _SPAM_RE.finditer(texte):
+        if correspondance.group(1) is not None:
+            return True
+
+        # Préfixe à l'intérieur de l'URL précédente (ex: http://http://) :
+        # une seule URL
+        if correspondance.start() < fin_url:
+            continue
+
+        nb_urls += 1
+        if nb_urls > 3:
+            return True
+        fin_url = _FIN_URL_RE.match(texte, correspondance.end()).end()
 
     # Détecter majuscules excessives (plus de 70% du texte)
-    if texte.isupper() and len(texte) > 20:
+    # (longueur d'abord : isupper() parcourt tout le texte)
+    if len(texte) > 20 and texte.isupper():
         return True
 
     return False
@@ -119,32 +149,67 @@ def valider_longueur_texte(texte: Optional[str], max_length: int) -> None:
         )
 
 
-def valider_question(question: str) -> str:
+@lru_cache(maxsize=2048)
+def _valider_question_memo(question: str) -> Tuple[bool, str]:
     """
-    Valide et nettoie une question utilisateur.
+    Validation mémorisée d'une question (fonction pure de son texte).
+
+    Retourne le verdict plutôt que de lever l'exception, pour que les
+    questions refusées soient elles aussi mises en cache.
 
     Args:
         question: Question à valider
 
     Returns:
-        Question nettoyée et validée
-
-    Raises:
-        ValueError: Si la question est invalide
+        (True, question nettoyée) ou (False, message d'erreur)
     """
-    # Nettoyer la question
-    question = sanitize_input(question)
+    try:
+        # Nettoyer la question
+        question = sanitize_input(question)
+    except ValueError as e:
+        return False, str(e)
 
     # Vérifier la longueur minimale
     if len(question) < 3:
-        raise ValueError("La question doit contenir au moins 3 caractères")
+        return False, "La question doit contenir au moins 3 caractères"
 
     # Vérifier la longueur maximale
     if len(question) > 500:
-        raise ValueError("La question ne peut pas dépasser 500 caractères")
+        return False, "La question ne peut pas dépasser 500 caractères"
 
     # Détecter le spam
     if detecter_spam(question):
-        raise ValueError("La question contient du contenu suspect (spam détecté)")
+        return False, MESSAGE_SPAM
+
+    return True, question
+
 
-    return question
+def valider_question(question: str) -> str:
+    """
+    Valide et nettoie une question utilisateur.
+
+    Le résultat est mémorisé (LRU, 2048 questions) : une question répétée
+    (rafraîchissement, nouvel essai) ne repasse pas par les expressions
+    régulières.
+
+    Args:
+        question: Question à valider
+
+    Returns:
+        Question nettoyée et validée
+
+    Raises:
+        QuestionSpam: Si la question est détectée comme spam
+        ValueError: Si la question est invalide
+    """
+    if len(question) > 5000:
+        # Texte refusé de toute façon : ne pas l'installer dans le cache
+        valide, resultat = _valider_question_memo.__wrapped__(question)
+    else:
+        valide, resultat = _valider_question_memo(question)
+    if not valide:
+        if resultat == MESSAGE_SPAM:
+            raise QuestionSpam(resultat)
+        raise ValueError(resultat)
+
+    return resultat
@@ -0,0 +1,176 @@
+"""
+Cache mémoire à durée de vie limitée (TTL) pour Mila-Assist.
+
+Destiné aux agrégats du dashboard (métriques, statistiques des retours) :
+ces valeurs tolèrent quelques dizaines de secondes de retard, et un appel
+servi par le cache n'emprunte aucune connexion MySQL.
+
+Usage:
+    from src.utilitaires.cache import cache_ttl
+
+    @cache_ttl(secondes=30)
+    def obtenir_statistiques():
+        ...
+
+    obtenir_statistiques.vider()  # Invalidation après écriture
+
+Chaque appelant reçoit sa propre copie du résultat (il peut la modifier
+sans altérer le cache). Une valeur de repli renvoyée après une erreur est
+signalée par exclure_du_cache() et n'est pas mémorisée.
+"""
+
+import asyncio
+import contextvars
+import copy
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Types immuables renvoyés tels quels (sans copie)
+_TYPES_IMMUABLES = (int, float, str, bytes, bool, type(None))
+
+# Drapeau de l'appel en cours (un par appel décoré, propre au thread et à
+# la tâche asyncio) : levé par exclure_du_cache()
+_exclusion_courante: contextvars.ContextVar[Optional[List[bool]]] = contextvars.ContextVar(
+    "exclusion_cache", default=None
+)
+
+
+def exclure_du_cache() -> None:
+    """
+    Empêche la mise en cache du résultat de l'appel décoré en cours.
+
+    À appeler dans la branche d'erreur d'une fonction décorée par
+    cache_ttl() qui renvoie une valeur de repli : l'appel suivant refera
+    la requête au lieu de resservir le repli pendant toute la durée du TTL.
+    Sans effet hors d'une fonction décorée.
+    """
+    exclusion = _exclusion_courante.get()
+    if exclusion is not None:
+        exclusion[0] = True
+
+
+def _copier(valeur: Any) -> Any:
+    """Copie profonde des résultats mutables (dictionnaires, listes)."""
+    if isinstance(valeur, _TYPES_IMMUABLES):
+        return valeur
+    return copy.deepcopy(valeur)
+
+
+def cache_ttl(secondes: float = 30) -> Callable:
+    """
+    Décorateur mettant en cache le résultat d'une fonction pendant `secondes`.
+
+    La clé est construite à partir des arguments liés à la signature, valeurs
+    par défaut comprises (qui doivent donc être hashables) : f(), f('24h')
+    et f(periode='24h') partagent la même entrée. Le cache est protégé par
+    un verrou :
+    la fonction décorée peut être appelée depuis plusieurs threads.
+    Les fonctions `async def` sont supportées (le résultat attendu est mis
+    en cache, pas la coroutine). Le cache conserve une copie du résultat et
+    chaque lecture en renvoie une nouvelle copie. Un résultat calculé avant
+    un appel à vider() n'est pas enregistré après celui-ci.
+
+    Args:
+        secondes: Durée de validité d'une entrée
+
+    Returns:
+        Décorateur ; la fonction décorée expose une méthode `vider()`
+
+    Example:
+        >>> @cache_ttl(secondes=10)
+        ... def obtenir_latence_moyenne(periode: str = '24h') -> float:
+        ...     ...
+        >>> obtenir_latence_moyenne('24h')  # Requête MySQL
+        >>> obtenir_latence_moyenne('24h')  # Servi par le cache
+    """
+    def decorateur(func: Callable) -> Callable:
+        entrees: Dict[Tuple, Tuple[float, Any]] = {}
+        verrou = threading.Lock()
+        signature = inspect.signature(func)
+        # Incrémentée par vider() : un calcul commencé avant l'invalidation
+        # ne réécrit pas sa valeur périmée après
+        generation = [0]
+
+        def construire_cle(args: Tuple, kwargs: Dict[str, Any]) -> Tuple:
+            arguments = signature.bind(*args, **kwargs)
+            arguments.apply_defaults()
+            return tuple(
+                (nom, tuple(sorted(valeur.items())) if isinstance(valeur, dict) else valeur)
+                for nom, valeur in arguments.arguments.items()
+            )
+
+        def lire(cle: Tuple, maintenant: float) -> Tuple[bool, Any, int]:
+            with verrou:
+                entree = entrees.get(cle)
+                if entree is None or entree[0] <= maintenant:
+                    return False, None, generation[0]
+                valeur = entree[1]
+            return True, _copier(valeur), 0
+
+        def ecrire(
+            cle: Tuple,
+            maintenant: float,
+            valeur: Any,
+            exclusion: List[bool],
+            generation_lue: int
+        ) -> None:
+            if exclusion[0]:
+                return
+            valeur = _copier(valeur)
+            with verrou:
+                if generation[0] == generation_lue:
+                    entrees[cle] = (maintenant + secondes, valeur)
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                cle = construire_cle(args, kwargs)
+                maintenant = time.monotonic()
+
+                trouve, valeur, generation_lue = lire(cle, maintenant)
+                if trouve:
+                    return valeur
+
+                exclusion = [False]
+                jeton = _exclusion_courante.set(exclusion)
+                try:
+                    valeur = await func(*args, **kwargs)
+                finally:
+                    _exclusion_courante.reset(jeton)
+                ecrire(cle, maintenant, valeur, exclusion, generation_lue)
+                return valeur
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                cle = construire_cle(args, kwargs)
+                maintenant = time.monotonic()
+
+                trouve, valeur, generation_lue = lire(cle, maintenant)
+                if trouve:
+                    return valeur
+
+                exclusion = [False]
+                jeton = _exclusion_courante.set(exclusion)
+                try:
+                    valeur = func(*args, **kwargs)
+                finally:
+                    _exclusion_courante.reset(jeton)
+                ecrire(cle, maintenant, valeur, exclusion, generation_lue)
+                return valeur
+
+        def vider() -> None:
+            """Invalide toutes les entrées du cache de cette fonction."""
+            with verrou:
+                entrees.clear()
+                generation[0] += 1
+
+        wrapper.vider = vider
+        return wrapper
+
+    return decorateur
+
+
+__all__ = ['cache_ttl', 'exclure_du_cache']
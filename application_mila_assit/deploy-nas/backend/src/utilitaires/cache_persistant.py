@@ -0,0 +1,260 @@
+"""
+Cache persistant (SQLite) des réponses du Container 3 pour Mila-Assist.
+
+Complète les caches mémoire de LLMClient : les réponses survivent au
+redémarrage du conteneur, qui repart avec un cache chaud. Un filtre de
+Bloom en mémoire, chargé au démarrage puis resynchronisé avec la table,
+répond à la plupart des absences sans lire le disque.
+
+Usage:
+    from src.utilitaires.cache_persistant import CachePersistant, hacher_cle
+
+    cache = CachePersistant("/app/cache/reponses.sqlite3", ttl_secondes=3600)
+    cle = hacher_cle("comment configurer le tts ?|5")
+    reponse = cache.obtenir(cle)  # None si absente ou expirée
+    cache.enregistrer(cle, {"reponse": "..."})
+"""
+
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def hacher_cle(texte: str) -> bytes:
+    """
+    Calcule la clé binaire (SHA-256) d'une entrée du cache.
+
+    Args:
+        texte: Clé textuelle (question normalisée et paramètres)
+
+    Returns:
+        Empreinte SHA-256 (32 octets)
+    """
+    return hashlib.sha256(texte.encode("utf-8")).digest()
+
+
+class FiltreBloom:
+    """
+    Filtre de Bloom sur des empreintes SHA-256.
+
+    Les positions sont dérivées de l'empreinte elle-même (double hachage
+    Kirsch-Mitzenmacher) : aucun hachage supplémentaire par test. Un
+    test négatif est certain ; un test positif peut être un faux positif
+    (taux visé `taux_erreur` jusqu'à `capacite` éléments).
+    """
+
+    def __init__(self, capacite: int = 10_000, taux_erreur: float = 0.01):
+        """
+        Args:
+            capacite: Nombre d'éléments prévu
+            taux_erreur: Taux de faux positifs visé à pleine capacité
+        """
+        self.nb_bits = max(8, math.ceil(-capacite * math.log(taux_erreur) / math.log(2) ** 2))
+        self.nb_hachages = max(1, round(self.nb_bits / capacite * math.log(2)))
+        self._bits = bytearray((self.nb_bits + 7) // 8)
+
+    def _positions(self, empreinte: bytes):
+        h1 = int.from_bytes(empreinte[:8], "little")
+        h2 = int.from_bytes(empreinte[8:16], "little") | 1
+        return ((h1 + i * h2) % self.nb_bits for i in range(self.nb_hachages))
+
+    def ajouter(self, empreinte: bytes) -> None:
+        """Ajoute une empreinte au filtre."""
+        for position in self._positions(empreinte):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, empreinte: bytes) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(empreinte)
+        )
+
+    def vider(self) -> None:
+        """Retire tous les éléments."""
+        self._bits = bytearray(len(self._bits))
+
+
+class CachePersistant:
+    """
+    Cache clé/valeur sur disque (SQLite en mode WAL) avec durée de vie.
+
+    Les valeurs sont des dictionnaires sérialisés en JSON (orjson). La
+    connexion est partagée entre threads et protégée par un verrou ; le
+    mode WAL permet à plusieurs workers uvicorn d'utiliser le même fichier.
+    Les entrées expirées sont purgées (et le filtre de Bloom reconstruit)
+    à l'ouverture puis au plus toutes les `intervalle_purge` secondes lors
+    d'une écriture : ni la table ni le filtre ne grossissent sans limite.
+
+    Le filtre de Bloom est propre au processus : il ne voit pas les
+    écritures des autres workers. Une absence dans le filtre n'est donc
+    certaine qu'à la date de sa dernière synchronisation ; sur une absence,
+    les clés écrites depuis (date_creation récente, tous workers confondus)
+    sont rechargées, au plus toutes les `intervalle_synchro` secondes, puis
+    le test est refait.
+    """
+
+    # Marge (secondes) sur date_creation lors d'une synchronisation : couvre
+    # une écriture horodatée juste avant la synchro précédente mais validée
+    # après
+    MARGE_SYNCHRO_SECONDES = 5
+
+
+    def __init__(
+        self,
+        chemin: Union[str, Path],
+        ttl_secondes: int = 3600,
+        capacite_filtre: int = 10_000,
+        intervalle_purge: int = 300,
+        intervalle_synchro: float = 1.0
+    ):
+        """
+        Ouvre (ou crée) la base, purge les entrées expirées et charge le
+        filtre de Bloom.
+
+        Args:
+            chemin: Fichier SQLite
+            ttl_secondes: Durée de vie d'une entrée
+            capacite_filtre: Nombre d'entrées prévu pour le filtre de Bloom
+            intervalle_purge: Délai minimal entre deux purges (secondes)
+            intervalle_synchro: Délai minimal entre deux synchronisations du
+                filtre avec la table (secondes)
+
+        Raises:
+            sqlite3.Error: Si la base ne peut pas être ouverte
+        """
+        self.chemin = Path(chemin)
+        self.ttl_secondes = ttl_secondes
+        self.intervalle_purge = intervalle_purge
+        self.intervalle_synchro = intervalle_synchro
+        self._filtre = FiltreBloom(capacite=capacite_filtre)
+        self._lock = threading.Lock()
+
+        self.chemin.parent.mkdir(parents=True, exist_ok=True)
+        self._connexion = sqlite3.connect(
+            str(self.chemin), check_same_thread=False, isolation_level=None
+        )
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute("PRAGMA synchronous=NORMAL")
+        self._connexion.execute("""
+            CREATE TABLE IF NOT EXISTS reponses (
+                cle BLOB PRIMARY KEY,
+                valeur BLOB NOT NULL,
+                date_creation INTEGER NOT NULL
+            )
+        """)
+        self._connexion.execute(
+            "CREATE INDEX IF NOT EXISTS idx_reponses_date ON reponses (date_creation)"
+        )
+
+        nb_cles = self.purger()
+
+        logger.info(f"[OK] Cache persistant ouvert: {self.chemin} ({nb_cles} entrées)")
+
+    def purger(self) -> int:
+        """
+        Supprime les entrées expirées et reconstruit le filtre de Bloom à
+        partir des clés restantes.
+
+        Returns:
+            Nombre d'entrées conservées
+        """
+        limite = int(time.time()) - self.ttl_secondes
+        with self._lock:
+            self._connexion.execute("DELETE FROM reponses WHERE date_creation < ?", (limite,))
+
+            self._derniere_synchro_horloge = int(time.time())
+            self._filtre.vider()
+            nb_cles = 0
+            for (cle,) in self._connexion.execute("SELECT cle FROM reponses"):
+                self._filtre.ajouter(cle)
+                nb_cles += 1
+
+            self._derniere_purge = time.monotonic()
+            self._derniere_synchro = self._derniere_purge
+
+        return nb_cles
+
+    def _synchroniser_filtre(self) -> bool:
+        """
+        Ajoute au filtre les clés écrites depuis la dernière synchronisation
+        (par ce worker ou un autre). Appelée sous verrou.
+
+        Returns:
+            False si la synchronisation précédente est trop récente
+        """
+        maintenant = time.monotonic()
+        if maintenant - self._derniere_synchro < self.intervalle_synchro:
+            return False
+
+        depuis = self._derniere_synchro_horloge - self.MARGE_SYNCHRO_SECONDES
+        self._derniere_synchro_horloge = int(time.time())
+        for (cle,) in self._connexion.execute(
+            "SELECT cle FROM reponses WHERE date_creation >= ?", (depuis,)
+        ):
+            self._filtre.ajouter(cle)
+
+        self._derniere_synchro = maintenant
+        return True
+
+    def obtenir(self, cle: bytes) -> Optional[Dict[str, Any]]:
+        """
+        Retourne la valeur associée à `cle`, ou None (absente ou expirée).
+
+        Args:
+            cle: Empreinte calculée par hacher_cle()
+        """
+        limite = int(time.time()) - self.ttl_secondes
+        with self._lock:
+            if cle not in self._filtre and not (
+                self._synchroniser_filtre() and cle in self._filtre
+            ):
+                return None
+
+            ligne = self._connexion.execute(
+                "SELECT valeur FROM reponses WHERE cle = ? AND date_creation >= ?",
+                (cle, limite)
+            ).fetchone()
+
+        return orjson.loads(ligne[0]) if ligne else None
+
+    def enregistrer(self, cle: bytes, valeur: Dict[str, Any]) -> None:
+        """
+        Enregistre (ou remplace) une valeur.
+
+        Args:
+            cle: Empreinte calculée par hacher_cle()
+            valeur: Dictionnaire sérialisable en JSON
+        """
+        with self._lock:
+            self._connexion.execute(
+                "INSERT OR REPLACE INTO reponses (cle, valeur, date_creation) VALUES (?, ?, ?)",
+                (cle, orjson.dumps(valeur), int(time.time()))
+            )
+            self._filtre.ajouter(cle)
+            purge_due = time.monotonic() - self._derniere_purge >= self.intervalle_purge
+
+        if purge_due:
+            self.purger()
+
+    def vider(self) -> None:
+        """Supprime toutes les entrées."""
+        with self._lock:
+            self._connexion.execute("DELETE FROM reponses")
+            self._filtre.vider()
+
+    def fermer(self) -> None:
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            self._connexion.close()
+
+
+__all__ = ['CachePersistant', 'FiltreBloom', 'hacher_cle']
@@ -5,7 +5,15 @@ Définit toutes les exceptions métier de l'application pour une gestion
 d'erreurs cohérente et informative.
 """
 
-from typing import Optional, Any, Dict
+from types import MappingProxyType
+from typing import Optional, Any, Dict, Mapping, Type
+
+# Détails vides partagés (lecture seule) : une exception sans détails
+# n'alloue pas de dictionnaire
+_DETAILS_VIDES: Mapping[str, Any] = MappingProxyType({})
+
+# Nom de classe -> classe, alimenté à la définition de chaque exception
+_REGISTRE_EXCEPTIONS: Dict[str, Type["MilaAssistException"]] = {}
 
 
 # ============================================================================
@@ -20,11 +28,28 @@ class MilaAssistException(Exception):
         message: Message d'erreur descriptif
         code: Code d'erreur optionnel
         details: Détails additionnels optionnels
+
+    message, code et details ne changent plus après __init__ : __str__
+    (appelé par chaque formatter/handler de logging) et to_dict() sont
+    calculés une fois puis mémorisés sur l'instance.
+
+    Les attributs sont déclarés dans __slots__ (ainsi qu'un __slots__ vide
+    sur chaque sous-classe) : pas de __dict__ alloué par instance levée.
+
+    Une sous-classe dont le message dépend de ses propres attributs peut
+    passer message=None et implémenter _construire_message() : le message
+    est alors formaté dans __init__ et transmis à Exception (args, repr).
     """
 
+    __slots__ = ("_message", "code", "details", "_str_cache", "_dict_cache")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _REGISTRE_EXCEPTIONS[cls.__name__] = cls
+
     def __init__(
         self,
-        message: str,
+        message: Optional[str],
         code: Optional[str] = None,
         details: Optional[Dict[str, Any]] = None
     ):
@@ -32,34 +57,103 @@ class MilaAssistException(Exception):
         Initialise l'exception.
 
         Args:
-            message: Message d'erreur
+            message: Message d'erreur (None : formaté par _construire_message)
             code: Code d'erreur optionnel (ex: "DB_CONNECTION_FAILED")
             details: Détails additionnels sous forme de dictionnaire
         """
-        self.message = message
+        self._message = message
         self.code = code or self.__class__.__name__.upper()
-        self.details = details or {}
-        super().__init__(self.message)
+        self.details = details if details else _DETAILS_VIDES
+        self._str_cache: Optional[str] = None
+        self._dict_cache: Optional[Dict[str, Any]] = None
+        if message is None:
+            self._message = self._construire_message()
+        super().__init__(self._message)
+
+    @property
+    def message(self) -> str:
+        """Message d'erreur."""
+        return self._message
+
+    def _construire_message(self) -> str:
+        """
+        Formate le message des sous-classes passant message=None.
+
+        Par défaut : le message stocké, ou le code d'erreur à défaut.
+        """
+        return self._message or self.code
+
+    def __reduce__(self):
+        """Sérialisation pickle : restaure aussi les attributs des __slots__."""
+        etat = {
+            nom: getattr(self, nom)
+            for classe in type(self).__mro__
+            for nom in getattr(classe, "__slots__", ())
+            if not nom.endswith("_cache") and hasattr(self, nom)
+        }
+        if isinstance(etat.get("details"), MappingProxyType):
+            etat["details"] = dict(etat["details"])
+        return _restaurer_exception, (type(self), self.args, etat)
 
     def __str__(self) -> str:
         """Représentation string de l'exception."""
-        if self.details:
-            return f"[{self.code}] {self.message} - Details: {self.details}"
-        return f"[{self.code}] {self.message}"
+        if self._str_cache is None:
+            if self.details:
+                self._str_cache = f"[{self.code}] {self.message} - Details: {self.details}"
+            else:
+                self._str_cache = f"[{self.code}] {self.message}"
+        return self._str_cache
 
     def to_dict(self) -> Dict[str, Any]:
         """
         Convertit l'exception en dictionnaire pour sérialisation JSON.
 
         Returns:
-            Dictionnaire avec les informations de l'exception
+            Dictionnaire avec les informations de l'exception (partagé entre
+            les appels : à copier avant toute modification)
         """
-        return {
-            "error": self.__class__.__name__,
-            "code": self.code,
-            "message": self.message,
-            "details": self.details
-        }
+        if self._dict_cache is None:
+            self._dict_cache = {
+                "error": self.__class__.__name__,
+                "code": self.code,
+                "message": self.message,
+                "details": dict(self.details)
+            }
+        return self._dict_cache
+
+
+_REGISTRE_EXCEPTIONS[MilaAssistException.__name__] = MilaAssistException
+
+
+def _restaurer_exception(
+    classe: Type[MilaAssistException],
+    args: tuple,
+    etat: Dict[str, Any]
+) -> MilaAssistException:
+    """Reconstruit une exception picklée sans rappeler son __init__."""
+    exception = classe.__new__(classe, *args)
+    exception.args = args
+    for nom, valeur in etat.items():
+        setattr(exception, nom, valeur)
+    exception._str_cache = None
+    exception._dict_cache = None
+    return exception
+
+
+def obtenir_classe_exception(nom: str) -> Type[MilaAssistException]:
+    """
+    Retrouve une classe d'exception à partir de son nom.
+
+    Sert à reconstruire l'exception depuis le champ "error" de to_dict()
+    (réponses JSON, tests) sans parcourir __subclasses__().
+
+    Args:
+        nom: Nom de la classe (ex: "ErreurRequeteBD")
+
+    Returns:
+        La classe correspondante, ou MilaAssistException si le nom est inconnu
+    """
+    return _REGISTRE_EXCEPTIONS.get(nom, MilaAssistException)
 
 
 # ============================================================================
@@ -69,6 +163,8 @@ class MilaAssistException(Exception):
 class ErreurEmbedding(MilaAssistException):
     """Exception levée lors d'erreurs liées aux embeddings."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Erreur lors du calcul des embeddings",
@@ -80,6 +176,8 @@ class ErreurEmbedding(MilaAssistException):
 class ErreurChargementModeleEmbedding(ErreurEmbedding):
     """Exception levée lors du chargement du modèle d'embeddings."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         model_name: str,
@@ -96,6 +194,8 @@ class ErreurChargementModeleEmbedding(ErreurEmbedding):
 class ErreurEncodageTexte(ErreurEmbedding):
     """Exception levée lors de l'encodage d'un texte en embedding."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         texte: str,
@@ -106,7 +206,7 @@ class ErreurEncodageTexte(ErreurEmbedding):
         if raison:
             message += f": {raison}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details['texte_longueur'] = len(texte)
 
         super().__init__(
@@ -123,6 +223,8 @@ class ErreurEncodageTexte(ErreurEmbedding):
 class ErreurBaseDeDonnees(MilaAssistException):
     """Exception levée lors d'erreurs liées à la base de données."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Erreur de base de données",
@@ -135,6 +237,8 @@ class ErreurBaseDeDonnees(MilaAssistException):
 class ErreurConnexionBD(ErreurBaseDeDonnees):
     """Exception levée lors d'échecs de connexion à la base de données."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         host: str,
@@ -146,7 +250,7 @@ class ErreurConnexionBD(ErreurBaseDeDonnees):
         if raison:
             message += f": {raison}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details.update({'host': host, 'database': database})
 
         super().__init__(
@@ -159,6 +263,8 @@ class ErreurConnexionBD(ErreurBaseDeDonnees):
 class ErreurRequeteBD(ErreurBaseDeDonnees):
     """Exception levée lors d'erreurs d'exécution de requêtes SQL."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         requete: str,
@@ -169,9 +275,9 @@ class ErreurRequeteBD(ErreurBaseDeDonnees):
         if raison:
             message += f": {raison}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         # Limiter la taille de la requête dans les détails
-        details['requete'] = requete[:200] + ('...' if len(requete) > 200 else '')
+        details['requete'] = requete if len(requete) <= 200 else requete[:200] + '...'
 
         super().__init__(
             message,
@@ -183,6 +289,8 @@ class ErreurRequeteBD(ErreurBaseDeDonnees):
 class ErreurIntegriteBD(ErreurBaseDeDonnees):
     """Exception levée lors de violations de contraintes d'intégrité."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         contrainte: str,
@@ -203,23 +311,29 @@ class ErreurIntegriteBD(ErreurBaseDeDonnees):
 class ErreurEnregistrementIntrouvable(ErreurBaseDeDonnees):
     """Exception levée quand un enregistrement demandé n'existe pas."""
 
+    __slots__ = ("table", "identifiant")
+
     def __init__(
         self,
         table: str,
         identifiant: Any,
         **kwargs
     ):
-        message = f"Enregistrement introuvable dans {table} (id={identifiant})"
+        self.table = table
+        self.identifiant = identifiant
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details.update({'table': table, 'id': identifiant})
 
         super().__init__(
-            message,
+            None,
             code="RECORD_NOT_FOUND",
             details=details
         )
 
+    def _construire_message(self) -> str:
+        return f"Enregistrement introuvable dans {self.table} (id={self.identifiant})"
+
 
 # ============================================================================
 # Exceptions LLM (Large Language Model)
@@ -228,6 +342,8 @@ class ErreurEnregistrementIntrouvable(ErreurBaseDeDonnees):
 class ErreurLLM(MilaAssistException):
     """Exception levée lors d'erreurs liées au modèle de langage."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Erreur du modèle de langage",
@@ -240,6 +356,8 @@ class ErreurLLM(MilaAssistException):
 class ErreurChargementModeleLLM(ErreurLLM):
     """Exception levée lors du chargement du modèle LLM."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         model_path: str,
@@ -250,7 +368,7 @@ class ErreurChargementModeleLLM(ErreurLLM):
         if raison:
             message += f" - {raison}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details['model_path'] = model_path
 
         super().__init__(
@@ -263,6 +381,8 @@ class ErreurChargementModeleLLM(ErreurLLM):
 class ErreurGenerationTexte(ErreurLLM):
     """Exception levée lors de la génération de texte par le LLM."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         prompt: str,
@@ -273,9 +393,9 @@ class ErreurGenerationTexte(ErreurLLM):
         if raison:
             message += f": {raison}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         # Limiter la taille du prompt dans les détails
-        details['prompt'] = prompt[:200] + ('...' if len(prompt) > 200 else '')
+        details['prompt'] = prompt if len(prompt) <= 200 else prompt[:200] + '...'
 
         super().__init__(
             message,
@@ -287,6 +407,8 @@ class ErreurGenerationTexte(ErreurLLM):
 class ErreurTimeoutLLM(ErreurLLM):
     """Exception levée lorsque le LLM dépasse le timeout."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         timeout_seconds: int,
@@ -294,7 +416,7 @@ class ErreurTimeoutLLM(ErreurLLM):
     ):
         message = f"Le LLM a dépassé le timeout de {timeout_seconds}s"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details['timeout_seconds'] = timeout_seconds
 
         super().__init__(
@@ -311,6 +433,8 @@ class ErreurTimeoutLLM(ErreurLLM):
 class ErreurFAISS(MilaAssistException):
     """Exception levée lors d'erreurs liées à FAISS."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Erreur FAISS",
@@ -323,6 +447,8 @@ class ErreurFAISS(MilaAssistException):
 class ErreurChargementIndexFAISS(ErreurFAISS):
     """Exception levée lors du chargement de l'index FAISS."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         index_path: str,
@@ -333,7 +459,7 @@ class ErreurChargementIndexFAISS(ErreurFAISS):
         if raison:
             message += f" - {raison}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details['index_path'] = index_path
 
         super().__init__(
@@ -346,6 +472,8 @@ class ErreurChargementIndexFAISS(ErreurFAISS):
 class ErreurRechercheFAISS(ErreurFAISS):
     """Exception levée lors d'une recherche FAISS."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         raison: Optional[str] = None,
@@ -369,6 +497,8 @@ class ErreurRechercheFAISS(ErreurFAISS):
 class ErreurValidation(MilaAssistException):
     """Exception levée lors d'erreurs de validation de données."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Erreur de validation",
@@ -378,7 +508,7 @@ class ErreurValidation(MilaAssistException):
         if champ:
             message = f"Validation échouée pour le champ '{champ}': {message}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         if champ:
             details['champ'] = champ
 
@@ -388,6 +518,8 @@ class ErreurValidation(MilaAssistException):
 class ErreurValidationQuestion(ErreurValidation):
     """Exception levée lors de la validation d'une question utilisateur."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         question: str,
@@ -408,6 +540,8 @@ class ErreurValidationQuestion(ErreurValidation):
 class ErreurConfiguration(MilaAssistException):
     """Exception levée lors d'erreurs de configuration."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Erreur de configuration",
@@ -417,7 +551,7 @@ class ErreurConfiguration(MilaAssistException):
         if parametre:
             message = f"Paramètre de configuration invalide '{parametre}': {message}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         if parametre:
             details['parametre'] = parametre
 
@@ -431,6 +565,8 @@ class ErreurConfiguration(MilaAssistException):
 class ErreurAPI(MilaAssistException):
     """Exception levée lors d'erreurs API."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Erreur API",
@@ -438,7 +574,7 @@ class ErreurAPI(MilaAssistException):
         code: Optional[str] = None,
         **kwargs
     ):
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details['status_code'] = status_code
 
         super().__init__(message, code=code or "API_ERROR", details=details)
@@ -447,28 +583,36 @@ class ErreurAPI(MilaAssistException):
 class ErreurRateLimiting(ErreurAPI):
     """Exception levée lorsque la limite de requêtes est atteinte."""
 
+    __slots__ = ("limite", "periode")
+
     def __init__(
         self,
         limite: int,
         periode: str = "minute",
         **kwargs
     ):
-        message = f"Limite de {limite} requêtes par {periode} atteinte"
+        self.limite = limite
+        self.periode = periode
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         details.update({'limite': limite, 'periode': periode})
 
         super().__init__(
-            message,
+            None,
             status_code=429,
             code="RATE_LIMIT_EXCEEDED",
             details=details
         )
 
+    def _construire_message(self) -> str:
+        return f"Limite de {self.limite} requêtes par {self.periode} atteinte"
+
 
 class ErreurAuthentification(ErreurAPI):
     """Exception levée lors d'erreurs d'authentification."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Authentification échouée",
@@ -485,6 +629,8 @@ class ErreurAuthentification(ErreurAPI):
 class ErreurAutorisation(ErreurAPI):
     """Exception levée lors d'erreurs d'autorisation."""
 
+    __slots__ = ()
+
     def __init__(
         self,
         message: str = "Accès non autorisé",
@@ -494,7 +640,7 @@ class ErreurAutorisation(ErreurAPI):
         if ressource:
             message += f" à la ressource: {ressource}"
 
-        details = kwargs.get('details', {})
+        details = dict(kwargs.get('details') or ())
         if ressource:
             details['ressource'] = ressource
 
@@ -510,9 +656,10 @@ class ErreurAutorisation(ErreurAPI):
 # Export
 # ============================================================================
 
-__all__ = [
+__all__ = (
     # Base
     'MilaAssistException',
+    'obtenir_classe_exception',
 
     # Embeddings
     'ErreurEmbedding',
@@ -549,4 +696,4 @@ __all__ = [
     'ErreurRateLimiting',
     'ErreurAuthentification',
     'ErreurAutorisation',
-]
+)
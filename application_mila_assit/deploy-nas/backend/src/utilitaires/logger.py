@@ -4,6 +4,10 @@ Système de logging centralisé pour Mila-Assist.
 Configure un logger avec rotation de fichiers, formatage personnalisé,
 et niveaux de log différenciés.
 
+Les handlers (console, fichiers) sont servis par un thread d'écoute
+(QueueListener) : un appel de log dans une requête se limite à déposer
+l'enregistrement dans une file, sans écriture disque ni rotation.
+
 Utilisation:
     from src.utilitaires.logger import logger
 
@@ -11,11 +15,18 @@ Utilisation:
     logger.error("Erreur lors du chargement du modèle", exc_info=True)
 """
 
+import atexit
+import copy
 import logging
+import os
+import queue
 import sys
+import time
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, List, Optional, Set
+
+import orjson
 
 from src.utilitaires.config import parametres
 
@@ -43,6 +54,9 @@ class FormatteurCouleur(logging.Formatter):
         logging.CRITICAL: ROUGE_GRAS
     }
 
+    # Noms de niveau colorés et alignés (construits sous la classe)
+    NIVEAUX_COLORES: Dict[int, str] = {}
+
     def __init__(self, fmt: str, utiliser_couleurs: bool = True):
         """
         Initialise le formatteur.
@@ -64,17 +78,250 @@ class FormatteurCouleur(logging.Formatter):
         Returns:
             Message formaté avec ou sans couleurs
         """
-        if self.utiliser_couleurs and record.levelno in self.COULEURS:
-            # Copier le record pour ne pas modifier l'original
-            record = logging.makeLogRecord(record.__dict__)
-
-            # Ajouter couleur au niveau de log
-            couleur = self.COULEURS[record.levelno]
-            record.levelname = f"{couleur}{record.levelname:8s}{self.RESET}"
+        if self.utiliser_couleurs and record.levelno in self.NIVEAUX_COLORES:
+            # Colorer le niveau le temps du formatage puis le restaurer : les
+            # handlers d'un même record sont servis l'un après l'autre par le
+            # thread d'écoute, aucun autre ne voit la valeur modifiée
+            levelname_original = record.levelname
+            record.levelname = self.NIVEAUX_COLORES[record.levelno]
+            try:
+                return super().format(record)
+            finally:
+                record.levelname = levelname_original
 
         return super().format(record)
 
 
+FormatteurCouleur.NIVEAUX_COLORES.update(
+    (niveau, f"{couleur}{logging.getLevelName(niveau):8s}{FormatteurCouleur.RESET}")
+    for niveau, couleur in FormatteurCouleur.COULEURS.items()
+)
+
+
+class FormatteurJSON(logging.Formatter):
+    """
+    Formatteur des fichiers de log : une ligne JSON (orjson) par record.
+
+    Un seul appel C (orjson.dumps) au lieu des substitutions % et du
+    strftime du formatteur texte ; les fichiers deviennent analysables
+    ligne par ligne. "ts" est l'horodatage Unix (record.created).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entree = {
+            "ts": record.created,
+            "lvl": record.levelname,
+            "name": record.name,
+            "module": record.module,
+            "func": record.funcName,
+            "line": record.lineno,
+            "msg": record.getMessage(),
+            "path": record.pathname
+        }
+
+        # Renseignés par QueueHandlerTraces.prepare() (exc_info y est converti
+        # en exc_text avant de traverser la file)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entree["exc"] = record.exc_text
+        if record.stack_info:
+            entree["stack"] = self.formatStack(record.stack_info)
+
+        return orjson.dumps(entree).decode()
+
+
+class QueueHandlerTraces(QueueHandler):
+    """
+    QueueHandler qui conserve la trace d'exception à part du message.
+
+    QueueHandler.prepare() formate le record (message + trace + pile) dans
+    msg puis efface exc_info/exc_text : FormatteurJSON ne verrait plus
+    qu'un "msg" multi-lignes. Ici seul le message est résolu ; la trace est
+    convertie en texte dans exc_text (les objets traceback ne traversent
+    pas la file) et stack_info est conservé.
+    """
+
+    _formatteur_traces = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self._formatteur_traces.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class RotatingFileHandlerEchantillonne(RotatingFileHandler):
+    """
+    RotatingFileHandler dont la taille du fichier n'est vérifiée que tous
+    les maxBytes/1024 octets écrits.
+
+    RotatingFileHandler.shouldRollover() fait un seek + tell sur le fichier
+    à chaque enregistrement ; ici un compteur d'octets (longueur du message
+    formaté) espace ces appels. Le fichier peut dépasser maxBytes d'au plus
+    ~0,1 % avant la rotation.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._octets_depuis_verification = 0
+        self._verifier_tous_les = max(1, self.maxBytes // 1024)
+
+    def shouldRollover(self, record: logging.LogRecord) -> int:
+        if self.maxBytes <= 0:
+            return 0
+
+        self._octets_depuis_verification += len(self.format(record)) + 1
+        if self._octets_depuis_verification < self._verifier_tous_les:
+            return 0
+
+        self._octets_depuis_verification = 0
+        return super().shouldRollover(record)
+
+
+class RotatingFileHandlerTamponne(RotatingFileHandlerEchantillonne):
+    """
+    Handler rotatif dont le fichier est écrit par blocs de 64 Ko.
+
+    StreamHandler.emit() vide le flux après chaque enregistrement (un appel
+    système write() par ligne) ; ici le vidage n'a lieu que tous les
+    VIDER_TOUS_LES enregistrements, après VIDER_APRES_SECONDES, ou
+    immédiatement pour ERROR et au-delà. Un worker inactif est vidé par
+    QueueListenerVidage (vider_si_en_attente() toutes les
+    VIDER_APRES_SECONDES sans nouvel enregistrement). Un appel explicite à
+    flush() (arrêt du processus, logging.shutdown) vide toujours.
+    """
+
+    TAILLE_TAMPON = 64 * 1024
+    VIDER_TOUS_LES = 64
+    VIDER_APRES_SECONDES = 1.0
+
+    def __init__(self, *args, **kwargs):
+        self._dans_emit = False
+        self._vidage_force = False
+        self._ecritures_depuis_vidage = 0
+        self._dernier_vidage = time.monotonic()
+        super().__init__(*args, **kwargs)
+
+    def _open(self):
+        return open(
+            self.baseFilename, self.mode, buffering=self.TAILLE_TAMPON,
+            encoding=self.encoding, errors=self.errors
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._dans_emit = True
+        self._vidage_force = record.levelno >= logging.ERROR
+        try:
+            super().emit(record)
+        finally:
+            self._dans_emit = False
+
+    def flush(self) -> None:
+        maintenant = time.monotonic()
+        if self._dans_emit and not self._vidage_force:
+            # Vidage demandé par StreamHandler.emit() : différé
+            self._ecritures_depuis_vidage += 1
+            if (self._ecritures_depuis_vidage < self.VIDER_TOUS_LES
+                    and maintenant - self._dernier_vidage < self.VIDER_APRES_SECONDES):
+                return
+
+        self._ecritures_depuis_vidage = 0
+        self._dernier_vidage = maintenant
+        super().flush()
+
+    def vider_si_en_attente(self) -> None:
+        """Vide le tampon si des enregistrements y attendent encore."""
+        with self.lock:
+            if self._ecritures_depuis_vidage:
+                self.flush()
+
+
+class QueueListenerVidage(QueueListener):
+    """
+    QueueListener qui vide les fichiers tamponnés quand la file reste vide.
+
+    La file est lue avec un délai de RotatingFileHandlerTamponne.VIDER_APRES_SECONDES :
+    à chaque expiration, les handlers tamponnés écrivent leurs lignes en
+    attente, sans attendre l'enregistrement suivant.
+    """
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        if not block:
+            return self.queue.get_nowait()
+        while True:
+            try:
+                return self.queue.get(timeout=RotatingFileHandlerTamponne.VIDER_APRES_SECONDES)
+            except queue.Empty:
+                for handler in self.handlers:
+                    if isinstance(handler, RotatingFileHandlerTamponne):
+                        handler.vider_si_en_attente()
+
+
+def _resoudre_niveau(niveau: str) -> int:
+    """Nom de niveau (insensible à la casse) vers sa valeur, INFO si inconnu."""
+    return logging._nameToLevel.get(niveau.upper(), logging.INFO)
+
+
+# Niveau de la configuration, résolu une fois (cas de tous les loggers
+# créés sans niveau explicite)
+_NIVEAU_CONFIG = _resoudre_niveau(parametres.LOG_LEVEL or "INFO")
+
+# Threads d'écoute démarrés par configurer_logger() (arrêtés à la sortie
+# du processus, ce qui vide les files avant fermeture des fichiers)
+_ecouteurs: List[QueueListenerVidage] = []
+
+
+def _arreter_ecouteurs() -> None:
+    """
+    Arrête les threads d'écoute en traitant les enregistrements restants,
+    puis vide les tampons des fichiers.
+    """
+    while _ecouteurs:
+        _ecouteurs.pop().stop()
+    for handler in _handlers_fichiers.values():
+        handler.flush()
+
+
+atexit.register(_arreter_ecouteurs)
+
+# Loggers dont le message de démarrage a déjà été émis
+_noms_annonces: Set[str] = set()
+
+# Handlers de fichier par chemin absolu : un seul descripteur et une seule
+# rotation par fichier, quel que soit le nombre de loggers qui y écrivent
+_handlers_fichiers: Dict[str, RotatingFileHandlerTamponne] = {}
+
+
+def _obtenir_handler_fichier(
+    chemin: str,
+    rotation_max_bytes: int,
+    rotation_backup_count: int
+) -> RotatingFileHandlerTamponne:
+    """
+    Retourne le handler rotatif du fichier `chemin`, créé au premier appel.
+
+    Raises:
+        OSError: Si le fichier ne peut pas être ouvert
+    """
+    cle = os.path.abspath(chemin)
+    handler = _handlers_fichiers.get(cle)
+    if handler is None:
+        handler = RotatingFileHandlerTamponne(
+            filename=chemin,
+            maxBytes=rotation_max_bytes,
+            backupCount=rotation_backup_count,
+            encoding="utf-8"
+        )
+        _handlers_fichiers[cle] = handler
+    return handler
+
+
 def configurer_logger(
     nom: str = "mila_assist",
     niveau: Optional[str] = None,
@@ -101,12 +348,19 @@ def configurer_logger(
 
     # Créer le logger
     logger_instance = logging.getLogger(nom)
-    logger_instance.setLevel(getattr(logging, niveau))
+    logger_instance.setLevel(
+        _NIVEAU_CONFIG if niveau == parametres.LOG_LEVEL else _resoudre_niveau(niveau)
+    )
 
     # Éviter les doublons si déjà configuré
-    if logger_instance.handlers:
+    if any(isinstance(handler, QueueHandler) for handler in logger_instance.handlers):
         return logger_instance
 
+    # Handlers servis par le thread d'écoute, avertissements émis une fois
+    # la file en place
+    handlers: List[logging.Handler] = []
+    avertissements: List[str] = []
+
     # Format des logs
     format_console = (
         "%(levelname)s | "
@@ -115,15 +369,6 @@ def configurer_logger(
         "%(message)s"
     )
 
-    format_fichier = (
-        "%(asctime)s | "
-        "%(levelname)s | "
-        "%(name)s | "
-        "%(module)s:%(funcName)s:%(lineno)d | "
-        "%(message)s | "
-        "%(pathname)s"
-    )
-
     format_date = "%Y-%m-%d %H:%M:%S"
 
     # ===================================================================
@@ -139,7 +384,10 @@ def configurer_logger(
     formatteur_console.datefmt = format_date
     handler_console.setFormatter(formatteur_console)
 
-    logger_instance.addHandler(handler_console)
+    handlers.append(handler_console)
+
+    # Fichiers : une ligne JSON par record
+    formatteur_fichier = FormatteurJSON()
 
     # ===================================================================
     # Handler 2: Fichier avec rotation
@@ -149,24 +397,16 @@ def configurer_logger(
         chemin_fichier_log = Path(fichier_log)
         chemin_fichier_log.parent.mkdir(parents=True, exist_ok=True)
 
-        handler_fichier = RotatingFileHandler(
-            filename=fichier_log,
-            maxBytes=rotation_max_bytes,
-            backupCount=rotation_backup_count,
-            encoding="utf-8"
+        handler_fichier = _obtenir_handler_fichier(
+            fichier_log, rotation_max_bytes, rotation_backup_count
         )
         handler_fichier.setLevel(logging.INFO)  # Ne log que INFO+ dans fichier
-
-        formatteur_fichier = logging.Formatter(
-            fmt=format_fichier,
-            datefmt=format_date
-        )
         handler_fichier.setFormatter(formatteur_fichier)
 
-        logger_instance.addHandler(handler_fichier)
+        handlers.append(handler_fichier)
 
     except (OSError, PermissionError) as e:
-        logger_instance.warning(
+        avertissements.append(
             f"Impossible de créer le fichier de log {fichier_log}: {e}. "
             "Logging sur console uniquement."
         )
@@ -177,26 +417,39 @@ def configurer_logger(
     if parametres.est_production:
         try:
             fichier_erreurs = chemin_fichier_log.parent / "erreurs.log"
-            handler_erreurs = RotatingFileHandler(
-                filename=str(fichier_erreurs),
-                maxBytes=rotation_max_bytes,
-                backupCount=rotation_backup_count,
-                encoding="utf-8"
+            handler_erreurs = _obtenir_handler_fichier(
+                str(fichier_erreurs), rotation_max_bytes, rotation_backup_count
             )
             handler_erreurs.setLevel(logging.ERROR)  # Seulement ERROR et CRITICAL
             handler_erreurs.setFormatter(formatteur_fichier)
 
-            logger_instance.addHandler(handler_erreurs)
+            handlers.append(handler_erreurs)
 
         except (OSError, PermissionError) as e:
-            logger_instance.warning(
+            avertissements.append(
                 f"Impossible de créer le fichier d'erreurs: {e}"
             )
 
-    # Message de démarrage
-    logger_instance.info(
-        f"Logger '{nom}' configuré (niveau: {niveau}, fichier: {fichier_log})"
-    )
+    # ===================================================================
+    # File d'attente : le logger ne fait qu'un put_nowait, le thread
+    # d'écoute formate et écrit (respect des niveaux de chaque handler)
+    # ===================================================================
+    file_logs: queue.Queue = queue.Queue(-1)
+    logger_instance.addHandler(QueueHandlerTraces(file_logs))
+
+    ecouteur = QueueListenerVidage(file_logs, *handlers, respect_handler_level=True)
+    ecouteur.start()
+    _ecouteurs.append(ecouteur)
+
+    for avertissement in avertissements:
+        logger_instance.warning(avertissement)
+
+    # Message de démarrage (une seule fois par nom, même si reconfiguré)
+    if nom not in _noms_annonces:
+        _noms_annonces.add(nom)
+        logger_instance.info(
+            "Logger '%s' configuré (niveau: %s, fichier: %s)", nom, niveau, fichier_log
+        )
 
     return logger_instance
 
@@ -229,8 +482,9 @@ def logger_exception(
         except ZeroDivisionError as e:
             logger_exception(e, "Erreur lors du calcul")
     """
-    message = f"{message_contexte}: {type(exception).__name__} - {str(exception)}"
-    logger.log(niveau, message, exc_info=True)
+    # Type et message de l'exception sont portés par la trace (exc_info),
+    # le message n'est formaté que si le niveau est actif
+    logger.log(niveau, "%s", message_contexte or repr(exception), exc_info=exception)
 
 
 # ===================================================================
@@ -240,6 +494,10 @@ def logger_appels(func):
     """
     Décorateur pour logger automatiquement les appels de fonction.
 
+    Les arguments ne sont convertis en texte (repr) que si le niveau DEBUG
+    est actif : sinon le coût par appel se limite à isEnabledFor(), le
+    décorateur peut donc rester sur une fonction appelée souvent.
+
     Exemple:
         @logger_appels
         def ma_fonction(param1, param2):
@@ -250,13 +508,16 @@ def logger_appels(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         nom_fonction = func.__name__
-        logger.debug(
-            f"Appel de {nom_fonction} avec args={args}, kwargs={kwargs}"
-        )
+        debug_actif = logger.isEnabledFor(logging.DEBUG)
+        if debug_actif:
+            logger.debug(
+                "Appel de %s avec args=%r, kwargs=%r", nom_fonction, args, kwargs
+            )
 
         try:
             resultat = func(*args, **kwargs)
-            logger.debug(f"{nom_fonction} terminée avec succès")
+            if debug_actif:
+                logger.debug("%s terminée avec succès", nom_fonction)
             return resultat
 
         except Exception as e:
@@ -272,16 +533,20 @@ def logger_appels(func):
 
 def obtenir_logger(nom: Optional[str] = None) -> logging.Logger:
     """
-    Retourne l'instance globale du logger ou configure un nouveau logger avec un nom spécifique.
+    Retourne l'instance globale du logger ou un logger enfant nommé.
 
     Cette fonction permet d'obtenir le logger de manière compatible avec les imports
-    dans l'application.
+    dans l'application. Un nom donné produit un enfant du logger global
+    (ex: "mila_assist.src.api.main") : sans handler propre, ses
+    enregistrements remontent par propagation aux handlers du logger global.
+    Aucune configuration (répertoire, fichiers, thread d'écoute) n'est
+    refaite par module.
 
     Args:
         nom: Nom optionnel pour un logger spécifique. Si None, retourne le logger global
 
     Returns:
-        Instance de logger configurée
+        Instance de logger configurée (ou enfant du logger configuré)
 
     Example:
         from src.utilitaires.logger import obtenir_logger
@@ -290,7 +555,9 @@ def obtenir_logger(nom: Optional[str] = None) -> logging.Logger:
     """
     if nom is None:
         return logger
-    return configurer_logger(nom)
+    if nom == logger.name or nom.startswith(logger.name + "."):
+        return logging.getLogger(nom)
+    return logger.getChild(nom)
 
 
 # Export pour import simplifié
@@ -300,5 +567,10 @@ __all__ = [
     "obtenir_logger",
     "logger_exception",
     "logger_appels",
-    "FormatteurCouleur"
+    "FormatteurCouleur",
+    "FormatteurJSON",
+    "QueueHandlerTraces",
+    "RotatingFileHandlerEchantillonne",
+    "RotatingFileHandlerTamponne",
+    "QueueListenerVidage"
 ]
@@ -17,10 +17,10 @@ Protection anti-surcharge:
 - Logs détaillés pour diagnostiquer les déclenchements intempestifs
 """
 
+import asyncio
 import logging
 import os
 import time
-import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict
@@ -40,8 +40,44 @@ MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "password")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "mila_assist")
 
 FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", "/app/donnees/faiss_index/index_faiss.bin")
+CHEMIN_INDEX_FAISS = Path(FAISS_INDEX_PATH)
 AUTO_SYNC_INTERVAL = int(os.getenv("AUTO_SYNC_INTERVAL", "60"))  # secondes
 AUTO_SYNC_MYSQL_UPTIME_THRESHOLD = int(os.getenv("AUTO_SYNC_MYSQL_UPTIME_THRESHOLD", "300"))  # 5 minutes
+# Intervalle maximal atteint quand la base ne change pas (doublement à chaque
+# cycle sans modification). Doit rester inférieur au seuil d'uptime pour ne
+# pas manquer un redémarrage de MySQL (trigger 2).
+AUTO_SYNC_INTERVAL_MAX = min(
+    max(AUTO_SYNC_INTERVAL, int(os.getenv("AUTO_SYNC_INTERVAL_MAX", "240"))),
+    max(AUTO_SYNC_INTERVAL, AUTO_SYNC_MYSQL_UPTIME_THRESHOLD - AUTO_SYNC_INTERVAL)
+)
+
+# Uptime MySQL et état de base_connaissances en un seul aller-retour
+_REQUETE_UPTIME = """
+        (SELECT VARIABLE_VALUE
+         FROM performance_schema.global_status
+         WHERE VARIABLE_NAME = 'Uptime') AS uptime"""
+
+# Ligne maintenue par triggers (mysql/02-triggers.sql) : lecture en O(1)
+REQUETE_ETAT_MYSQL = f"""
+    SELECT{_REQUETE_UPTIME},
+        dernier_changement,
+        nombre_entrees
+    FROM base_connaissances_etat
+    WHERE id = 1
+"""
+
+# Repli si la table d'état est absente (base initialisée avant son ajout)
+# ou sa ligne manquante : agrégat sur base_connaissances
+REQUETE_ETAT_MYSQL_AGREGAT = f"""
+    SELECT{_REQUETE_UPTIME},
+        MAX(last_update) AS dernier_changement,
+        COUNT(*) AS nombre_entrees
+    FROM base_connaissances
+    WHERE active = 1
+"""
+
+# Code d'erreur MySQL "table inexistante"
+ER_NO_SUCH_TABLE = 1146
 
 
 # ============================================================================
@@ -53,7 +89,7 @@ class FAISSAutoSync:
     Gestionnaire auto-sync pour l'index FAISS.
 
     Surveille MySQL et déclenche le rebuild automatiquement selon 3 triggers:
-    1. Index FAISS n'existe pas
+    1. Index FAISS n'existe pas (ou construit avec une autre précision d'encodeur)
     2. MySQL vient de redémarrer (uptime < 5 min)
     3. Base de connaissances modifiée (last_update changé)
     """
@@ -69,58 +105,146 @@ class FAISSAutoSync:
         self.index_manager = index_manager
         self.encodeur = encodeur
         self.running = False
-        self.thread: Optional[threading.Thread] = None
+        self._tache: Optional[asyncio.Task] = None
+        self._arret: Optional[asyncio.Event] = None  # Créé par demarrer()
+        self._connexion = None  # Connexion MySQL conservée entre deux cycles
+        self._table_etat_disponible = True  # base_connaissances_etat (triggers)
         self.last_update_timestamp: Optional[datetime] = None
         self.rebuild_en_cours = False
-        self.dernier_rebuild_timestamp: Optional[datetime] = None  # Nouvelle protection
+        self.dernier_rebuild_timestamp: Optional[datetime] = None  # Affichage (statut)
+        # Horloge monotone pour l'anti-rebond : insensible aux sauts NTP / heure d'été
+        self._dernier_rebuild_monotone: Optional[float] = None
         self.rebuild_min_interval_seconds = 300  # Minimum 5 minutes entre 2 rebuilds
 
+        # Présence du fichier d'index : l'auto-sync est le seul à l'écrire
+        # (rebuild réussi), stat() n'est refait que tant qu'il est absent
+        self._index_existe = CHEMIN_INDEX_FAISS.exists()
+
         logger.info("Auto-sync FAISS initialisé")
-        logger.info(f"  Intervalle surveillance: {AUTO_SYNC_INTERVAL}s")
-        logger.info(f"  Intervalle minimum rebuild: {self.rebuild_min_interval_seconds}s")
+        logger.info("  Intervalle surveillance: %ss", AUTO_SYNC_INTERVAL)
+        logger.info("  Intervalle minimum rebuild: %ss", self.rebuild_min_interval_seconds)
 
     def demarrer(self) -> None:
-        """Démarre le thread de surveillance auto-sync."""
+        """
+        Démarre la surveillance auto-sync sur la boucle d'événements courante.
+
+        La surveillance est une tâche asyncio (pas de thread dédié qui
+        dort entre deux cycles) : à appeler depuis le lifespan FastAPI.
+        """
         if self.running:
             logger.warning("[ATTENTION]  Auto-sync déjà en cours")
             return
 
         self.running = True
-        self.thread = threading.Thread(target=self._boucle_surveillance, daemon=True)
-        self.thread.start()
+        self._arret = asyncio.Event()
+        self._tache = asyncio.get_running_loop().create_task(self._boucle_surveillance_async())
 
         logger.info("[OK] Auto-sync FAISS démarré")
 
-    def arreter(self) -> None:
-        """Arrête le thread de surveillance."""
+    async def arreter_async(self) -> None:
+        """
+        Arrête la surveillance.
+
+        L'événement d'arrêt réveille immédiatement la boucle si elle attend ;
+        une vérification en cours (dans le pool de threads) peut se terminer
+        pendant 5s au plus avant que la tâche soit annulée, pour ne pas
+        fermer la connexion MySQL sous une requête active.
+        """
         if not self.running:
             return
 
         logger.info("Arrêt de l'auto-sync...")
         self.running = False
 
-        if self.thread:
-            self.thread.join(timeout=5)
+        if self._tache:
+            self._arret.set()
+            try:
+                await asyncio.wait_for(self._tache, timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pass
+            self._tache = None
+
+        self._fermer_connexion()
 
         logger.info("[OK] Auto-sync arrêté")
 
-    def _boucle_surveillance(self) -> None:
-        """Boucle principale de surveillance (thread)."""
-        logger.info(f"Démarrage de la boucle de surveillance (intervalle: {AUTO_SYNC_INTERVAL}s)")
+    def _obtenir_connexion(self):
+        """
+        Retourne la connexion MySQL de surveillance, ouverte si besoin.
+
+        La connexion est conservée d'un cycle à l'autre (pas de handshake
+        TCP + authentification toutes les AUTO_SYNC_INTERVAL secondes). Elle
+        est en autocommit : sans cela, les SELECT successifs liraient tous
+        le même instantané (REPEATABLE READ) et ne verraient jamais les
+        modifications. Elle n'est pas testée (is_connected() ferait un ping
+        à chaque cycle) : une connexion coupée est détectée par l'erreur de
+        la requête, voir _lire_etat_mysql().
+        """
+        if self._connexion is None:
+            self._connexion = mysql.connector.connect(
+                host=MYSQL_HOST,
+                user=MYSQL_USER,
+                password=MYSQL_PASSWORD,
+                database=MYSQL_DATABASE,
+                connect_timeout=5,
+                autocommit=True
+            )
+        return self._connexion
+
+    def _fermer_connexion(self) -> None:
+        """Ferme la connexion de surveillance si elle est ouverte."""
+        if self._connexion is not None:
+            try:
+                self._connexion.close()
+            except mysql.connector.Error:
+                pass
+            self._connexion = None
+
+    async def _attendre_arret(self, delai: float) -> bool:
+        """Attend `delai` secondes ; retourne True si l'arrêt a été demandé."""
+        try:
+            await asyncio.wait_for(self._arret.wait(), timeout=delai)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _boucle_surveillance_async(self) -> None:
+        """
+        Boucle principale de surveillance (tâche asyncio).
+
+        Les attentes portent sur l'événement d'arrêt (sortie immédiate
+        à l'arrêt) ; la vérification (requête
+        MySQL bloquante, rebuild éventuel) s'exécute dans le pool de
+        threads par défaut pour ne pas bloquer les requêtes /search.
+        """
+        logger.info("Démarrage de la boucle de surveillance (intervalle: %ss)", AUTO_SYNC_INTERVAL)
 
         # Vérification initiale au démarrage
-        time.sleep(5)  # Attendre que les services soient prêts
-        self._verifier_triggers()
+        if await self._attendre_arret(5):  # Attendre que les services soient prêts
+            return
+        await asyncio.to_thread(self._verifier_triggers)
 
-        # Boucle continue
+        # Boucle continue : l'intervalle double tant que rien ne change
+        # (jusqu'à AUTO_SYNC_INTERVAL_MAX) et revient au minimum dès qu'une
+        # modification ou un rebuild est observé
+        intervalle = AUTO_SYNC_INTERVAL
         while self.running:
             try:
-                time.sleep(AUTO_SYNC_INTERVAL)
-                self._verifier_triggers()
+                if await self._attendre_arret(intervalle):
+                    break
+
+                etat_avant = (self.last_update_timestamp, self.dernier_rebuild_timestamp)
+                await asyncio.to_thread(self._verifier_triggers)
+
+                if (self.last_update_timestamp, self.dernier_rebuild_timestamp) != etat_avant:
+                    intervalle = AUTO_SYNC_INTERVAL
+                else:
+                    intervalle = min(intervalle * 2, AUTO_SYNC_INTERVAL_MAX)
 
             except Exception as e:
-                logger.error(f"[ERREUR] Erreur dans la boucle auto-sync: {e}")
-                time.sleep(10)  # Pause avant retry
+                logger.error("[ERREUR] Erreur dans la boucle auto-sync: %s", e)
+                if await self._attendre_arret(10):  # Pause avant retry
+                    break
 
     def _verifier_triggers(self) -> None:
         """Vérifie les 3 triggers et déclenche rebuild si nécessaire."""
@@ -128,88 +252,130 @@ class FAISSAutoSync:
             logger.debug("Rebuild déjà en cours, skip vérification")
             return
 
+        # Fenêtre anti-rebond : tout rebuild serait refusé, inutile d'interroger
+        # MySQL. Une modification survenue entre-temps reste détectée au premier
+        # cycle suivant (last_update_timestamp n'est pas avancé)
+        if (self._dernier_rebuild_monotone is not None
+                and time.monotonic() - self._dernier_rebuild_monotone < self.rebuild_min_interval_seconds):
+            logger.debug("Dans la fenêtre anti-rebond, skip vérification MySQL")
+            return
+
         try:
             # Trigger 1: Index n'existe pas
-            if not Path(FAISS_INDEX_PATH).exists():
+            if not self._index_existe:
+                self._index_existe = CHEMIN_INDEX_FAISS.exists()
+            if not self._index_existe:
                 logger.info("[SEARCH] Trigger 1 : Index FAISS n'existe pas")
                 self._declencher_rebuild("Index n'existe pas")
                 return
 
-            # Vérifier uptime MySQL et last_update
-            conn = mysql.connector.connect(
-                host=MYSQL_HOST,
-                user=MYSQL_USER,
-                password=MYSQL_PASSWORD,
-                database=MYSQL_DATABASE,
-                connect_timeout=5
-            )
-            cursor = conn.cursor(dictionary=True)
+            # Trigger 1 bis : index construit avec une autre précision
+            # d'encodeur (FP32 / FP16 / INT8), requêtes et vecteurs non comparables
+            if self.index_manager.precision != self.encodeur.precision:
+                logger.info(
+                    "[SEARCH] Trigger 1 bis : index en %s, encodeur en %s",
+                    self.index_manager.precision, self.encodeur.precision
+                )
+                self._declencher_rebuild("Précision de l'encodeur modifiée")
+                return
+
+            # Uptime MySQL et last_update : une seule requête
+            etat = self._lire_etat_mysql()
+
+            if not etat:
+                return
 
             # Trigger 2: MySQL vient de redémarrer
             # ATTENTION: Ce trigger peut déclencher des rebuilds fréquents
             # si MySQL/Docker redémarre souvent
-            cursor.execute("SHOW GLOBAL STATUS LIKE 'Uptime'")
-            uptime_row = cursor.fetchone()
-            if uptime_row:
-                uptime_seconds = int(uptime_row['Value'])
-                
+            if etat['uptime'] is not None:
+                uptime_seconds = int(etat['uptime'])
+
                 # Log toujours l'uptime pour debug (pas seulement en mode debug)
                 if uptime_seconds < AUTO_SYNC_MYSQL_UPTIME_THRESHOLD:
-                    logger.warning(f"[SEARCH] Trigger 2 : MySQL redémarré récemment!")
-                    logger.warning(f"  Uptime MySQL: {uptime_seconds}s (seuil: {AUTO_SYNC_MYSQL_UPTIME_THRESHOLD}s)")
-                    logger.warning(f"  Rebuild déclenché pour synchroniser l'index")
-                    cursor.close()
-                    conn.close()
+                    logger.warning("[SEARCH] Trigger 2 : MySQL redémarré récemment!")
+                    logger.warning("  Uptime MySQL: %ss (seuil: %ss)", uptime_seconds, AUTO_SYNC_MYSQL_UPTIME_THRESHOLD)
+                    logger.warning("  Rebuild déclenché pour synchroniser l'index")
                     self._declencher_rebuild(f"MySQL redémarré (uptime={uptime_seconds}s)")
                     return
                 else:
-                    logger.debug(f"MySQL uptime OK: {uptime_seconds}s (pas de rebuild nécessaire)")
+                    logger.debug("MySQL uptime OK: %ss (pas de rebuild nécessaire)", uptime_seconds)
 
             # Trigger 3: Données modifiées UNIQUEMENT dans base_connaissances
             # CRITIQUE: Surveille UNIQUEMENT la table base_connaissances
             # pour éviter les rebuilds lors de l'ajout de conversations
-            cursor.execute("""
-                SELECT MAX(last_update) as dernier_changement,
-                       COUNT(*) as nombre_entrees
-                FROM base_connaissances
-                WHERE active = 1
-            """)
-            result = cursor.fetchone()
-
-            if result and result['dernier_changement']:
-                dernier_changement = result['dernier_changement']
-                nombre_entrees = result['nombre_entrees']
+            if etat['dernier_changement']:
+                dernier_changement = etat['dernier_changement']
+                nombre_entrees = etat['nombre_entrees']
 
                 # Première vérification : initialiser le timestamp
                 if self.last_update_timestamp is None:
-                    logger.info(f"[SYNC] Initialisation timestamp: {dernier_changement} ({nombre_entrees} entrées actives)")
+                    logger.info("[SYNC] Initialisation timestamp: %s (%s entrées actives)", dernier_changement, nombre_entrees)
                     self.last_update_timestamp = dernier_changement
-                    cursor.close()
-                    conn.close()
                     return
 
                 # Comparer avec le dernier connu
                 if dernier_changement > self.last_update_timestamp:
-                    logger.info(f"[SEARCH] Trigger 3 : BASE DE CONNAISSANCES modifiée")
-                    logger.info(f"  Ancien timestamp: {self.last_update_timestamp}")
-                    logger.info(f"  Nouveau timestamp: {dernier_changement}")
-                    logger.info(f"  Entrées actives: {nombre_entrees}")
-                    cursor.close()
-                    conn.close()
+                    logger.info("[SEARCH] Trigger 3 : BASE DE CONNAISSANCES modifiée")
+                    logger.info("  Ancien timestamp: %s", self.last_update_timestamp)
+                    logger.info("  Nouveau timestamp: %s", dernier_changement)
+                    logger.info("  Entrées actives: %s", nombre_entrees)
                     self._declencher_rebuild(f"Base de connaissances modifiée à {dernier_changement}")
                     self.last_update_timestamp = dernier_changement
                     return
                 else:
                     # Log silencieux (debug) pour confirmer qu'aucun changement n'est détecté
-                    logger.debug(f"[SYNC] Aucune modification détectée (last_update={dernier_changement})")
-
-            cursor.close()
-            conn.close()
+                    logger.debug("[SYNC] Aucune modification détectée (last_update=%s)", dernier_changement)
 
         except mysql.connector.Error as e:
-            logger.warning(f"[ATTENTION]  Erreur connexion MySQL (auto-sync): {e}")
+            logger.warning("[ATTENTION]  Erreur connexion MySQL (auto-sync): %s", e)
+            # Reconnexion au prochain cycle
+            self._fermer_connexion()
         except Exception as e:
-            logger.error(f"[ERREUR] Erreur vérification triggers: {e}")
+            logger.error("[ERREUR] Erreur vérification triggers: %s", e)
+
+    def _lire_etat_mysql(self) -> Optional[Dict]:
+        """
+        Lit uptime MySQL, date du dernier changement et nombre d'entrées actives.
+
+        Utilise la ligne base_connaissances_etat tenue à jour par triggers ;
+        se rabat sur l'agrégat de base_connaissances si la ligne manque, ou
+        définitivement si la table n'existe pas.
+
+        Si la connexion conservée a été coupée (wait_timeout, redémarrage
+        MySQL), elle est rouverte et la lecture refaite une fois.
+        """
+        connexion_reutilisee = self._connexion is not None
+        try:
+            return self._lire_etat_connexion(self._obtenir_connexion())
+        except mysql.connector.errors.OperationalError as e:
+            if not connexion_reutilisee:
+                raise
+            logger.info("[SYNC] Connexion MySQL perdue (%s), reconnexion", e)
+            self._fermer_connexion()
+            return self._lire_etat_connexion(self._obtenir_connexion())
+
+    def _lire_etat_connexion(self, connexion) -> Optional[Dict]:
+        """Exécute la lecture d'état de _lire_etat_mysql() sur `connexion`."""
+        cursor = connexion.cursor(dictionary=True)
+        try:
+            etat = None
+            if self._table_etat_disponible:
+                try:
+                    cursor.execute(REQUETE_ETAT_MYSQL)
+                    etat = cursor.fetchone()
+                except mysql.connector.Error as e:
+                    if e.errno != ER_NO_SUCH_TABLE:
+                        raise
+                    logger.warning("[ATTENTION]  Table base_connaissances_etat absente, agrégat utilisé")
+                    self._table_etat_disponible = False
+
+            if etat is None:
+                cursor.execute(REQUETE_ETAT_MYSQL_AGREGAT)
+                etat = cursor.fetchone()
+            return etat
+        finally:
+            cursor.close()
 
     def _declencher_rebuild(self, raison: str) -> None:
         """
@@ -223,29 +389,32 @@ class FAISSAutoSync:
             return
 
         # Protection contre les rebuilds trop fréquents
-        if self.dernier_rebuild_timestamp:
-            temps_ecoule = (datetime.now() - self.dernier_rebuild_timestamp).total_seconds()
+        maintenant = time.monotonic()
+        if self._dernier_rebuild_monotone is not None:
+            temps_ecoule = maintenant - self._dernier_rebuild_monotone
             if temps_ecoule < self.rebuild_min_interval_seconds:
-                logger.warning(f"[SKIP] Rebuild demandé trop tôt ({temps_ecoule:.0f}s depuis le dernier)")
-                logger.warning(f"  Raison ignorée: {raison}")
-                logger.warning(f"  Minimum requis: {self.rebuild_min_interval_seconds}s")
+                logger.warning("[SKIP] Rebuild demandé trop tôt (%.0fs depuis le dernier)", temps_ecoule)
+                logger.warning("  Raison ignorée: %s", raison)
+                logger.warning("  Minimum requis: %ss", self.rebuild_min_interval_seconds)
                 return
 
         try:
             self.rebuild_en_cours = True
+            self._dernier_rebuild_monotone = maintenant
             self.dernier_rebuild_timestamp = datetime.now()
-            logger.info(f"[SYNC] Déclenchement rebuild FAISS : {raison}")
+            logger.info("[SYNC] Déclenchement rebuild FAISS : %s", raison)
 
             # Effectuer le rebuild
             stats = self.index_manager.rebuild_depuis_mysql(self.encodeur)
 
             if stats['success']:
-                logger.info(f"[OK] Rebuild réussi : {stats['nombre_vecteurs']} vecteurs en {stats['temps_secondes']}s")
+                self._index_existe = True
+                logger.info("[OK] Rebuild réussi : %s vecteurs en %ss", stats['nombre_vecteurs'], stats['temps_secondes'])
             else:
-                logger.error(f"[ERREUR] Rebuild échoué : {stats.get('raison', 'Erreur inconnue')}")
+                logger.error("[ERREUR] Rebuild échoué : %s", stats.get('raison', 'Erreur inconnue'))
 
         except Exception as e:
-            logger.error(f"[ERREUR] Erreur lors du rebuild: {e}")
+            logger.error("[ERREUR] Erreur lors du rebuild: %s", e)
 
         finally:
             self.rebuild_en_cours = False
@@ -258,7 +427,10 @@ class FAISSAutoSync:
             Statistiques du rebuild
         """
         logger.info("[SYNC] Rebuild forcé via endpoint admin")
-        return self.index_manager.rebuild_depuis_mysql(self.encodeur)
+        stats = self.index_manager.rebuild_depuis_mysql(self.encodeur)
+        if stats.get('success'):
+            self._index_existe = True
+        return stats
 
     def obtenir_statut(self) -> Dict[str, any]:
         """
@@ -273,15 +445,16 @@ class FAISSAutoSync:
             "last_update_timestamp": str(self.last_update_timestamp) if self.last_update_timestamp else None,
             "dernier_rebuild": str(self.dernier_rebuild_timestamp) if self.dernier_rebuild_timestamp else None,
             "intervalle_secondes": AUTO_SYNC_INTERVAL,
+            "intervalle_max_secondes": AUTO_SYNC_INTERVAL_MAX,
             "mysql_uptime_threshold": AUTO_SYNC_MYSQL_UPTIME_THRESHOLD,
             "rebuild_min_interval": self.rebuild_min_interval_seconds,
-            "index_existe": Path(FAISS_INDEX_PATH).exists(),
+            "index_existe": self._index_existe,
             "index_ntotal": self.index_manager.ntotal
         }
 
         # Ajouter le temps depuis le dernier rebuild
-        if self.dernier_rebuild_timestamp:
-            temps_depuis_rebuild = (datetime.now() - self.dernier_rebuild_timestamp).total_seconds()
+        if self._dernier_rebuild_monotone is not None:
+            temps_depuis_rebuild = time.monotonic() - self._dernier_rebuild_monotone
             statut["temps_depuis_dernier_rebuild_s"] = int(temps_depuis_rebuild)
 
         return statut
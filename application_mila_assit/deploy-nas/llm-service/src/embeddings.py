@@ -5,11 +5,13 @@ Gère le calcul des embeddings de texte avec sentence-transformers
 pour la construction de l'index FAISS.
 """
 
+import contextlib
 import logging
 import os
 from typing import Union, List
 import numpy as np
 
+import torch
 from sentence_transformers import SentenceTransformer
 
 # ============================================================================
@@ -24,6 +26,12 @@ EMBEDDINGS_MODEL_PATH = os.getenv("EMBEDDINGS_MODEL_PATH", "/app/modeles/embeddi
 EMBEDDINGS_MAX_SEQ_LENGTH = int(os.getenv("EMBEDDINGS_MAX_SEQ_LENGTH", "256"))
 EMBEDDINGS_BATCH_SIZE = int(os.getenv("EMBEDDINGS_BATCH_SIZE", "32"))
 EMBEDDINGS_DEVICE = os.getenv("EMBEDDINGS_DEVICE", "cpu")
+# Quantification dynamique INT8 des couches Linear (CPU uniquement, opt-in).
+# Les embeddings fournis par le Container 2 restent calculés en FP32 : à
+# réserver aux déploiements où Container 3 calcule lui-même les embeddings
+EMBEDDINGS_INT8 = os.getenv("EMBEDDINGS_INT8", "0") == "1"
+# Autocast FP16 de l'encodage (CUDA uniquement, opt-in)
+EMBEDDINGS_FP16 = os.getenv("EMBEDDINGS_FP16", "0") == "1"
 
 
 # ============================================================================
@@ -139,6 +147,42 @@ class EncodeurSentences:
             # Configurer la longueur maximale
             self.model.max_seq_length = self.max_seq_length
 
+            # Sur CPU, l'encodage est limité par la bande passante mémoire des
+            # matmul : poids INT8 (activations quantifiées à la volée) via
+            # les noyaux FBGEMM. Sur GPU, le modèle reste en FP32. Sans moteur
+            # de quantification disponible sur l'hôte, on reste en FP32
+            self.quantifie_int8 = False
+            if self.device == "cpu" and EMBEDDINGS_INT8:
+                try:
+                    self.model = torch.quantization.quantize_dynamic(
+                        self.model, {torch.nn.Linear}, dtype=torch.qint8
+                    )
+                    self.quantifie_int8 = True
+                    logger.info("  Quantification dynamique INT8 activée (couches Linear)")
+                except Exception as e:
+                    logger.warning(f"  [ATTENTION] Quantification INT8 impossible, modèle conservé en FP32: {e}")
+
+            # Sur GPU, encodage en autocast FP16 (tensor cores) ; les poids
+            # restent en FP32, torch choisit la précision opération par opération
+            self.autocast_fp16 = self.device.startswith("cuda") and EMBEDDINGS_FP16
+            if self.autocast_fp16:
+                logger.info("  Autocast FP16 activé pour l'encodage")
+
+            # Précision des vecteurs produits, enregistrée avec l'index FAISS
+            if self.quantifie_int8:
+                self.precision = "int8"
+            elif self.autocast_fp16:
+                self.precision = "fp16"
+            else:
+                self.precision = "fp32"
+
+            # SentenceTransformer.encode() trie déjà les textes par longueur
+            # (padding minimal par batch) : reste à s'assurer que la
+            # tokenisation passe par le tokenizer Rust (AutoTokenizer le
+            # choisit par défaut quand tokenizer.json est disponible)
+            if not getattr(self.model.tokenizer, "is_fast", False):
+                logger.warning("  [ATTENTION] Tokenizer Python (lent) : tokenizer.json absent du modèle ?")
+
             # Obtenir la dimension des embeddings
             self.dimension = self.model.get_sentence_embedding_dimension()
 
@@ -190,15 +234,21 @@ class EncodeurSentences:
                     raise ValueError("La liste de textes ne peut pas être vide")
 
             # Encoder
-            embeddings = self.model.encode(
-                texte,
-                batch_size=batch_size,
-                show_progress_bar=show_progress_bar,
-                convert_to_numpy=True,
-                normalize_embeddings=normalize
+            contexte_precision = (
+                torch.autocast(device_type="cuda", dtype=torch.float16)
+                if self.autocast_fp16 else contextlib.nullcontext()
             )
+            with contexte_precision:
+                embeddings = self.model.encode(
+                    texte,
+                    batch_size=batch_size,
+                    show_progress_bar=show_progress_bar,
+                    convert_to_numpy=True,
+                    normalize_embeddings=normalize
+                )
 
-            return embeddings
+            # FAISS attend du float32 (sans copie si c'est déjà le cas)
+            return embeddings.astype(np.float32, copy=False)
 
         except Exception as e:
             logger.error(f"[ERREUR] Erreur lors de l'encodage: {e}")
@@ -279,6 +329,8 @@ class EncodeurSentences:
             f"  dimension={self.dimension}\n"
             f"  max_seq_length={self.max_seq_length}\n"
             f"  device={self.device}\n"
+            f"  quantifie_int8={self.quantifie_int8}\n"
+            f"  autocast_fp16={self.autocast_fp16}\n"
             f")"
         )
 
@@ -26,6 +26,10 @@ FAISS_INDEX_PATH = os.getenv("FAISS_INDEX_PATH", "/app/donnees/faiss_index/index
 FAISS_TOP_K = int(os.getenv("FAISS_TOP_K", "3"))
 EMBEDDINGS_DIMENSION = int(os.getenv("EMBEDDINGS_DIMENSION", "768"))
 
+# Métadonnées de l'index (précision de l'encodeur qui l'a construit),
+# à côté du fichier d'index et de id_mapping.json
+FICHIER_META_INDEX = "index_meta.json"
+
 # MySQL Config
 MYSQL_HOST = os.getenv("MYSQL_HOST", "mysql")
 MYSQL_USER = os.getenv("MYSQL_USER", "mila_user")
@@ -69,6 +73,9 @@ class IndexFAISS:
         self.dimension = dimension or EMBEDDINGS_DIMENSION
         self.index: Optional[faiss.Index] = None
         self.id_mapping: List[int] = []  # Liste des ID MySQL correspondant aux index FAISS
+        # Précision de l'encodeur ayant produit les vecteurs ("fp32" pour un
+        # index antérieur à l'enregistrement des métadonnées)
+        self.precision = "fp32"
 
         if creer_nouveau:
             self._creer_index()
@@ -117,6 +124,11 @@ class IndexFAISS:
                 logger.warning("   Le pipeline RAG peut ne pas fonctionner correctement!")
                 self.id_mapping = []
 
+            chemin_meta = chemin.parent / FICHIER_META_INDEX
+            if chemin_meta.exists():
+                with open(chemin_meta, 'r') as f:
+                    self.precision = json.load(f).get("precision", "fp32")
+
             # Vérifier la dimension
             if self.index.d != self.dimension:
                 logger.warning(
@@ -274,6 +286,9 @@ class IndexFAISS:
             with open(chemin_mapping, 'w') as f:
                 json.dump(self.id_mapping, f)
 
+            with open(Path(chemin).parent / FICHIER_META_INDEX, 'w') as f:
+                json.dump({"precision": self.precision}, f)
+
             size_mb = Path(chemin).stat().st_size / (1024 * 1024)
             logger.info(f"[OK] Index sauvegarde: {chemin} ({size_mb:.2f} Mo)")
             logger.info(f"[OK] Mapping IDs sauvegarde: {chemin_mapping} ({len(self.id_mapping)} entrees)")
@@ -355,6 +370,7 @@ class IndexFAISS:
 
             # Ajouter à l'index
             self.ajouter_vecteurs(embeddings, ids, normaliser=True)
+            self.precision = getattr(encodeur, "precision", "fp32")
 
             # Sauvegarder
             self.sauvegarder()
@@ -388,6 +404,19 @@ class IndexFAISS:
         """Retourne le nombre de vecteurs dans l'index."""
         return self.index.ntotal if self.index else 0
 
+    @property
+    def version(self) -> str:
+        """
+        Version de l'index sur disque : date de modification du fichier (ns).
+
+        Change à chaque sauvegarde (rebuild admin ou auto-sync) et reste la
+        même pour tous les workers, qui partagent le fichier. "0" si absent.
+        """
+        try:
+            return str(os.stat(self.chemin_index).st_mtime_ns)
+        except OSError:
+            return "0"
+
     def __repr__(self) -> str:
         """Représentation string de l'index."""
         return (
@@ -7,7 +7,7 @@ via llama-cpp-python. Supporte CPU et GPU (CUDA).
 
 import logging
 import os
-from typing import Optional
+from typing import Iterator, Optional
 from pathlib import Path
 
 # ============================================================================
@@ -31,6 +31,15 @@ LLM_PRESENCE_PENALTY = float(os.getenv("LLM_PRESENCE_PENALTY", "0.5"))
 # GPU : 0 = CPU only, -1 = toutes les couches GPU, ou nombre specifique de couches
 LLM_N_GPU_LAYERS = int(os.getenv("LLM_N_GPU_LAYERS", "0"))
 
+# Séquences d'arrêt de la génération
+SEQUENCES_ARRET = [
+    "</s>", "[INST]", "[/INST]",
+    "Question:", "User:", "Utilisateur:",
+    "QUESTION:", "Answer:", "Response:",
+    " | ", " |", "| ",
+    "\n\n", "Analyse:", "Note:"
+]
+
 
 # ============================================================================
 # Classe GenerateurLLM
@@ -83,15 +92,9 @@ class GenerateurLLM:
             logger.error(f"[ERREUR] Échec du chargement du modèle LLM: {e}")
             raise Exception(f"Erreur chargement LLM: {e}")
 
-    def generer_reponse_chatbot(
-        self,
-        question: str,
-        contexte: str,
-        max_tokens: int = None
-    ) -> str:
-        """Génère une réponse de chatbot."""
-        max_tokens = max_tokens or LLM_MAX_TOKENS
-
+    @staticmethod
+    def _construire_prompt(question: str, contexte: str) -> str:
+        """Construit le prompt Instruct du chatbot."""
         # Format Instruct : [INST]...[/INST]
         # Prompt renforcé pour forcer le français et inclure les liens
         prompt = f"""<s>[INST] Tu es Mila, une assistante virtuelle francophone.
@@ -143,26 +146,36 @@ INTERDICTIONS ABSOLUES:
 
 === TA REPONSE (EN FRANCAIS, LIENS UNIQUEMENT SI DANS LE CONTEXTE) ===
 [/INST]"""
+        return prompt
+
+    def _appeler_modele(self, prompt: str, max_tokens: int, stream: bool):
+        """Appelle le modèle avec les paramètres d'échantillonnage communs."""
+        return self.model(
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=LLM_TEMPERATURE,
+            top_p=LLM_TOP_P,
+            top_k=LLM_TOP_K,
+            repeat_penalty=LLM_REPETITION_PENALTY,
+            frequency_penalty=LLM_FREQUENCY_PENALTY,
+            presence_penalty=LLM_PRESENCE_PENALTY,
+            stop=SEQUENCES_ARRET,
+            echo=False,
+            stream=stream
+        )
+
+    def generer_reponse_chatbot(
+        self,
+        question: str,
+        contexte: str,
+        max_tokens: int = None
+    ) -> str:
+        """Génère une réponse de chatbot."""
+        max_tokens = max_tokens or LLM_MAX_TOKENS
+        prompt = self._construire_prompt(question, contexte)
 
         try:
-            output = self.model(
-                prompt=prompt,
-                max_tokens=max_tokens,
-                temperature=LLM_TEMPERATURE,
-                top_p=LLM_TOP_P,
-                top_k=LLM_TOP_K,
-                repeat_penalty=LLM_REPETITION_PENALTY,
-                frequency_penalty=LLM_FREQUENCY_PENALTY,
-                presence_penalty=LLM_PRESENCE_PENALTY,
-                stop=[
-                    "</s>", "[INST]", "[/INST]",
-                    "Question:", "User:", "Utilisateur:", 
-                    "QUESTION:", "Answer:", "Response:",
-                    " | ", " |", "| ",
-                    "\n\n", "Analyse:", "Note:"
-                ],
-                echo=False
-            )
+            output = self._appeler_modele(prompt, max_tokens, stream=False)
 
             texte_genere = output['choices'][0]['text'].strip()
             return texte_genere
@@ -171,6 +184,37 @@ INTERDICTIONS ABSOLUES:
             logger.error(f"[ERREUR] Erreur lors de la génération: {e}")
             raise Exception(f"Erreur génération texte: {e}")
 
+    def generer_reponse_chatbot_flux(
+        self,
+        question: str,
+        contexte: str,
+        max_tokens: int = None
+    ) -> Iterator[str]:
+        """
+        Génère une réponse de chatbot token par token.
+
+        Même prompt et mêmes paramètres que generer_reponse_chatbot(), mais
+        chaque fragment est rendu dès sa génération. Les blancs de tête sont
+        ignorés (équivalent du strip() de la version non streamée).
+        """
+        max_tokens = max_tokens or LLM_MAX_TOKENS
+        prompt = self._construire_prompt(question, contexte)
+
+        try:
+            debut = True
+            for morceau in self._appeler_modele(prompt, max_tokens, stream=True):
+                texte = morceau['choices'][0]['text']
+                if debut:
+                    texte = texte.lstrip()
+                    if not texte:
+                        continue
+                    debut = False
+                yield texte
+
+        except Exception as e:
+            logger.error(f"[ERREUR] Erreur lors de la génération: {e}")
+            raise Exception(f"Erreur génération texte: {e}")
+
 
 # ============================================================================
 # Singleton global
@@ -3,17 +3,24 @@ Serveur FastAPI pour Container 3 (LLM + FAISS Service).
 
 Endpoints:
 - POST /search : Recherche FAISS + génération LLM
+- POST /search/stream : Idem, réponse streamée en NDJSON
 - GET /health : Healthcheck
 - POST /admin/rebuild : Force rebuild FAISS
 - GET /admin/status : Statut auto-sync
+- GET /faiss/version : Version de l'index (invalidation des caches du Container 2)
 """
 
+import base64
+import binascii
+import json
 import logging
 import os
-from typing import List, Dict, Optional
+import time
+from typing import Iterator, List, Dict, Optional, Tuple, Union
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 import numpy as np
 import mysql.connector
@@ -41,6 +48,14 @@ MYSQL_USER = os.getenv("MYSQL_USER", "mila_user")
 MYSQL_PASSWORD = os.getenv("MYSQL_PASSWORD", "password")
 MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "mila_assist")
 
+# Génération
+MAX_TOKENS_REPONSE = 400  # Permet des réponses multi-questions
+SEUIL_CONFIANCE = 0.65
+PREFIXE_FAIBLE_CONFIANCE = (
+    "Je ne suis pas certain d'avoir bien compris votre question, "
+    "mais voici ce que je peux vous dire : "
+)
+
 
 # ============================================================================
 # Modèles Pydantic
@@ -48,7 +63,7 @@ MYSQL_DATABASE = os.getenv("MYSQL_DATABASE", "mila_assist")
 
 class RequeteRecherche(BaseModel):
     """Requête de recherche avec embedding."""
-    embedding: Optional[List[float]] = Field(None, description="Vecteur embedding (768 dimensions CamemBERT) - optionnel, calculé automatiquement si absent")
+    embedding: Optional[Union[List[float], str]] = Field(None, description="Vecteur embedding (768 dimensions CamemBERT) - optionnel, calculé automatiquement si absent. Liste de flottants ou base64 des octets float32 little-endian")
     question: str = Field(..., description="Question originale")
     k: int = Field(default=3, description="Nombre de résultats")
 
@@ -133,7 +148,7 @@ async def lifespan(app: FastAPI):
 
         # Shutdown
         logger.info("Arrêt du Container 3...")
-        auto_sync.arreter()
+        await auto_sync.arreter_async()
         logger.info("[OK] Arret termine")
 
     except Exception as e:
@@ -157,6 +172,101 @@ app = FastAPI(
 # Endpoints
 # ============================================================================
 
+def _rechercher_contexte(requete: RequeteRecherche) -> Tuple[List[int], List[Dict], str, float]:
+    """
+    Recherche FAISS + récupération du contexte MySQL (commun aux deux endpoints).
+
+    Returns:
+        Tuple (ids_mysql, lignes, contexte, confiance)
+
+    Raises:
+        HTTPException 404: Si FAISS ne trouve aucun résultat
+        HTTPException 422: Si l'embedding fourni est mal formé ou de mauvaise dimension
+    """
+    index_faiss = obtenir_index()
+
+    # 1. Convertir embedding en numpy array (ou le calculer si non fourni)
+    if isinstance(requete.embedding, str):
+        # Format compact du Container 2 : octets float32 little-endian en base64
+        try:
+            octets = base64.b64decode(requete.embedding, validate=True)
+        except binascii.Error:
+            raise HTTPException(status_code=422, detail="Embedding base64 invalide")
+        if len(octets) != 4 * index_faiss.dimension:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Embedding de {len(octets)} octets, {4 * index_faiss.dimension} attendus"
+            )
+        embedding_np = np.frombuffer(octets, dtype="<f4").astype(np.float32).reshape(1, -1)
+    elif requete.embedding is not None:
+        if len(requete.embedding) != index_faiss.dimension:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Embedding de dimension {len(requete.embedding)}, {index_faiss.dimension} attendue"
+            )
+        embedding_np = np.array(requete.embedding, dtype=np.float32).reshape(1, -1)
+    else:
+        # Calculer l'embedding avec l'encodeur local
+        # IMPORTANT: Appliquer le même nettoyage que le client natif pour cohérence
+        texte_pour_embedding = nettoyer_texte(requete.question, supprimer_stopwords=False)
+        logger.info(f"Calcul de l'embedding pour: '{texte_pour_embedding[:50]}...'")
+        encodeur = obtenir_encodeur()
+        embedding_np = encodeur.encoder(texte_pour_embedding, normalize=True).reshape(1, -1)
+
+    # 2. Recherche FAISS
+    distances, indices = index_faiss.rechercher(embedding_np, k=requete.k)
+
+    # Convertir indices FAISS en IDs MySQL
+    ids_mysql = index_faiss.obtenir_ids_mysql(indices)
+
+    if not ids_mysql or ids_mysql[0] == -1:
+        raise HTTPException(status_code=404, detail="Aucun résultat trouvé")
+
+    # 3. Récupérer contexte depuis MySQL
+    conn = mysql.connector.connect(
+        host=MYSQL_HOST,
+        user=MYSQL_USER,
+        password=MYSQL_PASSWORD,
+        database=MYSQL_DATABASE
+    )
+    cursor = conn.cursor(dictionary=True)
+
+    placeholders = ','.join(['%s'] * len(ids_mysql))
+    query = f"""
+        SELECT id, question, reponse
+        FROM base_connaissances
+        WHERE id IN ({placeholders})
+        ORDER BY FIELD(id, {placeholders})
+    """
+    cursor.execute(query, ids_mysql + ids_mysql)
+    rows = cursor.fetchall()
+
+    cursor.close()
+    conn.close()
+
+    # Construire le contexte
+    contexte_parts = []
+    for row in rows:
+        contexte_parts.append(f"Q: {row['question']}\nR: {row['reponse']}")
+
+    contexte = "\n\n".join(contexte_parts)
+
+    # Normaliser le score de similarité (produit scalaire) entre 0 et 1
+    # Le produit scalaire sur vecteurs normalisés est déjà dans [-1, 1]
+    # On clip et normalise pour avoir [0, 1]
+    raw_score = float(distances[0][0])
+    confiance = max(0.0, min(1.0, (raw_score + 1.0) / 2.0))
+
+    return ids_mysql, rows, contexte, confiance
+
+
+def _reponse_sans_llm(rows: List[Dict]) -> str:
+    """Mode RAG seul - retourne la meilleure réponse du contexte."""
+    if rows:
+        return rows[0]['reponse']
+    return "Aucune réponse trouvée dans la base de connaissances."
+
+
 @app.post("/search", response_model=ReponseRecherche)
 async def rechercher_et_generer(requete: RequeteRecherche):
     """
@@ -166,59 +276,10 @@ async def rechercher_et_generer(requete: RequeteRecherche):
     2. Récupère contexte depuis MySQL
     3. Génère réponse avec LLM
     """
-    import time
     start_time = time.time()
 
     try:
-        # 1. Convertir embedding en numpy array (ou le calculer si non fourni)
-        if requete.embedding is not None:
-            embedding_np = np.array(requete.embedding, dtype=np.float32).reshape(1, -1)
-        else:
-            # Calculer l'embedding avec l'encodeur local
-            # IMPORTANT: Appliquer le même nettoyage que le client natif pour cohérence
-            texte_pour_embedding = nettoyer_texte(requete.question, supprimer_stopwords=False)
-            logger.info(f"Calcul de l'embedding pour: '{texte_pour_embedding[:50]}...'")
-            encodeur = obtenir_encodeur()
-            embedding_np = encodeur.encoder(texte_pour_embedding, normalize=True).reshape(1, -1)
-
-        # 2. Recherche FAISS
-        index_faiss = obtenir_index()
-        distances, indices = index_faiss.rechercher(embedding_np, k=requete.k)
-
-        # Convertir indices FAISS en IDs MySQL
-        ids_mysql = index_faiss.obtenir_ids_mysql(indices)
-
-        if not ids_mysql or ids_mysql[0] == -1:
-            raise HTTPException(status_code=404, detail="Aucun résultat trouvé")
-
-        # 3. Récupérer contexte depuis MySQL
-        conn = mysql.connector.connect(
-            host=MYSQL_HOST,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD,
-            database=MYSQL_DATABASE
-        )
-        cursor = conn.cursor(dictionary=True)
-
-        placeholders = ','.join(['%s'] * len(ids_mysql))
-        query = f"""
-            SELECT id, question, reponse
-            FROM base_connaissances
-            WHERE id IN ({placeholders})
-            ORDER BY FIELD(id, {placeholders})
-        """
-        cursor.execute(query, ids_mysql + ids_mysql)
-        rows = cursor.fetchall()
-
-        cursor.close()
-        conn.close()
-
-        # Construire le contexte
-        contexte_parts = []
-        for row in rows:
-            contexte_parts.append(f"Q: {row['question']}\nR: {row['reponse']}")
-
-        contexte = "\n\n".join(contexte_parts)
+        ids_mysql, rows, contexte, confiance = _rechercher_contexte(requete)
 
         # 4. Générer réponse avec LLM (ou retourner contexte si LLM indisponible)
         generateur = obtenir_generateur(optionnel=True)
@@ -226,31 +287,17 @@ async def rechercher_et_generer(requete: RequeteRecherche):
             reponse_llm = generateur.generer_reponse_chatbot(
                 question=requete.question,
                 contexte=contexte,
-                max_tokens=400  # Augmenté pour permettre des réponses multi-questions
+                max_tokens=MAX_TOKENS_REPONSE
             )
         else:
-            # Mode RAG seul - retourner la meilleure réponse du contexte
-            if rows:
-                reponse_llm = rows[0]['reponse']
-            else:
-                reponse_llm = "Aucune réponse trouvée dans la base de connaissances."
+            reponse_llm = _reponse_sans_llm(rows)
 
-        # 5. Calculer temps et normaliser confiance
+        # 5. Calculer temps
         temps_ms = int((time.time() - start_time) * 1000)
 
-        # Normaliser le score de similarité (produit scalaire) entre 0 et 1
-        # Le produit scalaire sur vecteurs normalisés est déjà dans [-1, 1]
-        # On clip et normalise pour avoir [0, 1]
-        raw_score = float(distances[0][0])
-        confiance = max(0.0, min(1.0, (raw_score + 1.0) / 2.0))
-
         # 6. Ajouter un préfixe si confiance < 65%
-        SEUIL_CONFIANCE = 0.65
         if confiance < SEUIL_CONFIANCE:
-            reponse_llm = (
-                "Je ne suis pas certain d'avoir bien compris votre question, "
-                "mais voici ce que je peux vous dire : " + reponse_llm
-            )
+            reponse_llm = PREFIXE_FAIBLE_CONFIANCE + reponse_llm
             logger.info(f"[INFO] Faible confiance ({confiance:.2%}) - Préfixe ajouté à la réponse")
 
         return ReponseRecherche(
@@ -267,6 +314,62 @@ async def rechercher_et_generer(requete: RequeteRecherche):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/search/stream")
+def rechercher_et_generer_flux(requete: RequeteRecherche):
+    """
+    Recherche FAISS + génération LLM, réponse streamée.
+
+    La recherche est faite avant le début de la réponse (les erreurs 404/500
+    restent des codes HTTP). Le corps est ensuite du NDJSON, une ligne par
+    événement :
+        {"type": "meta", "confiance": ..., "sources": [...]}
+        {"type": "token", "texte": "..."}   (répété)
+        {"type": "fin", "temps_ms": ...}
+    En cas d'échec pendant la génération : {"type": "erreur", "detail": "..."}.
+    """
+    start_time = time.time()
+
+    try:
+        ids_mysql, rows, contexte, confiance = _rechercher_contexte(requete)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"[ERREUR] Erreur recherche: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    def evenements() -> Iterator[bytes]:
+        def ligne(evenement: Dict) -> bytes:
+            return (json.dumps(evenement, ensure_ascii=False) + "\n").encode("utf-8")
+
+        yield ligne({"type": "meta", "confiance": confiance, "sources": ids_mysql})
+
+        try:
+            if confiance < SEUIL_CONFIANCE:
+                logger.info(f"[INFO] Faible confiance ({confiance:.2%}) - Préfixe ajouté à la réponse")
+                yield ligne({"type": "token", "texte": PREFIXE_FAIBLE_CONFIANCE})
+
+            generateur = obtenir_generateur(optionnel=True)
+            if generateur:
+                for texte in generateur.generer_reponse_chatbot_flux(
+                    question=requete.question,
+                    contexte=contexte,
+                    max_tokens=MAX_TOKENS_REPONSE
+                ):
+                    yield ligne({"type": "token", "texte": texte})
+            else:
+                yield ligne({"type": "token", "texte": _reponse_sans_llm(rows)})
+
+        except Exception as e:
+            logger.error(f"[ERREUR] Erreur génération streamée: {e}")
+            yield ligne({"type": "erreur", "detail": str(e)})
+            return
+
+        yield ligne({"type": "fin", "temps_ms": int((time.time() - start_time) * 1000)})
+
+    # Générateur synchrone : Starlette l'itère dans son threadpool
+    return StreamingResponse(evenements(), media_type="application/x-ndjson")
+
+
 @app.get("/health", response_model=ReponseSante)
 async def healthcheck():
     """Healthcheck du service."""
@@ -303,6 +406,17 @@ async def forcer_rebuild():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/faiss/version")
+async def obtenir_version_index():
+    """
+    Version de l'index FAISS sur disque.
+
+    Interrogée régulièrement par le Container 2 : un changement (rebuild
+    admin ou auto-sync) invalide ses caches de réponses.
+    """
+    return {"version": obtenir_index().version}
+
+
 @app.get("/faiss/status")
 async def obtenir_statut():
     """Obtient le statut de l'auto-sync (admin)."""
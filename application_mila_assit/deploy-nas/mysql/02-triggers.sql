@@ -58,7 +58,95 @@ END$$
 DELIMITER ;
 
 -- ========================================================
--- TRIGGER 2 : Mise à jour automatique des métriques
+-- TRIGGER 2 : Compteur de retours (compter_retours en O(1))
+-- ========================================================
+-- Maintient compteurs.valeur pour 'retours_utilisateurs' dans la même
+-- transaction que l'INSERT / DELETE. Les suppressions en cascade ne
+-- déclenchent pas de trigger : purger_anciennes_conversations recale
+-- le compteur après la purge.
+
+DELIMITER $$
+
+DROP TRIGGER IF EXISTS compteur_retours_insertion$$
+
+CREATE TRIGGER compteur_retours_insertion
+AFTER INSERT ON retours_utilisateurs
+FOR EACH ROW
+BEGIN
+    UPDATE compteurs SET valeur = valeur + 1 WHERE nom = 'retours_utilisateurs';
+END$$
+
+DROP TRIGGER IF EXISTS compteur_retours_suppression$$
+
+CREATE TRIGGER compteur_retours_suppression
+AFTER DELETE ON retours_utilisateurs
+FOR EACH ROW
+BEGIN
+    UPDATE compteurs SET valeur = valeur - 1 WHERE nom = 'retours_utilisateurs';
+END$$
+
+DELIMITER ;
+
+-- ========================================================
+-- TRIGGER 3 : État de la base de connaissances (auto-sync FAISS)
+-- ========================================================
+-- Maintient la ligne unique de base_connaissances_etat : date de la
+-- dernière écriture et nombre d'entrées actives. L'auto-sync du
+-- Container 3 la lit au lieu d'agréger base_connaissances à chaque
+-- cycle. Toute écriture (y compris suppression ou désactivation)
+-- avance dernier_changement.
+
+DELIMITER $$
+
+DROP TRIGGER IF EXISTS etat_connaissances_insertion$$
+
+CREATE TRIGGER etat_connaissances_insertion
+AFTER INSERT ON base_connaissances
+FOR EACH ROW
+BEGIN
+    UPDATE base_connaissances_etat
+    SET dernier_changement = NOW(),
+        nombre_entrees = nombre_entrees + IF(NEW.active = 1, 1, 0)
+    WHERE id = 1;
+END$$
+
+DROP TRIGGER IF EXISTS etat_connaissances_modification$$
+
+CREATE TRIGGER etat_connaissances_modification
+AFTER UPDATE ON base_connaissances
+FOR EACH ROW
+BEGIN
+    UPDATE base_connaissances_etat
+    SET dernier_changement = NOW(),
+        nombre_entrees = nombre_entrees + IF(NEW.active = 1, 1, 0) - IF(OLD.active = 1, 1, 0)
+    WHERE id = 1;
+END$$
+
+DROP TRIGGER IF EXISTS etat_connaissances_suppression$$
+
+CREATE TRIGGER etat_connaissances_suppression
+AFTER DELETE ON base_connaissances
+FOR EACH ROW
+BEGIN
+    UPDATE base_connaissances_etat
+    SET dernier_changement = NOW(),
+        nombre_entrees = nombre_entrees - IF(OLD.active = 1, 1, 0)
+    WHERE id = 1;
+END$$
+
+DELIMITER ;
+
+-- Ligne initiale (la migration des données s'exécute avant ce fichier)
+INSERT INTO base_connaissances_etat (id, dernier_changement, nombre_entrees)
+SELECT 1, MAX(last_update), COUNT(*)
+FROM base_connaissances
+WHERE active = 1
+ON DUPLICATE KEY UPDATE
+    dernier_changement = VALUES(dernier_changement),
+    nombre_entrees = VALUES(nombre_entrees);
+
+-- ========================================================
+-- TRIGGER 4 : Mise à jour automatique des métriques
 -- ========================================================
 -- Optionnel : Peut être ajouté plus tard pour tracking automatique
 
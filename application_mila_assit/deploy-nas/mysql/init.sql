@@ -67,6 +67,7 @@ CREATE TABLE IF NOT EXISTS conversations (
     date_creation TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT 'Date/heure de la conversation',
 
     INDEX idx_session (id_session) COMMENT 'Index pour regrouper par session',
+    INDEX idx_session_date (id_session, date_creation DESC, id) COMMENT 'Index pour pagination par curseur des sessions',
     INDEX idx_date (date_creation) COMMENT 'Index pour tri chronologique',
     INDEX idx_confiance (score_confiance) COMMENT 'Index pour analyses de qualité',
     INDEX idx_temps_reponse (temps_reponse_ms) COMMENT 'Index pour analyses de performance',
@@ -106,10 +107,10 @@ CREATE TABLE IF NOT EXISTS retours_utilisateurs (
     FOREIGN KEY (id_conversation) REFERENCES conversations(id)
         ON DELETE CASCADE,
 
-    INDEX idx_note (note) COMMENT 'Index pour analyses satisfaction',
+    INDEX idx_note_date (note, date_creation DESC, id DESC) COMMENT 'Index pour analyses satisfaction et listing par note',
     INDEX idx_date (date_creation) COMMENT 'Index pour tri chronologique',
-    INDEX idx_categorie (categorie_probleme) COMMENT 'Index pour analyses par type',
-    INDEX idx_statut (statut) COMMENT 'Index pour filtrage par statut',
+    INDEX idx_categorie_date (categorie_probleme, date_creation DESC, id DESC) COMMENT 'Index pour analyses et listing par type',
+    INDEX idx_statut_date (statut, date_creation DESC, id DESC) COMMENT 'Index pour filtrage et listing par statut',
 
     CONSTRAINT chk_note CHECK (note BETWEEN 1 AND 5)
 ) ENGINE=InnoDB
@@ -202,6 +203,115 @@ CREATE TABLE IF NOT EXISTS alertes_qualite (
   COLLATE=utf8mb4_unicode_ci
   COMMENT='Alertes qualité générées automatiquement';
 
+-- ===================================================================
+-- Table: conversations_stats
+-- Description: Agrégats pré-calculés des conversations par période
+--              (rafraîchis par evt_rafraichir_statistiques)
+-- ===================================================================
+CREATE TABLE IF NOT EXISTS conversations_stats (
+    bucket_heures INT PRIMARY KEY COMMENT 'Période couverte en heures (1, 24, 168)',
+    total INT NOT NULL DEFAULT 0 COMMENT 'Nombre de conversations sur la période',
+    temps_moyen_ms FLOAT DEFAULT NULL COMMENT 'Temps de réponse moyen',
+    temps_min_ms INT DEFAULT NULL COMMENT 'Temps de réponse minimum',
+    temps_max_ms INT DEFAULT NULL COMMENT 'Temps de réponse maximum',
+    taux_cache_hit FLOAT DEFAULT NULL COMMENT 'Pourcentage de réponses servies par le cache',
+    confiance_moyenne FLOAT DEFAULT NULL COMMENT 'Score de confiance moyen',
+    date_calcul TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT 'Date du dernier rafraîchissement'
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci
+  COMMENT='Statistiques pré-agrégées des conversations';
+
+-- ===================================================================
+-- Table: base_connaissances_stats
+-- Description: Statistiques pré-calculées de la base de connaissances
+--              (une seule ligne, id = 1)
+-- ===================================================================
+CREATE TABLE IF NOT EXISTS base_connaissances_stats (
+    id TINYINT PRIMARY KEY COMMENT 'Toujours 1',
+    total INT NOT NULL DEFAULT 0 COMMENT 'Nombre d''entrées',
+    nb_tags INT NOT NULL DEFAULT 0 COMMENT 'Nombre d''étiquettes distinctes',
+    avec_embeddings INT NOT NULL DEFAULT 0 COMMENT 'Entrées avec embedding',
+    top_tags JSON DEFAULT NULL COMMENT 'Top 5 étiquettes [{etiquette, count}]',
+    date_calcul TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT 'Date du dernier rafraîchissement'
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci
+  COMMENT='Statistiques pré-agrégées de la base de connaissances';
+
+-- ===================================================================
+-- Table: retours_stats
+-- Description: Statistiques pré-calculées des retours utilisateurs
+--              (une seule ligne, id = 1)
+-- ===================================================================
+CREATE TABLE IF NOT EXISTS retours_stats (
+    id TINYINT PRIMARY KEY COMMENT 'Toujours 1',
+    total INT NOT NULL DEFAULT 0 COMMENT 'Nombre de retours',
+    note_moyenne FLOAT DEFAULT NULL COMMENT 'Note moyenne',
+    note_min TINYINT DEFAULT NULL COMMENT 'Note minimale',
+    note_max TINYINT DEFAULT NULL COMMENT 'Note maximale',
+    retours_positifs INT DEFAULT NULL COMMENT 'Retours notés 4 ou 5',
+    retours_negatifs INT DEFAULT NULL COMMENT 'Retours notés 1 ou 2',
+    retours_neutres INT DEFAULT NULL COMMENT 'Retours notés 3',
+    par_statut JSON DEFAULT NULL COMMENT 'Effectifs par statut {statut: nb}',
+    par_categorie JSON DEFAULT NULL COMMENT 'Effectifs par catégorie {categorie: nb}',
+    date_calcul TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT 'Date du dernier rafraîchissement'
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci
+  COMMENT='Statistiques pré-agrégées des retours utilisateurs';
+
+-- ===================================================================
+-- Table: compteurs
+-- Description: Compteurs exacts maintenus par triggers (COUNT(*) en O(1))
+-- ===================================================================
+CREATE TABLE IF NOT EXISTS compteurs (
+    nom VARCHAR(64) PRIMARY KEY COMMENT 'Nom du compteur (nom de la table comptée)',
+    valeur BIGINT NOT NULL DEFAULT 0 COMMENT 'Valeur courante'
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci
+  COMMENT='Compteurs de lignes maintenus par triggers';
+
+INSERT IGNORE INTO compteurs (nom, valeur) VALUES ('retours_utilisateurs', 0);
+
+-- ===================================================================
+-- Table: base_connaissances_etat
+-- Description: État de base_connaissances surveillé par l'auto-sync FAISS
+--              (une seule ligne, id = 1, maintenue par triggers)
+-- ===================================================================
+CREATE TABLE IF NOT EXISTS base_connaissances_etat (
+    id TINYINT PRIMARY KEY COMMENT 'Toujours 1',
+    dernier_changement TIMESTAMP NULL DEFAULT NULL COMMENT 'Date de la dernière écriture sur base_connaissances',
+    nombre_entrees INT NOT NULL DEFAULT 0 COMMENT 'Nombre d''entrées actives'
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci
+  COMMENT='État de la base de connaissances (auto-sync FAISS en O(1))';
+
+-- ===================================================================
+-- Table: metriques_rollup_horaire
+-- Description: Agrégats horaires des conversations et feedbacks
+--              (sommes et effectifs, pour recomposer les moyennes)
+-- ===================================================================
+CREATE TABLE IF NOT EXISTS metriques_rollup_horaire (
+    bucket_debut DATETIME PRIMARY KEY COMMENT 'Début de l''heure agrégée',
+    nb_conversations INT NOT NULL DEFAULT 0 COMMENT 'Nombre de conversations',
+    nb_cache_hits INT NOT NULL DEFAULT 0 COMMENT 'Conversations servies par le cache',
+    somme_latence_ms BIGINT NOT NULL DEFAULT 0 COMMENT 'Somme des temps de réponse',
+    nb_latence INT NOT NULL DEFAULT 0 COMMENT 'Conversations avec temps de réponse renseigné',
+    somme_notes INT NOT NULL DEFAULT 0 COMMENT 'Somme des notes de feedback',
+    nb_notes INT NOT NULL DEFAULT 0 COMMENT 'Nombre de feedbacks',
+    nb_note_1 INT NOT NULL DEFAULT 0 COMMENT 'Feedbacks notés 1',
+    nb_note_2 INT NOT NULL DEFAULT 0 COMMENT 'Feedbacks notés 2',
+    nb_note_3 INT NOT NULL DEFAULT 0 COMMENT 'Feedbacks notés 3',
+    nb_note_4 INT NOT NULL DEFAULT 0 COMMENT 'Feedbacks notés 4',
+    nb_note_5 INT NOT NULL DEFAULT 0 COMMENT 'Feedbacks notés 5'
+) ENGINE=InnoDB
+  DEFAULT CHARSET=utf8mb4
+  COLLATE=utf8mb4_unicode_ci
+  COMMENT='Roll-up horaire des métriques du dashboard';
+
 -- ===================================================================
 -- Données de test optionnelles (à décommenter pour dev/test)
 -- ===================================================================
@@ -220,8 +330,8 @@ CREATE OR REPLACE VIEW v_satisfaction_globale AS
 SELECT
     COUNT(*) AS total_feedbacks,
     AVG(note) AS note_moyenne,
-    SUM(CASE WHEN note >= 4 THEN 1 ELSE 0 END) AS feedbacks_positifs,
-    SUM(CASE WHEN note <= 2 THEN 1 ELSE 0 END) AS feedbacks_negatifs,
+    SUM(note >= 4) AS feedbacks_positifs,
+    SUM(note <= 2) AS feedbacks_negatifs,
     DATE(date_creation) AS date
 FROM retours_utilisateurs
 GROUP BY DATE(date_creation)
@@ -234,7 +344,7 @@ SELECT
     COUNT(*) AS total_conversations,
     AVG(temps_reponse_ms) AS temps_moyen_ms,
     AVG(score_confiance) AS confiance_moyenne,
-    SUM(CASE WHEN cache_hit = TRUE THEN 1 ELSE 0 END) / COUNT(*) AS taux_cache_hit
+    AVG(cache_hit) AS taux_cache_hit
 FROM conversations
 GROUP BY DATE(date_creation)
 ORDER BY date DESC;
@@ -257,6 +367,12 @@ BEGIN
 
     SET nb_supprimees = ROW_COUNT();
 
+    -- Les suppressions en cascade (retours des conversations purgées)
+    -- ne déclenchent pas les triggers : recaler le compteur
+    UPDATE compteurs
+    SET valeur = (SELECT COUNT(*) FROM retours_utilisateurs)
+    WHERE nom = 'retours_utilisateurs';
+
     INSERT INTO metriques (type_metrique, valeur_metrique, details)
     VALUES (
         'maintenance',
@@ -267,6 +383,164 @@ BEGIN
     SELECT CONCAT('Conversations supprimées: ', nb_supprimees) AS resultat;
 END //
 
+-- Procédure: rafraichir_statistiques (alimente les tables *_stats)
+CREATE PROCEDURE IF NOT EXISTS rafraichir_statistiques()
+BEGIN
+    INSERT INTO conversations_stats (
+        bucket_heures, total, temps_moyen_ms, temps_min_ms, temps_max_ms,
+        taux_cache_hit, confiance_moyenne, date_calcul
+    )
+    SELECT
+        b.bucket_heures,
+        COUNT(c.id),
+        AVG(c.temps_reponse_ms),
+        MIN(c.temps_reponse_ms),
+        MAX(c.temps_reponse_ms),
+        AVG(c.cache_hit) * 100.0,
+        AVG(c.score_confiance),
+        NOW()
+    FROM (SELECT 1 AS bucket_heures UNION ALL SELECT 24 UNION ALL SELECT 168) b
+    LEFT JOIN conversations c
+        ON c.date_creation >= DATE_SUB(NOW(), INTERVAL b.bucket_heures HOUR)
+    GROUP BY b.bucket_heures
+    ON DUPLICATE KEY UPDATE
+        total = VALUES(total),
+        temps_moyen_ms = VALUES(temps_moyen_ms),
+        temps_min_ms = VALUES(temps_min_ms),
+        temps_max_ms = VALUES(temps_max_ms),
+        taux_cache_hit = VALUES(taux_cache_hit),
+        confiance_moyenne = VALUES(confiance_moyenne),
+        date_calcul = VALUES(date_calcul);
+
+    INSERT INTO base_connaissances_stats (id, total, nb_tags, avec_embeddings, top_tags, date_calcul)
+    SELECT
+        1,
+        COUNT(*),
+        COUNT(DISTINCT etiquette),
+        COUNT(id_embedding),
+        (
+            SELECT JSON_ARRAYAGG(JSON_OBJECT('etiquette', t.etiquette, 'count', t.nb))
+            FROM (
+                SELECT etiquette, COUNT(*) AS nb
+                FROM base_connaissances
+                GROUP BY etiquette
+                ORDER BY nb DESC
+                LIMIT 5
+            ) t
+        ),
+        NOW()
+    FROM base_connaissances
+    ON DUPLICATE KEY UPDATE
+        total = VALUES(total),
+        nb_tags = VALUES(nb_tags),
+        avec_embeddings = VALUES(avec_embeddings),
+        top_tags = VALUES(top_tags),
+        date_calcul = VALUES(date_calcul);
+
+    INSERT INTO retours_stats (
+        id, total, note_moyenne, note_min, note_max,
+        retours_positifs, retours_negatifs, retours_neutres,
+        par_statut, par_categorie, date_calcul
+    )
+    SELECT
+        1,
+        COUNT(*),
+        AVG(note),
+        MIN(note),
+        MAX(note),
+        SUM(note >= 4),
+        SUM(note <= 2),
+        SUM(note = 3),
+        (
+            SELECT JSON_OBJECTAGG(s.statut, s.nb)
+            FROM (
+                SELECT statut, COUNT(*) AS nb
+                FROM retours_utilisateurs
+                WHERE statut IS NOT NULL
+                GROUP BY statut
+            ) s
+        ),
+        (
+            SELECT JSON_OBJECTAGG(c.categorie_probleme, c.nb)
+            FROM (
+                SELECT categorie_probleme, COUNT(*) AS nb
+                FROM retours_utilisateurs
+                WHERE categorie_probleme IS NOT NULL
+                GROUP BY categorie_probleme
+            ) c
+        ),
+        NOW()
+    FROM retours_utilisateurs
+    ON DUPLICATE KEY UPDATE
+        total = VALUES(total),
+        note_moyenne = VALUES(note_moyenne),
+        note_min = VALUES(note_min),
+        note_max = VALUES(note_max),
+        retours_positifs = VALUES(retours_positifs),
+        retours_negatifs = VALUES(retours_negatifs),
+        retours_neutres = VALUES(retours_neutres),
+        par_statut = VALUES(par_statut),
+        par_categorie = VALUES(par_categorie),
+        date_calcul = VALUES(date_calcul);
+
+    CALL rafraichir_rollup_horaire();
+END //
+
+-- Procédure: rafraichir_rollup_horaire (recalcule les heures récentes)
+CREATE PROCEDURE IF NOT EXISTS rafraichir_rollup_horaire()
+BEGIN
+    -- Heure précédente incluse pour absorber les lignes arrivées en fin d'heure ;
+    -- table vide : reconstruction complète de l'historique
+    DECLARE v_depuis DATETIME;
+
+    SELECT COALESCE(MAX(bucket_debut) - INTERVAL 1 HOUR, '1970-01-01')
+    INTO v_depuis
+    FROM metriques_rollup_horaire;
+
+    INSERT INTO metriques_rollup_horaire (
+        bucket_debut, nb_conversations, nb_cache_hits, somme_latence_ms, nb_latence
+    )
+    SELECT
+        DATE_FORMAT(date_creation, '%Y-%m-%d %H:00:00'),
+        COUNT(*),
+        SUM(cache_hit),
+        COALESCE(SUM(temps_reponse_ms), 0),
+        COUNT(temps_reponse_ms)
+    FROM conversations
+    WHERE date_creation >= v_depuis
+    GROUP BY DATE_FORMAT(date_creation, '%Y-%m-%d %H:00:00')
+    ON DUPLICATE KEY UPDATE
+        nb_conversations = VALUES(nb_conversations),
+        nb_cache_hits = VALUES(nb_cache_hits),
+        somme_latence_ms = VALUES(somme_latence_ms),
+        nb_latence = VALUES(nb_latence);
+
+    INSERT INTO metriques_rollup_horaire (
+        bucket_debut, somme_notes, nb_notes,
+        nb_note_1, nb_note_2, nb_note_3, nb_note_4, nb_note_5
+    )
+    SELECT
+        DATE_FORMAT(date_creation, '%Y-%m-%d %H:00:00'),
+        SUM(note),
+        COUNT(*),
+        SUM(note = 1),
+        SUM(note = 2),
+        SUM(note = 3),
+        SUM(note = 4),
+        SUM(note = 5)
+    FROM retours_utilisateurs
+    WHERE date_creation >= v_depuis
+    GROUP BY DATE_FORMAT(date_creation, '%Y-%m-%d %H:00:00')
+    ON DUPLICATE KEY UPDATE
+        somme_notes = VALUES(somme_notes),
+        nb_notes = VALUES(nb_notes),
+        nb_note_1 = VALUES(nb_note_1),
+        nb_note_2 = VALUES(nb_note_2),
+        nb_note_3 = VALUES(nb_note_3),
+        nb_note_4 = VALUES(nb_note_4),
+        nb_note_5 = VALUES(nb_note_5);
+END //
+
 DELIMITER ;
 
 -- ===================================================================
@@ -283,6 +557,12 @@ STARTS (TIMESTAMP(CURRENT_DATE) + INTERVAL 1 DAY + INTERVAL 2 HOUR)
 DO
     CALL purger_anciennes_conversations(90);
 
+-- Event: rafraîchissement des statistiques pré-agrégées (dashboard)
+CREATE EVENT IF NOT EXISTS evt_rafraichir_statistiques
+ON SCHEDULE EVERY 60 SECOND
+DO
+    CALL rafraichir_statistiques();
+
 -- ===================================================================
 -- Permissions et sécurité
 -- ===================================================================
@@ -293,6 +573,8 @@ CREATE USER IF NOT EXISTS 'mila_user'@'%' IDENTIFIED BY '${MYSQL_PASSWORD}';
 -- Accorder les permissions nécessaires
 GRANT SELECT, INSERT, UPDATE, DELETE ON mila_assist_db.* TO 'mila_user'@'%';
 GRANT EXECUTE ON PROCEDURE mila_assist_db.purger_anciennes_conversations TO 'mila_user'@'%';
+GRANT EXECUTE ON PROCEDURE mila_assist_db.rafraichir_statistiques TO 'mila_user'@'%';
+GRANT EXECUTE ON PROCEDURE mila_assist_db.rafraichir_rollup_horaire TO 'mila_user'@'%';
 
 -- Appliquer les changements
 FLUSH PRIVILEGES;